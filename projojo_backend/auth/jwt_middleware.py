@@ -15,6 +15,8 @@ EXCLUDED_ENDPOINTS = [
 
     "/pdf/*",  # Public PDF access
     "/image/*",  # Public image access
+    "/typedb/health",  # Health check for monitoring
+    "/metrics",  # Prometheus metrics
 
     # Development
     "/typedb/status",  # TypeDB status check
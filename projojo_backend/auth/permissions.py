@@ -1,6 +1,7 @@
 from functools import wraps
 from fastapi import HTTPException, Request
 from contextvars import ContextVar
+from exceptions import DatabaseBusyException, DatabaseTimeoutException, DatabaseUnavailableException
 
 # Store the current request in a context variable (thread-safe, request-scoped)
 _request_context: ContextVar[Request | None] = ContextVar('request', default=None)
@@ -228,6 +229,7 @@ async def _check_supervisor_ownership(
         bool: True if resource belongs to supervisor's company, False otherwise
     """
     from domain.repositories import UserRepository
+    from db.async_db import AsyncDb
 
     try:
         if resource_key in ["company_id", "business_id"]:
@@ -240,7 +242,8 @@ async def _check_supervisor_ownership(
 
         # Fetch all accessible resources in a single query
         user_repo = UserRepository()
-        resources = await user_repo.get_supervisor_accessible_resources_with_id(
+        resources = await AsyncDb.run(
+            user_repo.get_supervisor_accessible_resources_with_id,
             supervisor_company_id=supervisor_company_id,
             resource_id=resource_id
         )
@@ -260,6 +263,9 @@ async def _check_supervisor_ownership(
         # Check if resource_id is in the results for this category (handle None values)
         return resource_id in (resources.get(category) or [])
 
+    except (DatabaseBusyException, DatabaseTimeoutException, DatabaseUnavailableException):
+        # An overloaded or unreachable database is not an authorization failure, let the client retry
+        raise
     except Exception as e:
         # If there's an error, deny access
         print(f"Error validating supervisor ownership for {resource_key}={resource_id}: {e}")
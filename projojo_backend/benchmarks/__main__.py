@@ -0,0 +1,49 @@
+"""
+Micro-benchmarks for the backend hot paths.
+
+Run from the projojo_backend directory (the settings need the usual environment variables):
+
+    python -m benchmarks run --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks compare benchmarks/results/<before>.json benchmarks/results/<after>.json
+
+`compare` exits with status 1 when a benchmark got more than --threshold percent slower.
+"""
+import argparse
+import json
+import sys
+from .runner import run_all, compare, load, save
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Backend micro-benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write the results as JSON")
+    run_parser.add_argument("--output", "-o", help="Write the results to this file (default: stdout)")
+    run_parser.add_argument("--filter", "-k", help="Only run benchmarks whose name contains this text")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Number of timed rounds per benchmark")
+    run_parser.add_argument("--min-time", type=float, default=0.2, help="Minimum duration of a round in seconds")
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="Percentage that counts as a regression")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        from . import hot_paths  # noqa: F401 (registers the benchmarks)
+        results = run_all(args.filter, repeat=args.repeat, min_time=args.min_time)
+        if args.output:
+            save(results, args.output)
+        else:
+            print(json.dumps(results, indent=2))
+        return 0
+
+    lines, regressed = compare(load(args.baseline), load(args.current), args.threshold)
+    print("\n".join(lines))
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
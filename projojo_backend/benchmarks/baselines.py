@@ -0,0 +1,31 @@
+"""
+Earlier implementations of optimized code, kept as baselines to benchmark the current ones against.
+"""
+import re
+from typing import Any
+from db.initDatabase import format_value, _remove_none_clauses
+
+
+def legacy_build_query(template: str, params: dict[str, Any], allow_none: bool = False) -> str:
+    """The original build_query, which parsed the template again on every call."""
+    placeholders = re.findall(r'~([a-zA-Z_][a-zA-Z0-9_]*)', template)
+    unique_placeholders = set(placeholders)
+    param_keys = set(params.keys())
+
+    if len(placeholders) != len(unique_placeholders):
+        duplicates = sorted({p for p in placeholders if placeholders.count(p) > 1})
+        raise ValueError(f"Duplicate placeholders in template: {duplicates}.")
+    if unused_params := param_keys - unique_placeholders:
+        raise ValueError(f"Unused parameters: {sorted(unused_params)}.")
+    if missing_params := unique_placeholders - param_keys:
+        raise ValueError(f"Missing parameters: {sorted(missing_params)}")
+
+    none_params = [k for k, v in params.items() if v is None]
+    if none_params and not allow_none:
+        raise ValueError("Cannot use None in read queries.")
+
+    regular_params = {k: v for k, v in params.items() if v is not None}
+    result = _remove_none_clauses(template, none_params) if none_params else template
+    for key, value in regular_params.items():
+        result = re.sub(rf'~{re.escape(key)}(?![a-zA-Z0-9_])', format_value(value), result)
+    return result
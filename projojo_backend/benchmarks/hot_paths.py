@@ -0,0 +1,223 @@
+"""
+Benchmarks for the code every request runs through: query building, input validation,
+JWT handling, authorization checks and mapping query results to models.
+"""
+from datetime import datetime
+from fastapi.responses import Response
+from starlette.requests import Request
+from auth.jwt_middleware import JWTMiddleware
+from auth.jwt_utils import create_jwt_token, get_token_payload
+from auth.permissions import _check_role_permitted
+from db.initDatabase import build_query, format_value, _remove_none_clauses
+from domain.models import Task
+from domain.repositories import BusinessRepository, ProjectRepository, SkillRepository, UserRepository
+from service.validation_service import is_valid_length, strip_markdown
+from main import app
+from .baselines import legacy_build_query
+from .runner import benchmark
+
+READ_TEMPLATE = """
+    match
+        $task isa task,
+        has id ~id,
+        has name $name,
+        has description $description,
+        has totalNeeded $totalNeeded,
+        has createdAt $createdAt;
+    fetch {
+        'id': $task.id,
+        'name': $name,
+        'description': $description,
+        'total_needed': $totalNeeded,
+        'created_at': $createdAt
+    };
+"""
+
+WRITE_TEMPLATE = """
+    match
+        $business isa business,
+        has id ~business_id;
+    insert
+        $project isa project,
+        has id ~id,
+        has name ~name,
+        has description ~description,
+        has imagePath ~image_path,
+        has location ~location,
+        has createdAt ~created_at;
+        $hasProjects isa hasProjects($business, $project);
+"""
+
+WRITE_PARAMS = {
+    "business_id": "978556ff-3c15-4b7a-b559-5e7e131a4c28",
+    "id": "7f1c1ed4-3c2a-4d8c-a7a5-0a8f1f2f3e4d",
+    "name": "Slimme kas",
+    "description": "Een \"slimme\" kas met **sensoren**",
+    "image_path": "kas.png",
+    "location": None,
+    "created_at": datetime(2025, 1, 15, 9, 0),
+}
+
+MARKDOWN = """
+# Project **Slimme kas**
+
+We zoeken studenten die willen helpen met:
+- sensoren plaatsen en [dashboards](https://example.com) bouwen
+- data _analyseren_ met `python`
+
+> Ervaring met IoT is een pré.
+
+1. Kennismaking
+2. Uitvoering
+""" * 4
+
+STUDENT_ID = "f544fec0-b4ff-4133-bc5d-4c95f34518bd"
+SUPERVISOR_ID = "98f07817-9ede-4e4f-8f1b-0fd65ac33322"
+BUSINESS_ID = "978556ff-3c15-4b7a-b559-5e7e131a4c28"
+
+STUDENT_TOKEN = create_jwt_token(STUDENT_ID, "student")
+SUPERVISOR_TOKEN = create_jwt_token(SUPERVISOR_ID, "supervisor", BUSINESS_ID)
+
+
+def _request(path: str, token: str | None, app=None) -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": headers,
+        "app": app,
+    }
+    return Request(scope)
+
+
+# --- Query building ---------------------------------------------------------------------------
+
+@benchmark("build_query.read", group="db")
+def build_read_query():
+    build_query(READ_TEMPLATE, {"id": "7f1c1ed4-3c2a-4d8c-a7a5-0a8f1f2f3e4d"})
+
+
+@benchmark("build_query.write_with_none", group="db")
+def build_write_query():
+    build_query(WRITE_TEMPLATE, WRITE_PARAMS, allow_none=True)
+
+
+@benchmark("build_query.legacy_read", group="db")
+def legacy_build_read_query():
+    legacy_build_query(READ_TEMPLATE, {"id": "7f1c1ed4-3c2a-4d8c-a7a5-0a8f1f2f3e4d"})
+
+
+@benchmark("build_query.legacy_write_with_none", group="db")
+def legacy_build_write_query():
+    legacy_build_query(WRITE_TEMPLATE, WRITE_PARAMS, allow_none=True)
+
+
+@benchmark("format_value.string", group="db")
+def format_string():
+    format_value('Een "slimme" kas met \\ backslash')
+
+
+@benchmark("format_value.datetime", group="db")
+def format_datetime():
+    format_value(WRITE_PARAMS["created_at"])
+
+
+@benchmark("_remove_none_clauses", group="db")
+def remove_none_clauses():
+    _remove_none_clauses(WRITE_TEMPLATE, ["location"])
+
+
+# --- Validation -------------------------------------------------------------------------------
+
+@benchmark("strip_markdown", group="validation")
+def strip_md():
+    strip_markdown(MARKDOWN)
+
+
+@benchmark("is_valid_length.strip_md", group="validation")
+def valid_length():
+    is_valid_length(MARKDOWN, 4000, strip_md=True)
+
+
+# --- Authentication and authorization ---------------------------------------------------------
+
+STUDENT_REQUEST = _request("/tasks/", STUDENT_TOKEN)
+
+
+@benchmark("get_token_payload", group="auth")
+def token_payload():
+    get_token_payload(STUDENT_REQUEST)
+
+
+@benchmark("_check_role_permitted", group="auth")
+def role_permitted():
+    _check_role_permitted("supervisor", "teacher")
+    _check_role_permitted("student", "authenticated")
+
+
+_middleware = JWTMiddleware(app=None)
+_ok = Response()
+
+
+async def _call_next(request: Request) -> Response:
+    return _ok
+
+
+@benchmark("JWTMiddleware.dispatch.supervisor", group="auth")
+async def dispatch_supervisor():
+    await _middleware.dispatch(_request(f"/businesses/{BUSINESS_ID}", SUPERVISOR_TOKEN, app), _call_next)
+
+
+@benchmark("JWTMiddleware.dispatch.excluded_path", group="auth")
+async def dispatch_excluded():
+    await _middleware.dispatch(_request("/image/logo.png", None, app), _call_next)
+
+
+# --- Mapping query results to models ----------------------------------------------------------
+
+_skill_repo = SkillRepository()
+_project_repo = ProjectRepository()
+_business_repo = BusinessRepository()
+_user_repo = UserRepository()
+
+SKILL_ROW = {"id": "c7852c64-eb33-4e82-9e42-d11f4108de03", "name": "Bodemanalyse",
+             "isPending": False, "createdAt": "2025-01-15T09:00:00.000000000"}
+PROJECT_ROW = {"id": "p-1", "name": "Slimme kas", "description": MARKDOWN, "imagePath": "kas.png",
+               "location": "Gelderland", "createdAt": "2025-01-15T09:00:00.000000000", "business": BUSINESS_ID}
+BUSINESS_ROW = {"id": BUSINESS_ID, "name": "De Gouden Akker", "description": "Biologische akkerbouw",
+                "imagePath": "logo.png", "location": "Gelderland"}
+STUDENT_ROW = {"id": STUDENT_ID, "email": "em.jansen@student.han.nl", "fullName": "Emma Jansen",
+               "imagePath": "student_female.png",
+               "oauth_providers": [{"provider_name": "microsoft", "oauth_sub": "8e9ade83"}],
+               "skill_ids": [{"skill_id": f"s-{i}"} for i in range(5)],
+               "registered_task_ids": [{"task_id": f"t-{i}"} for i in range(3)]}
+TASK_ROW = {"id": "t-1", "name": "Sensoren plaatsen", "description": MARKDOWN, "total_needed": 3,
+            "created_at": "2025-01-15T09:00:00.000000000", "total_registered": 2, "total_accepted": 1}
+
+
+@benchmark("SkillRepository._map_to_model", group="mapping")
+def map_skill():
+    _skill_repo._map_to_model(SKILL_ROW)
+
+
+@benchmark("ProjectRepository._map_to_model", group="mapping")
+def map_project():
+    _project_repo._map_to_model(PROJECT_ROW)
+
+
+@benchmark("BusinessRepository._map_to_model", group="mapping")
+def map_business():
+    _business_repo._map_to_model(BUSINESS_ROW)
+
+
+@benchmark("UserRepository._map_student", group="mapping")
+def map_student():
+    _user_repo._map_student(STUDENT_ROW)
+
+
+@benchmark("Task.model_validate", group="mapping")
+def map_task():
+    Task.model_validate(TASK_ROW)
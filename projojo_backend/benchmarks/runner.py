@@ -0,0 +1,164 @@
+import asyncio
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+
+@dataclass
+class Benchmark:
+    name: str
+    group: str
+    func: Callable[[], Any]
+
+
+# All registered benchmarks, in registration order
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(name: str, group: str):
+    """
+    Register a function (sync or async, without arguments) as a benchmark.
+
+    Usage:
+    ```python
+    @benchmark("build_query.read", group="db")
+    def build_read_query():
+        build_query(READ_TEMPLATE, {"id": "abc"})
+    ```
+    """
+    def decorator(func: Callable[[], Any]) -> Callable[[], Any]:
+        BENCHMARKS.append(Benchmark(name, group, func))
+        return func
+    return decorator
+
+
+def _time_sync(func: Callable[[], Any], number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - started
+
+
+async def _time_async(func: Callable[[], Any], number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        await func()
+    return time.perf_counter() - started
+
+
+def measure(bench: Benchmark, repeat: int = 5, min_time: float = 0.2) -> dict[str, Any]:
+    """
+    Time one benchmark: calibrate the number of calls per round so a round takes at least
+    `min_time` seconds, then run `repeat` rounds. Times are reported per call, in microseconds.
+    """
+    if inspect.iscoroutinefunction(bench.func):
+        loop = asyncio.new_event_loop()
+        def run(number: int) -> float:
+            return loop.run_until_complete(_time_async(bench.func, number))
+    else:
+        loop = None
+        def run(number: int) -> float:
+            return _time_sync(bench.func, number)
+
+    try:
+        number = 1
+        while True:
+            elapsed = run(number)
+            if elapsed >= min_time or number >= 10_000_000:
+                break
+            number *= 10 if elapsed < min_time / 10 else 2
+
+        rounds = [run(number) / number * 1e6 for _ in range(repeat)]
+    finally:
+        if loop is not None:
+            loop.close()
+
+    return {
+        "group": bench.group,
+        "calls_per_round": number,
+        "rounds": repeat,
+        "min_us": round(min(rounds), 3),
+        "median_us": round(statistics.median(rounds), 3),
+        "mean_us": round(statistics.fmean(rounds), 3),
+        "stdev_us": round(statistics.stdev(rounds), 3) if repeat > 1 else 0.0,
+        "ops_per_sec": round(1e6 / min(rounds)),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_all(name_filter: str | None = None, repeat: int = 5, min_time: float = 0.2) -> dict[str, Any]:
+    """Run all (or the matching) benchmarks and return the results as a JSON-serializable dict."""
+    results = {}
+    for bench in BENCHMARKS:
+        if name_filter and name_filter not in bench.name:
+            continue
+        results[bench.name] = measure(bench, repeat=repeat, min_time=min_time)
+        print(f"{bench.name:<45} {results[bench.name]['median_us']:>12.2f} us", file=sys.stderr)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "min_time": min_time,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float = 10.0) -> tuple[list[str], bool]:
+    """
+    Compare two result files on the median time per call.
+
+    Returns:
+        (report lines, whether any benchmark got more than `threshold` percent slower)
+    """
+    lines = [
+        f"baseline {baseline['meta'].get('commit')} -> current {current['meta'].get('commit')}",
+        f"{'benchmark':<45} {'baseline us':>12} {'current us':>12} {'change':>9}",
+    ]
+    regressed = False
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            lines.append(f"{name:<45} {'-':>12} {result['median_us']:>12.2f} {'new':>9}")
+            continue
+        change = (result["median_us"] - old["median_us"]) / old["median_us"] * 100
+        marker = ""
+        if change > threshold:
+            marker = "  SLOWER"
+            regressed = True
+        elif change < -threshold:
+            marker = "  faster"
+        lines.append(f"{name:<45} {old['median_us']:>12.2f} {result['median_us']:>12.2f} {change:>+8.1f}%{marker}")
+    return lines, regressed
+
+
+def load(path: str) -> dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save(results: dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+        file.write("\n")
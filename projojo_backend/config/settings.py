@@ -40,6 +40,60 @@ TYPEDB_NEW_PASSWORD: str = env.str("TYPEDB_NEW_PASSWORD")
 # Optional: Reset database on startup (WARNING: deletes all data!)
 RESET_DB: bool = env.bool("RESET_DB", default=False)
 
+# Optional: TypeDB access from async route handlers.
+# Driver calls run on a dedicated, bounded thread pool so a slow query never blocks the event loop.
+TYPEDB_MAX_WORKERS: int = env.int("TYPEDB_MAX_WORKERS", default=8)
+# Maximum number of running + queued database calls before new calls are rejected with a 503
+TYPEDB_MAX_PENDING: int = env.int("TYPEDB_MAX_PENDING", default=64)
+# Maximum time (seconds) a route waits for a single database call before answering with a 504
+TYPEDB_QUERY_TIMEOUT: float = env.float("TYPEDB_QUERY_TIMEOUT", default=15.0)
+
+# Optional: TypeDB connection supervision.
+# A background task checks the connection every TYPEDB_HEALTH_CHECK_INTERVAL seconds and reconnects when needed.
+TYPEDB_HEALTH_CHECK_INTERVAL: float = env.float("TYPEDB_HEALTH_CHECK_INTERVAL", default=5.0)
+# After this many consecutive connection failures the circuit breaker opens and requests fail fast with a 503
+TYPEDB_BREAKER_FAILURE_THRESHOLD: int = env.int("TYPEDB_BREAKER_FAILURE_THRESHOLD", default=3)
+# Seconds the breaker stays open before a single trial request may try the database again
+TYPEDB_BREAKER_RESET_TIMEOUT: float = env.float("TYPEDB_BREAKER_RESET_TIMEOUT", default=10.0)
+
+# Optional: slow-query log. Queries slower than this many milliseconds are logged with their
+# fingerprint, repository method and request path (0 disables the log)
+SLOW_QUERY_THRESHOLD_MS: float = env.float("SLOW_QUERY_THRESHOLD_MS", default=500.0)
+# Number of recent slow queries kept in memory for the aggregated overview
+SLOW_QUERY_LOG_SIZE: int = env.int("SLOW_QUERY_LOG_SIZE", default=1000)
+
+# Optional: in-memory cache for read-mostly data (skills, businesses, OAuth providers).
+# Entries expire after CACHE_TTL seconds; writes through the repositories invalidate them immediately.
+CACHE_TTL: float = env.float("CACHE_TTL", default=300.0)
+# Maximum number of entries per cache, the least recently used entry is evicted first
+CACHE_MAX_ENTRIES: int = env.int("CACHE_MAX_ENTRIES", default=256)
+# Maximum number of user ids whose user type (student/supervisor/teacher) is remembered
+USER_TYPE_CACHE_SIZE: int = env.int("USER_TYPE_CACHE_SIZE", default=10000)
+
+# Optional: the registration counters stored on tasks are recounted every
+# REGISTRATION_COUNTER_RECONCILE_INTERVAL seconds (and on startup) to repair any drift (0 disables the job;
+# tasks without counters still get them when the schema is migrated on startup)
+REGISTRATION_COUNTER_RECONCILE_INTERVAL: float = env.float("REGISTRATION_COUNTER_RECONCILE_INTERVAL", default=900.0)
+
+# Optional: /businesses/complete is served from an in-memory snapshot of the business tree.
+# After a write the snapshot is rebuilt once no further write arrived for DISCOVERY_SNAPSHOT_DEBOUNCE
+# seconds (at the latest 10x that long after the first write while writes keep coming in),
+# so the discovery pages can lag a little behind a write.
+DISCOVERY_SNAPSHOT_ENABLED: bool = env.bool("DISCOVERY_SNAPSHOT_ENABLED", default=True)
+DISCOVERY_SNAPSHOT_DEBOUNCE: float = env.float("DISCOVERY_SNAPSHOT_DEBOUNCE", default=1.0)
+
+# Optional: profile pictures of new OAuth users are downloaded in the background by one shared HTTP client
+AVATAR_DOWNLOAD_TIMEOUT: float = env.float("AVATAR_DOWNLOAD_TIMEOUT", default=10.0)
+AVATAR_DOWNLOAD_MAX_CONNECTIONS: int = env.int("AVATAR_DOWNLOAD_MAX_CONNECTIONS", default=10)
+
+# Optional: resized WebP/AVIF variants of uploaded images (when disabled the originals are served).
+# Variants are generated by IMAGE_VARIANT_WORKERS processes and kept in IMAGE_VARIANT_DIR, which is
+# trimmed to IMAGE_VARIANT_CACHE_MAX_MB by removing the least recently used variants.
+IMAGE_VARIANTS_ENABLED: bool = env.bool("IMAGE_VARIANTS_ENABLED", default=True)
+IMAGE_VARIANT_WORKERS: int = env.int("IMAGE_VARIANT_WORKERS", default=2)
+IMAGE_VARIANT_DIR: str = env.str("IMAGE_VARIANT_DIR", default="static/variants")
+IMAGE_VARIANT_CACHE_MAX_MB: int = env.int("IMAGE_VARIANT_CACHE_MAX_MB", default=256)
+
 # Email Configuration (required except username/password)
 EMAIL_DEFAULT_SENDER: str = env.str("EMAIL_DEFAULT_SENDER")
 EMAIL_SMTP_HOST: str = env.str("EMAIL_SMTP_HOST")
@@ -0,0 +1,154 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, TypeVar
+from config.settings import TYPEDB_MAX_WORKERS, TYPEDB_MAX_PENDING, TYPEDB_QUERY_TIMEOUT
+from db.initDatabase import Db, CompiledQuery
+from exceptions import DatabaseBusyException, DatabaseTimeoutException
+
+R = TypeVar("R")
+
+
+class AsyncDb:
+    """
+    Async facade over `Db` for use in (async) route handlers.
+
+    The TypeDB driver is synchronous, so calling `Db` (or a repository) directly from an
+    `async def` route blocks the event loop for every other request. `AsyncDb` runs those
+    calls on a dedicated, bounded thread pool instead:
+
+    - at most `max_workers` driver calls run at the same time;
+    - at most `max_pending` calls may be running or queued, further calls are rejected
+      immediately with a `DatabaseBusyException` (503) instead of piling up;
+    - a caller waits at most `timeout` seconds before a `DatabaseTimeoutException` (504).
+
+    Usage:
+    ```python
+    task = await AsyncDb.run(task_repo.get_by_id, task_id)
+    rows = await AsyncDb.read_transact(query, {"id": id})
+    ```
+
+    Context variables (e.g. the current request) are copied into the worker thread.
+    """
+    max_workers: int = TYPEDB_MAX_WORKERS
+    max_pending: int = TYPEDB_MAX_PENDING
+    timeout: float = TYPEDB_QUERY_TIMEOUT
+    _executor: ThreadPoolExecutor | None = None
+    _slots: threading.BoundedSemaphore | None = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _get_executor() -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+        """Create the executor lazily, so settings can still be changed before first use"""
+        if AsyncDb._executor is None or AsyncDb._slots is None:
+            with AsyncDb._lock:
+                if AsyncDb._executor is None or AsyncDb._slots is None:
+                    AsyncDb._slots = threading.BoundedSemaphore(max(AsyncDb.max_pending, AsyncDb.max_workers))
+                    AsyncDb._executor = ThreadPoolExecutor(
+                        max_workers=AsyncDb.max_workers,
+                        thread_name_prefix="typedb"
+                    )
+        return AsyncDb._executor, AsyncDb._slots
+
+    @staticmethod
+    def submit(func: Callable[..., R], *args: Any, **kwargs: Any) -> "Future[R]":
+        """
+        Submit a synchronous call to the database executor.
+
+        Raises:
+            DatabaseBusyException: If the maximum number of pending calls is reached
+        """
+        executor, slots = AsyncDb._get_executor()
+        if not slots.acquire(blocking=False):
+            raise DatabaseBusyException()
+
+        try:
+            context = contextvars.copy_context()
+            future = executor.submit(context.run, func, *args, **kwargs)
+        except BaseException:
+            slots.release()
+            raise
+
+        # The slot is only freed once the call actually finished, so calls that timed out
+        # for the caller but are still running keep counting towards the limit.
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    @staticmethod
+    async def run(func: Callable[..., R], *args: Any, timeout: float | None = None, **kwargs: Any) -> R:
+        """
+        Run a synchronous (repository) function on the database executor and await its result.
+
+        Args:
+            func: The function to call, e.g. `task_repo.get_by_id`
+            *args: Positional arguments for `func`
+            timeout: Seconds to wait for the result, defaults to `AsyncDb.timeout`
+            **kwargs: Keyword arguments for `func`
+
+        Raises:
+            DatabaseBusyException: If too many database calls are already pending
+            DatabaseTimeoutException: If the call did not finish within the timeout
+        """
+        future = AsyncDb.submit(func, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or AsyncDb.timeout)
+        except asyncio.TimeoutError:
+            # Only succeeds if the call is still queued; a running driver call cannot be interrupted
+            future.cancel()
+            print(f"Database call {getattr(func, '__qualname__', func)} timed out")
+            raise DatabaseTimeoutException()
+
+    @staticmethod
+    async def iterate(func: Callable[..., Iterable[R]], *args: Any, batch_size: int = 100, timeout: float | None = None, **kwargs: Any) -> AsyncIterator[R]:
+        """
+        Consume a synchronous generator (e.g. `Db.read_stream` or a repository `iter_*` method)
+        as an async iterator. Items are pulled from the generator on the executor in batches,
+        so the event loop never blocks on the driver and other requests are served in between.
+
+        Leaving the `async for` early closes the generator, which closes its transaction.
+
+        Usage:
+        ```python
+        async for task in AsyncDb.iterate(task_repo.iter_all):
+            ...
+        ```
+        """
+        iterator: Iterator[R] = iter(func(*args, **kwargs))
+        try:
+            while True:
+                batch = await AsyncDb.run(_take, iterator, batch_size, timeout=timeout)
+                for item in batch:
+                    yield item
+                if len(batch) < batch_size:
+                    return
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                # Closing ends the read transaction, keep it off the event loop
+                await asyncio.to_thread(close)
+
+    @staticmethod
+    async def read_transact(query: str | CompiledQuery, params: dict[str, Any] | None = None, sort_fields: bool = True, timeout: float | None = None):
+        """Async variant of `Db.read_transact`"""
+        return await AsyncDb.run(Db.read_transact, query, params, sort_fields, timeout=timeout)
+
+    @staticmethod
+    async def write_transact(query: str | CompiledQuery, params: dict[str, Any] | None = None, timeout: float | None = None):
+        """Async variant of `Db.write_transact`"""
+        return await AsyncDb.run(Db.write_transact, query, params, timeout=timeout)
+
+    @staticmethod
+    def shutdown():
+        """Stop the executor, waiting for running calls to finish"""
+        with AsyncDb._lock:
+            if AsyncDb._executor is not None:
+                AsyncDb._executor.shutdown(wait=True, cancel_futures=True)
+            AsyncDb._executor = None
+            AsyncDb._slots = None
+
+
+def _take(iterator: Iterator[R], count: int) -> list[R]:
+    """Take up to `count` items from an iterator"""
+    return list(islice(iterator, count))
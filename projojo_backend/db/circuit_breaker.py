@@ -0,0 +1,79 @@
+import threading
+import time
+from typing import Any
+from exceptions import DatabaseUnavailableException
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker that stops requests from waiting on a database that is down.
+
+    - closed: calls go through; `failure_threshold` consecutive failures open the breaker.
+    - open: calls fail immediately with DatabaseUnavailableException (503).
+    - half_open: after `reset_timeout` seconds a single trial call is let through.
+      Its success closes the breaker, its failure opens it again.
+
+    A successful health probe of the ConnectionSupervisor also closes the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CircuitBreaker.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected_calls = 0
+        self.last_error: str | None = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def before_call(self) -> None:
+        """Raise DatabaseUnavailableException if the call may not go to the database."""
+        with self._lock:
+            if self._state == CircuitBreaker.CLOSED:
+                return
+            if self._state == CircuitBreaker.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = CircuitBreaker.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == CircuitBreaker.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected_calls += 1
+        raise DatabaseUnavailableException()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CircuitBreaker.CLOSED
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self, error: Exception | None = None) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if error is not None:
+                self.last_error = str(error)
+            if self._state == CircuitBreaker.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != CircuitBreaker.OPEN:
+                    print(f"TypeDB circuit breaker opened after {self._consecutive_failures} failure(s): {self.last_error}")
+                self._state = CircuitBreaker.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current state for monitoring."""
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "rejected_calls": self.rejected_calls,
+                "last_error": self.last_error,
+            }
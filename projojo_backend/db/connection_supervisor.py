@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+from config.settings import TYPEDB_HEALTH_CHECK_INTERVAL
+from db.initDatabase import Db
+
+
+class ConnectionSupervisor:
+    """
+    Background task that owns the TypeDB connection while the API runs.
+
+    Every `interval` seconds it probes the server (or reconnects when there is no connection)
+    and reports the result to `Db.breaker`. When the breaker opens, the connection is dropped
+    and rebuilt here, with exponential backoff, instead of inside a request. Requests meanwhile
+    fail fast with a 503 (see `Db._open_transaction`).
+
+    Probes run via `asyncio.to_thread`, not on the AsyncDb executor, so they still get through
+    when the executor is saturated by slow queries.
+    """
+
+    def __init__(self, interval: float = TYPEDB_HEALTH_CHECK_INTERVAL, max_backoff: float = 30.0):
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self._task: asyncio.Task | None = None
+        self.last_check_at: datetime | None = None
+        self.last_error: str | None = None
+        self.healthy = Db.is_connected()
+        self.reconnects = 0
+
+    def start(self) -> None:
+        """Start supervising; from now on requests no longer retry connections themselves."""
+        if self._task is not None:
+            return
+        Db.supervised = True
+        self._task = asyncio.create_task(self._run(), name="typedb-connection-supervisor")
+
+    async def stop(self) -> None:
+        Db.supervised = False
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        delay = self.interval
+        while True:
+            if await self.check():
+                delay = self.interval
+            else:
+                delay = min(delay * 1.5, self.max_backoff)
+            await asyncio.sleep(delay)
+
+    async def check(self) -> bool:
+        """Probe (or reconnect) once and report the result to the circuit breaker."""
+        self.last_check_at = datetime.now()
+        try:
+            if Db.is_connected():
+                await asyncio.wait_for(asyncio.to_thread(Db.probe), timeout=self.interval)
+            else:
+                await asyncio.wait_for(asyncio.to_thread(Db.reconnect), timeout=self.max_backoff)
+                self.reconnects += 1
+                print("Reconnected to TypeDB")
+        except Exception as e:
+            self.healthy = False
+            self.last_error = f"{type(e).__name__}: {e}"
+            Db.breaker.record_failure(e)
+            if Db.breaker.state == Db.breaker.OPEN and Db.is_connected():
+                # Rebuild the connection on the next check
+                await asyncio.to_thread(Db.close)
+            return False
+
+        self.healthy = True
+        Db.breaker.record_success()
+        return True
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current state for monitoring."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "healthy": self.healthy,
+            "connected": Db.is_connected(),
+            "last_check_at": self.last_check_at.isoformat() if self.last_check_at else None,
+            "last_error": self.last_error,
+            "reconnects": self.reconnects,
+            "breaker": Db.breaker.snapshot(),
+        }
+
+
+connection_supervisor = ConnectionSupervisor()
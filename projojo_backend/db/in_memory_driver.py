@@ -0,0 +1,432 @@
+"""
+In-process stand-in for the TypeDB driver, for benchmarks, load tests and concurrency tests
+that must run without a TypeDB server (on a laptop or CI box, without network).
+
+It implements the subset of the `typedb.driver` API that `Db` uses: `driver.transaction()`,
+`tx.query(...).resolve()`, `tx.commit()`, `tx.close()`, `driver.databases` and `driver.close()`.
+
+It does not interpret TypeQL in general:
+- Schema queries (`define`) are parsed for the type hierarchy only (`entity student sub user`).
+- Write queries that are a plain `insert` (no `match`), like seed.tql, are parsed and applied to
+  an in-memory graph on commit. Other write queries are recorded and passed to the handlers.
+- Read queries are answered by handlers registered with `on(pattern, handler)`, which can
+  compute their rows from the graph.
+
+Every query can be given an artificial latency, so timings look like a real (remote) database.
+
+Usage:
+```python
+driver = InMemoryDriver(latency=0.002)
+Db.use_driver(driver)
+create_database_if_needed()  # installs schema.tql and seed.tql through the normal code path
+
+driver.on(r"match \\$skill isa skill, has id \\$id; fetch", lambda query, graph, match: [
+    {"id": skill.get("id"), "name": skill.get("name"), "isPending": skill.get("isPending")}
+    for skill in graph.things("skill")
+])
+skills = SkillRepository().get_all()
+```
+"""
+import itertools
+import re
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+from typedb.driver import TransactionType
+
+Rows = Iterable[dict[str, Any]]
+Handler = Callable[[str, "InMemoryGraph", re.Match], Rows | None]
+
+_TOKEN = re.compile(r'''
+    (?P<comment>\#[^\n]*)
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<datetime>\d{4}-\d{2}-\d{2}T[0-9:.]+(?:Z|[+-]\d{2}:?\d{2})?)
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<variable>\$[A-Za-z_][\w-]*)
+  | (?P<word>[A-Za-z_][\w-]*)
+  | (?P<punct>[(),:;])
+  | (?P<space>\s+)
+''', re.VERBOSE)
+
+_TYPE_DECLARATION = re.compile(r'\b(entity|relation|attribute)\s+([A-Za-z_][\w-]*)(?:\s+sub\s+([A-Za-z_][\w-]*))?')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(query: str) -> str:
+    """Collapse whitespace, so handler patterns do not depend on indentation."""
+    return _WHITESPACE.sub(' ', query).strip()
+
+
+def _tokenize(text: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"Unsupported TypeQL near: {text[position:position + 40]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        if kind not in ("comment", "space"):
+            tokens.append((kind, match.group()))
+    return tokens
+
+
+def _value(kind: str, token: str) -> Any:
+    if kind == "string":
+        return token[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    if kind == "number":
+        return float(token) if "." in token else int(token)
+    if kind == "datetime":
+        return token
+    if kind == "word" and token in ("true", "false"):
+        return token == "true"
+    raise ValueError(f"Unsupported attribute value: {token!r}")
+
+
+def parse_insert(query: str) -> list[dict[str, Any]]:
+    """
+    Parse a plain `insert` query of the form used in seed.tql:
+
+        insert
+            $b1 isa business, has id "...", has name "...";
+            $h1 isa hasProjects (business: $b1, project: $p1), has createdAt 2025-01-15T09:00:00+0000;
+
+    Returns:
+        One dict per statement: {"var", "type", "roles": {role: [var, ...]}, "attributes": [(name, value)]}
+    """
+    tokens = _tokenize(query)
+    if not tokens or tokens[0] != ("word", "insert"):
+        raise ValueError("Only plain insert queries can be applied")
+
+    statements = []
+    position = 1
+
+    def expect(kind: str, value: str | None = None) -> str:
+        nonlocal position
+        token_kind, token = tokens[position]
+        if token_kind != kind or (value is not None and token != value):
+            raise ValueError(f"Expected {value or kind}, got {token!r}")
+        position += 1
+        return token
+
+    while position < len(tokens):
+        statement: dict[str, Any] = {"var": expect("variable"), "roles": {}, "attributes": []}
+        expect("word", "isa")
+        statement["type"] = expect("word")
+
+        if tokens[position] == ("punct", "("):
+            position += 1
+            while tokens[position] != ("punct", ")"):
+                role = expect("word")
+                expect("punct", ":")
+                statement["roles"].setdefault(role, []).append(expect("variable"))
+                if tokens[position] == ("punct", ","):
+                    position += 1
+            position += 1
+
+        while tokens[position] == ("punct", ","):
+            position += 1
+            expect("word", "has")
+            name = expect("word")
+            kind, token = tokens[position]
+            position += 1
+            statement["attributes"].append((name, _value(kind, token)))
+
+        expect("punct", ";")
+        statements.append(statement)
+    return statements
+
+
+class Thing:
+    """An entity or relation instance in the in-memory graph."""
+
+    __slots__ = ("iid", "type", "attributes", "roles")
+
+    def __init__(self, iid: int, type: str):
+        self.iid = iid
+        self.type = type
+        self.attributes: dict[str, list[Any]] = {}
+        self.roles: dict[str, list["Thing"]] = {}
+
+    def get(self, attribute: str, default: Any = None) -> Any:
+        """First value of an attribute (TypeDB attributes can have several values)."""
+        values = self.attributes.get(attribute)
+        return values[0] if values else default
+
+    def player(self, role: str) -> "Thing | None":
+        players = self.roles.get(role)
+        return players[0] if players else None
+
+    def __repr__(self) -> str:
+        return f"Thing({self.type}, id={self.get('id', self.iid)})"
+
+
+class InMemoryGraph:
+    """Instances and type hierarchy held by the in-memory driver, thread-safe for use by handlers."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.supertypes: dict[str, str | None] = {}
+        self._things: dict[str, list[Thing]] = {}
+        self._iids = itertools.count(1)
+
+    def define(self, schema: str) -> None:
+        """Register the types of a `define` query (only `entity/relation/attribute X [sub Y]` is used)."""
+        with self.lock:
+            for _, name, supertype in _TYPE_DECLARATION.findall(schema):
+                self.supertypes[name] = supertype or None
+
+    def subtypes(self, type_name: str) -> set[str]:
+        """The type and all its (transitive) subtypes."""
+        result = {type_name}
+        changed = True
+        while changed:
+            changed = False
+            for name, supertype in self.supertypes.items():
+                if supertype in result and name not in result:
+                    result.add(name)
+                    changed = True
+        return result
+
+    def insert(self, statements: list[dict[str, Any]]) -> list[Thing]:
+        """Insert parsed statements (see `parse_insert`); variables refer to things of the same query."""
+        with self.lock:
+            variables: dict[str, Thing] = {}
+            inserted = []
+            for statement in statements:
+                thing = Thing(next(self._iids), statement["type"])
+                for name, value in statement["attributes"]:
+                    thing.attributes.setdefault(name, []).append(value)
+                for role, players in statement["roles"].items():
+                    try:
+                        thing.roles[role] = [variables[player] for player in players]
+                    except KeyError as e:
+                        raise ValueError(f"Unknown variable {e.args[0]} in {statement['var']}")
+                variables[statement["var"]] = thing
+                self._things.setdefault(thing.type, []).append(thing)
+                inserted.append(thing)
+            return inserted
+
+    def add(self, type_name: str, roles: dict[str, Thing] | None = None, **attributes: Any) -> Thing:
+        """Add one entity or relation, e.g. from a write handler."""
+        with self.lock:
+            thing = Thing(next(self._iids), type_name)
+            for name, value in attributes.items():
+                thing.attributes[name] = [value]
+            for role, player in (roles or {}).items():
+                thing.roles[role] = [player]
+            self._things.setdefault(type_name, []).append(thing)
+            return thing
+
+    def things(self, type_name: str, **attributes: Any) -> list[Thing]:
+        """All instances of a type (including subtypes), optionally filtered on attribute values."""
+        with self.lock:
+            result = [
+                thing
+                for name in self.subtypes(type_name)
+                for thing in self._things.get(name, [])
+            ]
+        if attributes:
+            result = [
+                thing for thing in result
+                if all(value in thing.attributes.get(name, []) for name, value in attributes.items())
+            ]
+        return result
+
+    def find(self, type_name: str, **attributes: Any) -> Thing | None:
+        """The first instance of a type with the given attribute values, or None."""
+        things = self.things(type_name, **attributes)
+        return things[0] if things else None
+
+    def relations(self, type_name: str, **players: Thing) -> list[Thing]:
+        """Relations of a type in which the given things play the given roles."""
+        return [
+            relation for relation in self.things(type_name)
+            if all(thing in relation.roles.get(role, []) for role, thing in players.items())
+        ]
+
+    def delete(self, thing: Thing) -> None:
+        with self.lock:
+            things = self._things.get(thing.type, [])
+            if thing in things:
+                things.remove(thing)
+
+
+class _Answer:
+    def __init__(self, rows: list[dict[str, Any]]):
+        self._rows = rows
+
+    def resolve(self) -> Iterator[dict[str, Any]]:
+        return iter(self._rows)
+
+
+class InMemoryTransaction:
+    def __init__(self, driver: "InMemoryDriver", database: str, transaction_type: TransactionType):
+        self.driver = driver
+        self.database = database
+        self.type = transaction_type
+        self._open = True
+        self._pending: list[Callable[[], Any]] = []
+        self.queries: list[str] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def is_open(self) -> bool:
+        return self._open
+
+    def close(self) -> None:
+        # Uncommitted writes are dropped, as in TypeDB
+        self._open = False
+        self._pending.clear()
+
+    def query(self, query: str) -> _Answer:
+        if not self._open:
+            raise RuntimeError("The transaction is closed")
+        self.driver._sleep(self.driver.latency)
+        self.queries.append(query)
+        self.driver._record(self.type, query)
+
+        if self.type == TransactionType.SCHEMA:
+            self._pending.append(lambda: self.driver.graph.define(query))
+            return _Answer([])
+
+        normalized = normalize(query)
+        if self.type == TransactionType.WRITE:
+            if normalized.startswith("insert "):
+                statements = parse_insert(query)
+                self._pending.append(lambda: self.driver.graph.insert(statements))
+            else:
+                handler = self.driver._handler_for(normalized)
+                if handler is not None:
+                    self._pending.append(lambda: handler(normalized))
+            return _Answer([])
+
+        handler = self.driver._handler_for(normalized)
+        if handler is None:
+            if self.driver.strict:
+                raise LookupError(f"No in-memory handler for query: {normalized[:200]}")
+            return _Answer([])
+        return _Answer([dict(row) for row in handler(normalized) or []])
+
+    def commit(self) -> None:
+        if not self._open:
+            raise RuntimeError("The transaction is closed")
+        self.driver._sleep(self.driver.commit_latency)
+        with self.driver.graph.lock:
+            for apply in self._pending:
+                apply()
+        self.driver._record_commit(self.queries)
+        self._pending.clear()
+        self._open = False
+
+
+class _Database:
+    def __init__(self, driver: "InMemoryDriver", name: str):
+        self.driver = driver
+        self.name = name
+
+    def delete(self) -> None:
+        self.driver._databases.pop(self.name, None)
+        self.driver.graph = InMemoryGraph()
+
+
+class _Databases:
+    def __init__(self, driver: "InMemoryDriver"):
+        self.driver = driver
+
+    def contains(self, name: str) -> bool:
+        return name in self.driver._databases
+
+    def get(self, name: str) -> _Database:
+        return self.driver._databases[name]
+
+    def create(self, name: str) -> None:
+        self.driver._databases[name] = _Database(self.driver, name)
+
+
+class InMemoryDriver:
+    """
+    Stand-in for `TypeDB.driver(...)`, plug it in with `Db.use_driver(driver)`.
+
+    Args:
+        latency: Seconds every query takes (blocks the calling thread, like the real driver)
+        commit_latency: Seconds every commit takes
+        strict: Raise LookupError for read queries without a handler (otherwise they return no rows)
+    """
+
+    def __init__(self, latency: float = 0.0, commit_latency: float = 0.0, strict: bool = False):
+        self.latency = latency
+        self.commit_latency = commit_latency
+        self.strict = strict
+        self.graph = InMemoryGraph()
+        self.databases = _Databases(self)
+        self._databases: dict[str, _Database] = {}
+        self._handlers: list[tuple[re.Pattern, Handler | list[dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+        self.query_log: list[tuple[TransactionType, str]] = []
+        self.commits: list[list[str]] = []
+        self.transactions_opened = 0
+        self._open = True
+
+    def on(self, pattern: str, handler: Handler | list[dict[str, Any]]) -> "InMemoryDriver":
+        """
+        Answer queries matching `pattern` (a regex searched in the whitespace-normalized query).
+
+        `handler` is either a fixed list of rows or a callable `(query, graph, match) -> rows`.
+        For write queries the callable runs on commit and its return value is ignored.
+        Handlers registered later take precedence.
+        """
+        with self._lock:
+            self._handlers.insert(0, (re.compile(pattern), handler))
+        return self
+
+    def transaction(self, database: str, transaction_type: TransactionType) -> InMemoryTransaction:
+        if not self._open:
+            raise RuntimeError("The driver is closed")
+        if database not in self._databases:
+            raise RuntimeError(f"Database '{database}' does not exist")
+        with self._lock:
+            self.transactions_opened += 1
+        return InMemoryTransaction(self, database, transaction_type)
+
+    def is_open(self) -> bool:
+        return self._open
+
+    def close(self) -> None:
+        self._open = False
+
+    def reset_log(self) -> None:
+        with self._lock:
+            self.query_log.clear()
+            self.commits.clear()
+            self.transactions_opened = 0
+
+    def _handler_for(self, normalized: str) -> Callable[[str], Rows | None] | None:
+        with self._lock:
+            handlers = list(self._handlers)
+        for pattern, handler in handlers:
+            match = pattern.search(normalized)
+            if match is None:
+                continue
+            if callable(handler):
+                return lambda query, handler=handler, match=match: handler(query, self.graph, match)
+            return lambda query, rows=handler: rows
+        return None
+
+    def _record(self, transaction_type: TransactionType, query: str) -> None:
+        with self._lock:
+            self.query_log.append((transaction_type, query))
+
+    def _record_commit(self, queries: list[str]) -> None:
+        with self._lock:
+            self.commits.append(list(queries))
+
+    @staticmethod
+    def _sleep(seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
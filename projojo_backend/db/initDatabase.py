@@ -1,15 +1,24 @@
-from typing import Any
+from typing import Any, Iterable, Iterator
 from typedb.driver import TypeDB, TransactionType, Credentials, DriverOptions
 import os
 import re
 import pprint
 from datetime import datetime, date
 import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
 from uuid import UUID
+from db.unit_of_work import get_unit_of_work
+from db.circuit_breaker import CircuitBreaker
+from db.metrics import db_metrics, query_caller
+from db.slow_query_log import slow_query_log
+from exceptions import DatabaseUnavailableException
 from config.settings import (
     env,
     TYPEDB_SERVER_ADDR, TYPEDB_NAME, TYPEDB_USERNAME,
-    TYPEDB_DEFAULT_PASSWORD, TYPEDB_NEW_PASSWORD, RESET_DB
+    TYPEDB_DEFAULT_PASSWORD, TYPEDB_NEW_PASSWORD, RESET_DB,
+    TYPEDB_BREAKER_FAILURE_THRESHOLD, TYPEDB_BREAKER_RESET_TIMEOUT
 )
 
 class Db:
@@ -24,7 +33,14 @@ class Db:
     seed_path = os.path.join(base_path, "seed.tql")
     driver: Any | None = None
     db: Any | None = None
+    # The password of the last successful connection, used by `reconnect`
+    connected_password: str | None = None
     _connection_established = False
+    # Set once SCHEMA_MIGRATIONS were applied (or the database was created with the current schema)
+    schema_migrated = False
+    # Set while the ConnectionSupervisor runs: it owns reconnecting, requests never retry themselves
+    supervised = False
+    breaker = CircuitBreaker(TYPEDB_BREAKER_FAILURE_THRESHOLD, TYPEDB_BREAKER_RESET_TIMEOUT)
 
     @staticmethod
     def initialize_connection():
@@ -39,6 +55,7 @@ class Db:
         try:
             print(f"Trying new credentials... {Db.username}:{Db.new_password}")
             Db.driver = TypeDB.driver(Db.address, Credentials(Db.username, Db.new_password), DriverOptions(False, None))
+            Db.connected_password = Db.new_password
             print("✓ Connected with new credentials - password is already correct")
             
         except Exception as new_cred_error:
@@ -57,6 +74,7 @@ class Db:
             
             try:
                 Db.driver = TypeDB.driver(Db.address, Credentials(Db.username, Db.default_password), DriverOptions(False, None))
+                Db.connected_password = Db.default_password
                 print("✓ Connected with default credentials")
                 
                 # Update password if default and new are different
@@ -71,6 +89,7 @@ class Db:
                             # Reconnect with new password
                             Db.driver.close()
                             Db.driver = TypeDB.driver(Db.address, Credentials(Db.username, Db.new_password), DriverOptions(False, None))
+                            Db.connected_password = Db.new_password
                             print(f"✓ Reconnected with new credentials {Db.address}::{Db.username}:{Db.new_password}")
                         else:
                             print("⚠ Could not get current user for password update")
@@ -85,20 +104,77 @@ class Db:
                 raise Exception(f"Could not establish TypeDB connection with either default or new credentials for user '{Db.username}'")
 
 
+    @staticmethod
+    def is_connected() -> bool:
+        return Db._connection_established and Db.driver is not None
+
+    @staticmethod
+    def connect():
+        """Make a single connection attempt (no retries), raises if TypeDB cannot be reached"""
+        Db.initialize_connection()
+        Db._open_database()
+
+    @staticmethod
+    def reconnect():
+        """
+        Connect again after the connection was lost, with the credentials that worked before.
+
+        Used by the ConnectionSupervisor on every check while TypeDB is down, so unlike
+        `initialize_connection` it does not try other credentials, update the password or print
+        the environment (which contains the credentials and other secrets).
+        """
+        if Db.connected_password is None:
+            # Never connected in this process, so the credentials still have to be worked out
+            Db.connect()
+            return
+        Db.close()
+        Db.driver = TypeDB.driver(Db.address, Credentials(Db.username, Db.connected_password), DriverOptions(False, None))
+        Db._open_database()
+
+    @staticmethod
+    def _open_database():
+        assert Db.driver is not None
+        Db.db = Db.driver.databases.get(Db.name) if Db.driver.databases.contains(Db.name) else None
+        Db._connection_established = True
+
+    @staticmethod
+    def use_driver(driver: Any):
+        """
+        Use an already created driver instead of connecting to the TypeDB server,
+        e.g. the in-memory stand-in from `db/in_memory_driver.py` for benchmarks and tests.
+        """
+        if Db.driver is not None and Db.driver is not driver:
+            Db.driver.close()
+        Db.driver = driver
+        Db.db = driver.databases.get(Db.name) if driver.databases.contains(Db.name) else None
+        Db._connection_established = True
+
+    @staticmethod
+    def probe():
+        """Health probe: one round trip to the server, raises if the database is not reachable"""
+        assert Db.driver is not None
+        if not Db.driver.databases.contains(Db.name):
+            raise Exception(f"Database '{Db.name}' does not exist")
+
     @staticmethod
     def ensure_connection(max_retries=10, initial_delay=1):
-        """Connect to TypeDB with retry logic and exponential backoff"""
-        if Db._connection_established and Db.driver is not None:
+        """
+        Connect to TypeDB with retry logic and exponential backoff.
+
+        The blocking retries are meant for startup and scripts. While the ConnectionSupervisor
+        runs it owns reconnecting, so this fails fast with DatabaseUnavailableException
+        instead of sleeping inside a request.
+        """
+        if Db.is_connected():
             return  # Already connected
+        if Db.supervised:
+            raise DatabaseUnavailableException()
 
         delay = initial_delay
         for attempt in range(max_retries):
             try:
                 print(f"Attempting to connect to TypeDB at {Db.address} (attempt {attempt + 1}/{max_retries})...")
-                Db.initialize_connection()
-                assert Db.driver is not None
-                Db.db = Db.driver.databases.get(Db.name) if Db.driver.databases.contains(Db.name) else None
-                Db._connection_established = True
+                Db.connect()
                 print("Successfully connected to TypeDB!")
                 return
             except Exception as e:
@@ -130,12 +206,15 @@ class Db:
             tx.commit()
 
     @staticmethod
-    def read_transact(query: str, params: dict[str, Any] | None = None, sort_fields: bool = True):
+    def read_transact(query: "str | CompiledQuery", params: dict[str, Any] | None = None, sort_fields: bool = True):
         """
         Execute a read transaction.
 
+        Inside a request the query runs on the request's shared read transaction
+        (see `UnitOfWork`), otherwise a new read transaction is opened for this query.
+
         Args:
-            query: TypeQL query string or template with ~param placeholders
+            query: TypeQL query string, template with ~param placeholders or CompiledQuery
             params: Optional dictionary of parameters to safely interpolate.
                     None values will raise ValueError (use negation patterns instead).
             sort_fields: Whether to sort result dictionary keys
@@ -146,36 +225,162 @@ class Db:
         Raises:
             ValueError: If any parameter value is None
         """
-        Db.ensure_connection()
-        if params:
-            query = build_query(query, params, allow_none=False)
-        assert Db.driver is not None
-        with Db.driver.transaction(Db.name, TransactionType.READ) as tx:
-            results = list(tx.query(query).resolve())
+        template = query
+        query = build_query(query, params, allow_none=False) if params else str(query)
+        unit_of_work = get_unit_of_work()
+        with Db._instrument("read", template) as observation:
+            if unit_of_work is not None:
+                results = unit_of_work.read(query, Db._open_read_transaction)
+            else:
+                with Db._open_read_transaction() as tx:
+                    results = list(tx.query(query).resolve())
+            observation["rows"] = len(results)
+
+        # Sort dictionaries by key for consistent output order if requested
+        if sort_fields:
+            results = [dict(sorted(item.items())) for item in results]
+
+        return results
+
+    @staticmethod
+    def read_stream(query: "str | CompiledQuery", params: dict[str, Any] | None = None, sort_fields: bool = True) -> Iterator[dict[str, Any]]:
+        """
+        Execute a read transaction and yield the results one by one while the transaction is open.
+
+        Unlike `read_transact` the results are never collected in a list, so memory use does not
+        grow with the size of the result and the first row is available as soon as TypeDB sends it.
+        The stream always uses its own read transaction, which is closed when the iteration ends
+        or when the generator is closed early (e.g. `break` or `close()`).
+
+        Args:
+            query: TypeQL query string, template with ~param placeholders or CompiledQuery
+            params: Optional dictionary of parameters to safely interpolate (None is not allowed)
+            sort_fields: Whether to sort the keys of each result dictionary
+
+        Yields:
+            Query results, one at a time
+        """
+        template = query
+        query = build_query(query, params, allow_none=False) if params else str(query)
+        # The caller is looked up now: the generator body only runs when the stream is first advanced,
+        # possibly on an executor thread (AsyncDb.iterate) where the repository method is no longer on the stack
+        return Db._stream(query, template, sort_fields, query_caller())
+
+    @staticmethod
+    def _stream(query: str, template: "str | CompiledQuery", sort_fields: bool, caller: str) -> Iterator[dict[str, Any]]:
+        # The measured time includes the time the consumer spends between rows
+        with Db._instrument("stream", template, caller) as observation, Db._open_read_transaction() as tx:
+            for result in tx.query(query).resolve():
+                observation["rows"] += 1
+                yield dict(sorted(result.items())) if sort_fields else result
 
-            # Sort dictionaries by key for consistent output order if requested
-            if sort_fields:
-                results = [dict(sorted(item.items())) for item in results]
+    @staticmethod
+    @contextmanager
+    def _instrument(operation: str, template: "str | CompiledQuery | list", caller: str | None = None) -> Iterator[dict[str, int]]:
+        """
+        Measure one database call. Latency, rows and errors are recorded in `db_metrics`,
+        labelled with the repository method that made the call (see `query_caller`).
+        Calls slower than the configured threshold also go to the slow-query log.
+
+        The caller sets `observation["rows"]` on the yielded dict.
+
+        Args:
+            operation: "read", "stream" or "write"
+            template: The query template(s) before parameters were filled in, used for the fingerprint
+            caller: The method that made the call, when it is no longer on the stack (streams)
+        """
+        observation = {"rows": 0}
+        name = caller or query_caller()
+        started = time.perf_counter()
+        error = False
+        try:
+            yield observation
+        except GeneratorExit:
+            # A stream that is closed early is not an error
+            raise
+        except BaseException:
+            error = True
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            db_metrics.observe(operation, name, seconds, observation["rows"], error)
+            if slow_query_log.is_slow(seconds):
+                unit_of_work = get_unit_of_work()
+                templates = template if isinstance(template, list) else [template]
+                slow_query_log.record(
+                    "\n".join(str(t) for t in templates), operation, name, seconds, observation["rows"],
+                    unit_of_work.request_path if unit_of_work else None, error
+                )
+
+    @staticmethod
+    def _open_read_transaction():
+        return Db._open_transaction(TransactionType.READ)
 
-            return results
+    @staticmethod
+    def _open_transaction(transaction_type: TransactionType):
+        """Open a transaction through the circuit breaker, fails fast while TypeDB is unreachable"""
+        Db.breaker.before_call()
+        try:
+            Db.ensure_connection()
+            assert Db.driver is not None
+            tx = Db.driver.transaction(Db.name, transaction_type)
+        except Exception as e:
+            Db.breaker.record_failure(e)
+            raise
+        Db.breaker.record_success()
+        return tx
 
     @staticmethod
-    def write_transact(query: str, params: dict[str, Any] | None = None):
+    def write_transact(query: "str | CompiledQuery", params: dict[str, Any] | None = None):
         """
         Execute a write transaction.
 
         Args:
-            query: TypeQL query string or template with ~param placeholders
+            query: TypeQL query string, template with ~param placeholders or CompiledQuery
             params: Optional dictionary of parameters to safely interpolate.
                     None values will remove the containing clause (for optional attributes).
         """
-        Db.ensure_connection()
-        if params:
-            query = build_query(query, params, allow_none=True)
-        assert Db.driver is not None
-        with Db.driver.transaction(Db.name, TransactionType.WRITE) as tx:
-            tx.query(query).resolve()
+        Db.write_batch([(query, params)])
+
+    @staticmethod
+    def write_batch(statements: Iterable[tuple["str | CompiledQuery", dict[str, Any] | None]]):
+        """
+        Execute several write queries in one write transaction with a single commit.
+
+        The statements run in the given order, so later statements see the changes of earlier
+        ones. Either all statements are committed or, if one of them fails, none of them.
+
+        Usage:
+        ```python
+        Db.write_batch([
+            (add_query, {"student_id": student_id, "skill_id": "a"}),
+            (remove_query, {"student_id": student_id, "skill_id": "b"}),
+        ])
+        ```
+
+        Args:
+            statements: (query, params) pairs, see `write_transact`
+        """
+        statements = list(statements)
+        # Build every query before opening the transaction, so invalid parameters fail early
+        queries = [
+            build_query(query, params, allow_none=True) if params else str(query)
+            for query, params in statements
+        ]
+        if not queries:
+            return
+
+        templates = [template for template, _ in statements]
+        with Db._instrument("write", templates) as observation, Db._open_transaction(TransactionType.WRITE) as tx:
+            for query in queries:
+                tx.query(query).resolve()
             tx.commit()
+            observation["rows"] = len(queries)
+
+        # Make sure later reads in this request see the write
+        unit_of_work = get_unit_of_work()
+        if unit_of_work is not None:
+            unit_of_work.after_write()
 
     @staticmethod
     def close():
@@ -290,14 +495,121 @@ def _remove_none_clauses(template: str, none_params: list[str]) -> str:
     return result
 
 
-def build_query(template: str, params: dict[str, Any], allow_none: bool = False) -> str:
+# Matches ~param_name placeholders in query templates
+PLACEHOLDER_PATTERN = re.compile(r'~([a-zA-Z_][a-zA-Z0-9_]*)')
+
+
+class CompiledQuery:
+    """
+    A query template that has been parsed once and can be rendered many times.
+
+    Parsing splits the template into literal text and ~param_name placeholders and
+    validates that every placeholder is unique. Rendering is then a single pass that
+    joins the literals with the formatted parameter values, instead of running one
+    regex substitution per parameter on every call.
+
+    Templates with optional (None) parameters are derived once per combination of
+    None parameters, with the containing clauses removed (see `_remove_none_clauses`).
+
+    Usage:
+    ```python
+    GET_TASK = CompiledQuery("match $task isa task, has id ~id; fetch { 'name': $task.name };")
+
+    results = Db.read_transact(GET_TASK, {"id": task_id})
+    ```
+    """
+    __slots__ = ("template", "placeholders", "_literals", "_names", "_without_none")
+
+    def __init__(self, template: str):
+        self.template = template
+
+        literals = []
+        names = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(template):
+            literals.append(template[position:match.start()])
+            names.append(match.group(1))
+            position = match.end()
+        literals.append(template[position:])
+
+        self.placeholders = frozenset(names)
+        if len(names) != len(self.placeholders):
+            duplicates = sorted(name for name, count in Counter(names).items() if count > 1)
+            raise ValueError(
+                f"Duplicate placeholders in template: {duplicates}. "
+                "Each placeholder must appear exactly once."
+            )
+
+        self._literals = tuple(literals)
+        self._names = tuple(names)
+        self._without_none: dict[frozenset[str], CompiledQuery] = {}
+
+    def __str__(self) -> str:
+        return self.template
+
+    def render(self, params: dict[str, Any], allow_none: bool = False) -> str:
+        """
+        Render the template with the given parameters, see `build_query`.
+        """
+        if params.keys() != self.placeholders:
+            param_keys = set(params.keys())
+            if unused_params := param_keys - self.placeholders:
+                raise ValueError(
+                    f"Unused parameters: {sorted(unused_params)}. "
+                    "All params must correspond to placeholders in the template."
+                )
+            if missing_params := self.placeholders - param_keys:
+                raise ValueError(f"Missing parameters: {sorted(missing_params)}")
+
+        none_params = [k for k, v in params.items() if v is None]
+        if not none_params:
+            return self._render(params)
+
+        if not allow_none:
+            raise ValueError(
+                f"Cannot use None in read queries. Parameters with None: {none_params}. "
+                "TypeQL has no null literal. Use negation patterns to match absent attributes: "
+                "not {{ $x has attr $v; }};"
+            )
+
+        # For write queries, None values remove the clause
+        key = frozenset(none_params)
+        without_none = self._without_none.get(key)
+        if without_none is None:
+            without_none = CompiledQuery(_remove_none_clauses(self.template, none_params))
+            self._without_none[key] = without_none
+        return without_none._render(params)
+
+    def _render(self, params: dict[str, Any]) -> str:
+        literals = self._literals
+        parts = [literals[0]]
+        for index, name in enumerate(self._names, start=1):
+            value = params.get(name)
+            # A placeholder without a value is left untouched (its clause could not be removed)
+            parts.append(format_value(value) if value is not None else f"~{name}")
+            parts.append(literals[index])
+        return "".join(parts)
+
+
+@lru_cache(maxsize=1024)
+def compile_query(template: str) -> CompiledQuery:
+    """
+    Get the compiled form of a query template, compiling it only on first use.
+
+    Repository templates are static strings, so every template is parsed once per process.
+    """
+    return CompiledQuery(template)
+
+
+def build_query(template: "str | CompiledQuery", params: dict[str, Any], allow_none: bool = False) -> str:
     """
     Build a TypeQL query from a template and parameters.
 
     Replaces ~param_name placeholders with properly formatted and sanitized values.
+    String templates are compiled once and cached (see `CompiledQuery`).
 
     Args:
-        template: Query template with ~param_name placeholders
+        template: Query template with ~param_name placeholders, or a CompiledQuery
         params: Dictionary of parameter names to values
         allow_none: If True, None values remove the containing clause (for writes).
                     If False, None values raise ValueError (for reads).
@@ -311,62 +623,53 @@ def build_query(template: str, params: dict[str, Any], allow_none: bool = False)
                     if duplicate placeholders exist,
                     or if params contains keys not used in template
     """
-    # Validate placeholders and parameters
-    placeholders = re.findall(r'~([a-zA-Z_][a-zA-Z0-9_]*)', template)
-    unique_placeholders = set(placeholders)
-    param_keys = set(params.keys())
-
-    if len(placeholders) != len(unique_placeholders):
-        duplicates = sorted({p for p in placeholders if placeholders.count(p) > 1})
-        raise ValueError(
-            f"Duplicate placeholders in template: {duplicates}. "
-            "Each placeholder must appear exactly once."
-        )
+    compiled = template if isinstance(template, CompiledQuery) else compile_query(template)
+    return compiled.render(params, allow_none)
 
-    if unused_params := param_keys - unique_placeholders:
-        raise ValueError(
-            f"Unused parameters: {sorted(unused_params)}. "
-            "All params must correspond to placeholders in the template."
-        )
-
-    if missing_params := unique_placeholders - param_keys:
-        raise ValueError(f"Missing parameters: {sorted(missing_params)}")
-
-    # Handle None values based on allow_none flag
-    none_params = [k for k, v in params.items() if v is None]
-
-    if none_params and not allow_none:
-        raise ValueError(
-            f"Cannot use None in read queries. Parameters with None: {none_params}. "
-            "TypeQL has no null literal. Use negation patterns to match absent attributes: "
-            "not {{ $x has attr $v; }};"
-        )
+def get_database():
+    Db.ensure_connection()
+    create_database_if_needed()
+    return Db
 
-    # For write queries, None values remove the clause
-    regular_params = {k: v for k, v in params.items() if v is not None}
+# Schema changes made after databases were already deployed: schema.tql is only installed when the
+# database is created, so existing databases get these on startup. Each one must be idempotent
+# (in TypeDB 3 a `define` of something that already exists in the same way changes nothing).
+SCHEMA_MIGRATIONS = [
+    ("task registration counters", """
+        define
+            attribute totalRegistered value integer;
+            attribute totalAccepted value integer;
+            task owns totalRegistered @card(0..1);
+            task owns totalAccepted @card(0..1);
+    """),
+]
 
-    # First, remove clauses for None params (only when allow_none=True)
-    result = _remove_none_clauses(template, none_params) if none_params else template
 
-    # Then substitute regular params
-    for key, value in regular_params.items():
-        formatted_value = format_value(value)
-        # Use word boundary to avoid partial replacements (e.g., ~id vs ~id_name)
-        result = re.sub(rf'~{re.escape(key)}(?![a-zA-Z0-9_])', formatted_value, result)
+def migrate_schema():
+    """Apply SCHEMA_MIGRATIONS to an existing database, then fill in the data the new types need"""
+    for name, query in SCHEMA_MIGRATIONS:
+        print(f"Migrating schema: {name}", end="... ")
+        Db.schema_transact(query)
+        print("OK")
 
-    return result
+    # Tasks created before the registration counters existed get them now, before any request
+    # reads them (the RegistrationCounterReconciler only repairs drift, and may be turned off)
+    from domain.repositories.task_repository import TaskRepository  # the repositories import this module
+    print("Initializing registration counters", end="... ")
+    initialized = TaskRepository().reconcile_registration_counters()
+    print(f"OK ({initialized} task(s) updated)")
 
-def get_database():
-    Db.ensure_connection()
-    create_database_if_needed()
-    return Db
 
 def create_database_if_needed():
     Db.ensure_connection()
     if Db.reset and Db.db is not None:
         Db.db.delete()
         Db.db = None
-    if Db.db is None:
+    if Db.db is not None:
+        if not Db.schema_migrated:
+            # Before anything (e.g. the RegistrationCounterReconciler) queries the newer types
+            migrate_schema()
+    else:
         print(f"Creating a new database: {Db.name}")
         if Db.driver is not None:  # Additional safety check
             Db.driver.databases.create(Db.name)
@@ -385,6 +688,7 @@ def create_database_if_needed():
                 tx.commit()
             print("OK")
     Db.reset = False     # prevent re-creating the database again
+    Db.schema_migrated = True
 
 
 # Sample queries for testing database connectivity and schema
@@ -0,0 +1,103 @@
+import contextlib
+import os
+import sys
+import threading
+from typing import Any
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Frames in these files are database plumbing, the caller is the first frame outside of them
+_DB_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+_HELPER_FILES = {contextlib.__file__}
+
+
+def register_query_helper(filename: str) -> None:
+    """
+    Skip the frames of a module when looking up the caller of a query, for shared helpers that
+    run queries on behalf of repository methods (e.g. `read_page`), call with `__file__`.
+    """
+    _HELPER_FILES.add(os.path.abspath(filename))
+
+
+def query_caller(depth: int = 1) -> str:
+    """
+    Name of the method that issued the current query, e.g. "SkillRepository.get_all".
+
+    Walks up the stack to the first frame outside the db package, the registered helper modules
+    and lambdas, so the name is the repository (or service) method no matter how many
+    Db/AsyncDb helpers, paginators or cache loaders are in between.
+    """
+    frame = sys._getframe(depth)
+    while frame is not None:
+        code = frame.f_code
+        if (not code.co_filename.startswith(_DB_DIR) and code.co_filename not in _HELPER_FILES
+                and code.co_name != "<lambda>"):
+            return code.co_qualname
+        frame = frame.f_back
+    return "unknown"
+
+
+class _Series:
+    __slots__ = ("bucket_counts", "count", "total_seconds", "rows", "errors")
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.rows = 0
+        self.errors = 0
+
+
+class QueryMetrics:
+    """
+    Thread-safe latency histograms, row counts and error counts per (operation, query name).
+
+    Filled by `Db._instrument` for every read, streamed read and write batch.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str], _Series] = {}
+
+    def observe(self, operation: str, name: str, seconds: float, rows: int, error: bool) -> None:
+        with self._lock:
+            series = self._series.get((operation, name))
+            if series is None:
+                series = self._series[(operation, name)] = _Series()
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    series.bucket_counts[index] += 1
+                    break
+            series.count += 1
+            series.total_seconds += seconds
+            series.rows += rows
+            if error:
+                series.errors += 1
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """All series, with cumulative bucket counts (as in the Prometheus histogram format)."""
+        with self._lock:
+            snapshot = []
+            for (operation, name), series in sorted(self._series.items()):
+                cumulative, buckets = 0, []
+                for bound, count in zip(LATENCY_BUCKETS, series.bucket_counts):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+                snapshot.append({
+                    "operation": operation,
+                    "query": name,
+                    "buckets": buckets,
+                    "count": series.count,
+                    "sum": series.total_seconds,
+                    "rows": series.rows,
+                    "errors": series.errors,
+                })
+            return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+db_metrics = QueryMetrics()
@@ -0,0 +1,139 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+from config.settings import SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_LOG_SIZE
+
+logger = logging.getLogger('uvicorn.error')
+
+_STRING_LITERAL = re.compile(r'"(?:[^"\\]|\\.)*"')
+_NUMBER_LITERAL = re.compile(r'(?<![\w$~.-])-?\d+(?:\.\d+)?(?![\w.])')
+_PLACEHOLDER = re.compile(r'~[A-Za-z_][A-Za-z0-9_]*')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(template: str) -> tuple[str, str]:
+    """
+    Normalize a TypeQL query template so that every execution of the same query groups together.
+
+    `~param` placeholders and literal strings/numbers become `?` and whitespace is collapsed,
+    so the fingerprint does not depend on parameter values or on how a query string was built.
+
+    Returns:
+        (short hash, normalized text)
+    """
+    normalized = _STRING_LITERAL.sub('?', template)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _WHITESPACE.sub(' ', normalized).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+class SlowQueryLog:
+    """
+    Logs every query slower than `threshold_ms` and keeps the most recent ones for aggregation.
+
+    Entries are grouped by fingerprint (see `fingerprint`), so `top()` shows which query shapes
+    are slow over a time window, which repository method issues them and from which request path.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, max_entries: int = SLOW_QUERY_LOG_SIZE):
+        self.threshold_ms = threshold_ms
+        self._entries: deque[dict[str, Any]] = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def is_slow(self, seconds: float) -> bool:
+        return self.enabled and seconds * 1000 >= self.threshold_ms
+
+    def record(self, template: str, operation: str, caller: str, seconds: float, rows: int,
+               request_path: str | None, error: bool = False) -> None:
+        """Record a query if it was slower than the threshold."""
+        if not self.is_slow(seconds):
+            return
+        duration_ms = seconds * 1000
+
+        query_id, normalized = fingerprint(template)
+        entry = {
+            "fingerprint": query_id,
+            "query": normalized,
+            "operation": operation,
+            "caller": caller,
+            "duration_ms": round(duration_ms, 1),
+            "rows": rows,
+            "error": error,
+            "request_path": request_path,
+            "at": time.time(),
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+        logger.warning(
+            f"Slow {operation} query {query_id} ({duration_ms:.0f} ms, {rows} rows) "
+            f"in {caller} for {request_path or '-'}: {normalized[:300]}"
+        )
+
+    def top(self, limit: int = 10, window_seconds: float = 3600) -> list[dict[str, Any]]:
+        """
+        Aggregate the slow queries of the last `window_seconds` per fingerprint,
+        ordered by total time spent (the queries that cost the most first).
+        """
+        since = time.time() - window_seconds
+        with self._lock:
+            entries = [entry for entry in self._entries if entry["at"] >= since]
+
+        groups: dict[str, dict[str, Any]] = {}
+        for entry in entries:
+            group = groups.get(entry["fingerprint"])
+            if group is None:
+                group = groups[entry["fingerprint"]] = {
+                    "fingerprint": entry["fingerprint"],
+                    "query": entry["query"],
+                    "operation": entry["operation"],
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "total_rows": 0,
+                    "errors": 0,
+                    "callers": set(),
+                    "request_paths": set(),
+                    "last_seen": 0.0,
+                }
+            group["count"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+            group["total_rows"] += entry["rows"]
+            group["errors"] += int(entry["error"])
+            group["callers"].add(entry["caller"])
+            if entry["request_path"]:
+                group["request_paths"].add(entry["request_path"])
+            group["last_seen"] = max(group["last_seen"], entry["at"])
+
+        result = []
+        for group in sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)[:limit]:
+            result.append({
+                **group,
+                "total_ms": round(group["total_ms"], 1),
+                "avg_ms": round(group["total_ms"] / group["count"], 1),
+                "avg_rows": round(group["total_rows"] / group["count"], 1),
+                "callers": sorted(group["callers"]),
+                "request_paths": sorted(group["request_paths"]),
+                "last_seen": datetime.fromtimestamp(group["last_seen"]).isoformat(),
+            })
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
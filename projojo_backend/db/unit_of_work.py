@@ -0,0 +1,138 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+# The unit of work of the current request (set by UnitOfWorkMiddleware)
+_current_unit_of_work: ContextVar["UnitOfWork | None"] = ContextVar("unit_of_work", default=None)
+
+
+def get_unit_of_work() -> "UnitOfWork | None":
+    """Get the unit of work of the current request, or None outside a request."""
+    return _current_unit_of_work.get()
+
+
+class UnitOfWork:
+    """
+    Request-scoped unit of work that shares one TypeDB read transaction between all reads.
+
+    The read transaction is opened lazily on the first read and reused by every following
+    read in the same request, so a request pays the transaction setup only once and all
+    reads see one consistent snapshot. After a write has been committed the read
+    transaction is closed, so later reads in the same request see their own writes.
+
+    It also keeps an identity map of the entities loaded in the request, so repositories can
+    return an entity that was already loaded instead of querying it again. Like the read
+    transaction, the identity map is cleared by every write.
+
+    `Db.read_transact` and `Db.write_transact` pick up the current unit of work automatically;
+    repositories do not need to know about it.
+    """
+
+    def __init__(self, request_path: str | None = None):
+        # Path of the HTTP request this unit of work belongs to (for logging)
+        self.request_path = request_path
+        self._read_tx: Any | None = None
+        # Reads from one request may run on different executor threads (or concurrently via gather)
+        self._lock = threading.RLock()
+        self.transactions_opened = 0
+        # Entities loaded in this request, keyed by (entity type, id)
+        self._identity_map: dict[tuple[str, str], Any] = {}
+
+    def read(self, query: str, open_read_transaction: Callable[[], Any]) -> list:
+        """Run a read query on the shared read transaction, opening it if needed."""
+        with self._lock:
+            if self._read_tx is None or not self._read_tx.is_open():
+                self._read_tx = open_read_transaction()
+                self.transactions_opened += 1
+            try:
+                return list(self._read_tx.query(query).resolve())
+            except Exception:
+                # A failed query may leave the transaction unusable, start fresh on the next read
+                self._close_read_transaction()
+                raise
+
+    def get_entity(self, entity_type: str, id: str) -> Any | None:
+        """Get an entity that was already loaded in this request, or None."""
+        with self._lock:
+            return self._identity_map.get((entity_type, id))
+
+    def add_entity(self, entity_type: str, id: str, entity: Any) -> None:
+        """Remember a loaded entity for the rest of this request."""
+        with self._lock:
+            self._identity_map[(entity_type, id)] = entity
+
+    def after_write(self) -> None:
+        """Called after a committed write: later reads must not use the old snapshot or entities."""
+        with self._lock:
+            self._close_read_transaction()
+            self._identity_map.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_read_transaction()
+            self._identity_map.clear()
+
+    @property
+    def has_open_transaction(self) -> bool:
+        return self._read_tx is not None
+
+    def _close_read_transaction(self) -> None:
+        if self._read_tx is None:
+            return
+        try:
+            if self._read_tx.is_open():
+                self._read_tx.close()
+        except Exception as e:
+            print(f"Error closing read transaction: {e}")
+        finally:
+            self._read_tx = None
+
+
+@contextmanager
+def unit_of_work() -> Iterator[UnitOfWork]:
+    """
+    Run a block of code in its own unit of work (e.g. in scripts or background jobs).
+
+    Usage:
+    ```python
+    with unit_of_work():
+        project = project_repo.get_by_id(project_id)
+        tasks = task_repo.get_tasks_by_project(project_id)
+    ```
+    """
+    uow = UnitOfWork()
+    token = _current_unit_of_work.set(uow)
+    try:
+        yield uow
+    finally:
+        _current_unit_of_work.reset(token)
+        uow.close()
+
+
+class UnitOfWorkMiddleware:
+    """
+    ASGI middleware that gives every HTTP request its own UnitOfWork.
+
+    Implemented as plain ASGI middleware (not BaseHTTPMiddleware) so the unit of work stays
+    alive until the response, including a streamed body, has been sent completely.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        uow = UnitOfWork(scope.get("path"))
+        token = _current_unit_of_work.set(uow)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_unit_of_work.reset(token)
+            if uow.has_open_transaction:
+                # Closing talks to the driver, keep it off the event loop
+                await asyncio.to_thread(uow.close)
@@ -3,4 +3,5 @@ from .business import Business, BusinessAssociation
 from .project import Project, ProjectCreation
 from .task import Task, TaskRegistration
 from .skill import Skill
-from .authentication import LoginRequest, LoginResponse
\ No newline at end of file
+from .authentication import LoginRequest, LoginResponse
+from .pagination import Page
\ No newline at end of file
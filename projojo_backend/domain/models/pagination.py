@@ -0,0 +1,12 @@
+from typing import Generic, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar('T')
+
+
+class Page(BaseModel, Generic[T]):
+    """One page of a list endpoint; pass `next_cursor` as `cursor` to get the next page."""
+    items: list[T]
+    next_cursor: str | None = None
+    # Only filled in when the client asks for it (include_total=true), counting costs an extra query
+    total: int | None = None
@@ -12,8 +12,8 @@ class Task(BaseModel):
     created_at: datetime
     project_id: str | None = None
     skills: list[Skill] | None = None
-    total_registered: int | None = None
-    total_accepted: int | None = None
+    total_registered: int = 0
+    total_accepted: int = 0
 
     class Config:
         from_attributes = True
@@ -1,6 +1,8 @@
-from typing import TypeVar, Generic, Any
+from typing import TypeVar, Generic, Any, Iterable
 from pydantic import BaseModel
-from db.initDatabase import Db
+from db.initDatabase import Db, CompiledQuery
+from db.unit_of_work import get_unit_of_work
+from .batch_loader import BatchLoader
 
 T = TypeVar('T', bound=BaseModel)
 
@@ -8,17 +10,35 @@ class BaseRepository(Generic[T]):
     def __init__(self, model_type: type[T], entity_type: str):
         self.model_type = model_type
         self.entity_type = entity_type
+        # The generic get_by_id query only depends on the entity type, so compile it once per repository
+        self._get_by_id_query = CompiledQuery(f"""
+            match
+                ${entity_type} isa {entity_type}, has id ~id;
+            get ${entity_type};
+        """)
+        # Shares the identity map entries of get_by_id, so entities loaded either way are reused
+        self._many_loader = BatchLoader(entity_type, self._load_many)
 
     def get_by_id(self, id: str) -> T | None:
-        query = f"""
-            match
-                ${self.entity_type} isa {self.entity_type}, has id ~id;
-            get ${self.entity_type};
-        """
-        results = Db.read_transact(query, {"id": id})
+        loaded = self._get_loaded(id)
+        if loaded is not None:
+            return loaded
+        results = Db.read_transact(self._get_by_id_query, {"id": id})
         if not results:
             return None
-        return self._map_to_model(results[0])
+        return self._remember(id, self._map_to_model(results[0]))
+
+    def get_many(self, ids: Iterable[str]) -> tuple[list[T], list[str]]:
+        """
+        Get several entities by id with one query, e.g. to validate a list of ids from a request.
+
+        Returns:
+            (the entities found, in the order of `ids`; the ids that do not exist)
+        """
+        loaded = self._many_loader.load_many(ids)
+        found = [entity for entity in loaded.values() if entity is not None]
+        missing = [id for id, entity in loaded.items() if entity is None]
+        return found, missing
 
     def get_all(self) -> list[T]:
         query = f"""
@@ -41,6 +61,27 @@ class BaseRepository(Generic[T]):
         # To be implemented in child classes due to specific delete requirements
         raise NotImplementedError("Delete method must be implemented by child classes")
 
+    def _get_loaded(self, id: str) -> T | None:
+        """
+        Get an entity of this repository that was already loaded in the current request.
+        Returns None outside a request or when the entity was not loaded (or a write happened since).
+        """
+        unit_of_work = get_unit_of_work()
+        if unit_of_work is None:
+            return None
+        return unit_of_work.get_entity(self.entity_type, id)
+
+    def _remember(self, id: str, entity: T) -> T:
+        """Add a loaded entity to the identity map of the current request and return it."""
+        unit_of_work = get_unit_of_work()
+        if unit_of_work is not None:
+            unit_of_work.add_entity(self.entity_type, id, entity)
+        return entity
+
+    def _load_many(self, ids: list[str]) -> dict[str, T]:
+        # To be implemented in child classes: one query for all ids, returning the entities found by id
+        raise NotImplementedError("_load_many method must be implemented by child classes")
+
     def _map_to_model(self, result: dict[str, Any]) -> T:
         # To be implemented in child classes for specific mapping
         raise NotImplementedError("_map_to_model method must be implemented by child classes")
\ No newline at end of file
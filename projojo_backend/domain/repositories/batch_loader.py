@@ -0,0 +1,76 @@
+from typing import Any, Callable, Generic, Hashable, Iterable, TypeVar
+from db.unit_of_work import get_unit_of_work
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+def any_of(variable: str, keys: list[Any], prefix: str = "key") -> tuple[str, dict[str, Any]]:
+    """
+    Build a TypeQL disjunction that matches `variable` against any of the keys, with its parameters.
+
+    Usage:
+    ```python
+    clause, params = any_of("$task_id", ["t1", "t2"])
+    # clause: '{ $task_id == ~key_0; } or { $task_id == ~key_1; };'
+    # params: {'key_0': 't1', 'key_1': 't2'}
+    ```
+    """
+    params = {f"{prefix}_{index}": key for index, key in enumerate(keys)}
+    clause = " or ".join(f"{{ {variable} == ~{name}; }}" for name in params) + ";"
+    return clause, params
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    Loads the values for many keys with one query instead of one query per key (the N+1 problem).
+
+    `batch_fn` gets a list of keys and returns a dict with the value per key; keys it does not
+    return get `default()`. Within a request the loaded values are kept in the identity map of the
+    unit of work, so keys that were already loaded in the request are not queried again (until
+    the next write).
+
+    Usage:
+    ```python
+    task_skills = BatchLoader("task_skills", skill_repo.get_skills_by_tasks, default=list)
+    skills_per_task = task_skills.load_many(task.id for task in tasks)
+    ```
+    """
+
+    def __init__(self, name: str, batch_fn: Callable[[list[K]], dict[K, V]],
+                 default: Callable[[], V] = lambda: None, max_batch_size: int = 100):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.default = default
+        # Keeps the generated queries (one disjunct per key) at a reasonable size
+        self.max_batch_size = max_batch_size
+
+    def load(self, key: K) -> V:
+        return self.load_many([key])[key]
+
+    def load_many(self, keys: Iterable[K]) -> dict[K, V]:
+        """Get the values for all keys (in the order of `keys`), querying only the keys not loaded yet."""
+        keys = list(dict.fromkeys(keys))
+        unit_of_work = get_unit_of_work()
+
+        values: dict[K, V] = {}
+        missing: list[K] = []
+        for key in keys:
+            loaded = unit_of_work.get_entity(self.name, key) if unit_of_work is not None else None
+            if loaded is None:
+                missing.append(key)
+            else:
+                values[key] = loaded
+
+        for start in range(0, len(missing), self.max_batch_size):
+            batch = missing[start:start + self.max_batch_size]
+            results = self.batch_fn(batch)
+            for key in batch:
+                value = results.get(key)
+                if value is None:
+                    value = self.default()
+                values[key] = value
+                if unit_of_work is not None and value is not None:
+                    unit_of_work.add_entity(self.name, key, value)
+
+        return {key: values[key] for key in keys}
@@ -1,7 +1,10 @@
-from typing import Any
+from typing import Any, Iterator
 from db.initDatabase import Db
 from exceptions import ItemRetrievalException
 from .base import BaseRepository
+from .batch_loader import any_of
+from .cache import business_cache
+from .versions import entity_versions
 from domain.models import Business, BusinessAssociation
 from service.uuid_service import generate_uuid
 
@@ -11,6 +14,10 @@ class BusinessRepository(BaseRepository[Business]):
         super().__init__(Business, "business")
 
     def get_by_id(self, id: str) -> Business | None:
+        loaded = self._get_loaded(id)
+        if loaded is not None:
+            return loaded
+
         query = """
             match
                 $business isa business,
@@ -31,9 +38,34 @@ class BusinessRepository(BaseRepository[Business]):
         results = Db.read_transact(query, {"id": id})
         if not results:
             raise ItemRetrievalException(Business, f"Business with ID {id} not found.")
-        return self._map_to_model(results[0])
+        return self._remember(id, self._map_to_model(results[0]))
+
+    def _load_many(self, ids: list[str]) -> dict[str, Business]:
+        clause, params = any_of("$id", ids)
+        query = f"""
+            match
+                $business isa business,
+                has id $id,
+                has name $name,
+                has description $description,
+                has imagePath $imagePath,
+                has location $location;
+                {clause}
+            fetch {{
+                'id': $id,
+                'name': $name,
+                'description': $description,
+                'imagePath': $imagePath,
+                'location': $location
+            }};
+        """
+        results = Db.read_transact(query, params)
+        return {result["id"]: self._map_to_model(result) for result in results}
 
     def get_all(self) -> list[Business]:
+        return business_cache.get_or_load("all", self._load_all)
+
+    def _load_all(self) -> list[Business]:
         query = """
             match
                 $business isa business,
@@ -109,6 +141,13 @@ class BusinessRepository(BaseRepository[Business]):
         return associations
 
     def get_all_with_full_nesting(self):
+        return list(self.iter_all_with_full_nesting())
+
+    def iter_all_with_full_nesting(self) -> Iterator[dict[str, Any]]:
+        """
+        Yield every business with its nested projects, tasks and skills, one business at a time
+        while they are read from the database (see `Db.read_stream`).
+        """
         query = """
         match
             $business isa business;
@@ -140,18 +179,8 @@ class BusinessRepository(BaseRepository[Business]):
                             "total_needed": $task.totalNeeded,
                             "created_at": $task.createdAt,
                             "project_id": $project.id,
-                            "total_registered": (
-                                match
-                                    $registration isa registersForTask (task: $task, student: $student);
-                                not { $registration has isAccepted $any_value; };
-                                return count;
-                            ),
-                            "total_accepted": (
-                                match
-                                    $registration isa registersForTask (task: $task, student: $student),
-                                    has isAccepted true;
-                                return count;
-                            ),
+                            "total_registered": $task.totalRegistered,
+                            "total_accepted": $task.totalAccepted,
                             "skills": [
                                 match
                                     ($task, $skill) isa requiresSkill;
@@ -169,7 +198,7 @@ class BusinessRepository(BaseRepository[Business]):
             ]
         };
         """
-        return Db.read_transact(query)
+        return Db.read_stream(query)
 
     def create(self, name: str) -> Business:
         id = generate_uuid()
@@ -184,6 +213,8 @@ class BusinessRepository(BaseRepository[Business]):
                 has location "";
         """
         Db.write_transact(query, {"id": id, "name": name})
+        business_cache.invalidate()
+        entity_versions.bump("business")
         return Business(
             id=id, name=name, description="", image_path="default.png", location=""
         )
@@ -214,3 +245,5 @@ class BusinessRepository(BaseRepository[Business]):
         """
 
         Db.write_transact(query, update_params)
+        business_cache.invalidate()
+        entity_versions.bump("business")
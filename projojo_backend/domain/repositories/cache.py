@@ -0,0 +1,136 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, TypeVar
+from config.settings import CACHE_TTL, CACHE_MAX_ENTRIES, USER_TYPE_CACHE_SIZE
+from db.metrics import register_query_helper
+
+# Queries run by a loader on a miss are labelled with the repository method that asked for the value
+register_query_helper(__file__)
+
+V = TypeVar('V')
+
+
+class ReadThroughCache:
+    """
+    Process-wide TTL + LRU cache for repository reads of data that rarely changes.
+
+    Values are loaded on a miss, kept for `ttl` seconds and evicted least-recently-used when
+    more than `max_entries` keys are cached. Repositories call `invalidate()` after every write
+    that changes the cached data, so readers never have to wait for the TTL after a change.
+
+    Callers get a deep copy of the cached value, so they can modify the result freely.
+
+    Usage:
+    ```python
+    skill_cache = ReadThroughCache("skill")
+
+    def get_all(self) -> list[Skill]:
+        return skill_cache.get_or_load("all", self._load_all)
+
+    def create(self, skill: Skill) -> Skill:
+        Db.write_transact(...)
+        skill_cache.invalidate()
+    ```
+    """
+
+    def __init__(self, name: str, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation, so a load that raced with a write is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        _caches[name] = self
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], V]) -> V:
+        """Return the cached value for `key`, or load, store and return it."""
+        if self.ttl <= 0:
+            return loader()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+            generation = self._generation
+
+        # Load outside the lock, a slow query must not block readers of other keys
+        value = loader()
+
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, value)
+        return copy.deepcopy(value)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value for `key` without loading it, or None."""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value the caller loaded itself, e.g. as part of a larger query."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._store(key, copy.deepcopy(value))
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop one key, or the whole cache when no key is given."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+            }
+
+
+# All caches by name, used to report metrics
+_caches: dict[str, ReadThroughCache] = {}
+
+
+def get_cache_stats() -> dict[str, dict[str, int]]:
+    """Hit/miss statistics of every cache, keyed by cache name."""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+skill_cache = ReadThroughCache("skill")
+business_cache = ReadThroughCache("business")
+oauth_provider_cache = ReadThroughCache("oauthProvider")
+# The type of a user never changes, so only the size bounds this cache
+user_type_cache = ReadThroughCache("userType", ttl=float("inf"), max_entries=USER_TYPE_CACHE_SIZE)
@@ -0,0 +1,151 @@
+"""
+Keyset (cursor) pagination for list queries.
+
+A page is read with `sort` and `limit` in TypeQL, continuing after the sort key of the last row
+of the previous page (which the client gets back as an opaque cursor). Unlike `offset`, the
+database does not have to skip the earlier rows, so every page costs the same however far the
+client pages, and rows inserted in the meantime do not shift the pages.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, TypeVar
+from db.initDatabase import Db
+from db.metrics import register_query_helper
+from domain.models.pagination import Page
+from exceptions import InvalidCursorException
+
+# The queries of read_page are labelled with the repository method that requested the page
+register_query_helper(__file__)
+
+T = TypeVar('T')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+@dataclass(frozen=True)
+class SortKey:
+    # Variable bound in the match clause, e.g. "$createdAt"
+    variable: str
+    # Key of the same value in the fetched row, e.g. "created_at"
+    field: str
+    is_datetime: bool = False
+
+
+@dataclass(frozen=True)
+class PageRequest:
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: str | None = None
+    include_total: bool = False
+
+
+def by_created_at(field: str = "created_at") -> list[SortKey]:
+    """Oldest first, ordering on the id within the same creation time (`field` is the fetched createdAt key)."""
+    return [SortKey("$createdAt", field, is_datetime=True), SortKey("$id", "id")]
+
+
+BY_ID = [SortKey("$id", "id")]
+
+
+def encode_cursor(values: list[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: list[SortKey]) -> list[Any]:
+    """Decode a cursor into query parameter values for the sort keys, or raise InvalidCursorException."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(keys) or not all(isinstance(v, str) for v in values):
+            raise ValueError("cursor does not match the sort keys")
+        return [_parse_datetime(value) if key.is_datetime else value for key, value in zip(keys, values)]
+    except (ValueError, TypeError):
+        raise InvalidCursorException()
+
+
+def _parse_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    # format_value writes datetimes as UTC
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def _after(keys: list[SortKey], values: list[Any]) -> tuple[str, dict[str, Any]]:
+    """
+    The TypeQL condition "sort key > values" for a compound key, e.g. for (createdAt, id):
+    `{ $createdAt > ~after_0_0; } or { $createdAt == ~after_1_0; $id > ~after_1_1; };`
+    """
+    disjuncts = []
+    params = {}
+    for index, key in enumerate(keys):
+        constraints = []
+        for previous in range(index):
+            name = f"after_{index}_{previous}"
+            params[name] = values[previous]
+            constraints.append(f"{keys[previous].variable} == ~{name};")
+        name = f"after_{index}_{index}"
+        params[name] = values[index]
+        constraints.append(f"{key.variable} > ~{name};")
+        disjuncts.append("{ " + " ".join(constraints) + " }")
+    return " or ".join(disjuncts) + ";", params
+
+
+def read_page(page: PageRequest, match: str, fetch: str, keys: list[SortKey],
+              map_row: Callable[[dict[str, Any]], T], count_match: str | None = None) -> Page[T]:
+    """
+    Read one page of a list query.
+
+    Args:
+        page: Requested page size, cursor and whether to count the total
+        match: Body of the match clause, binding the variables of `keys`
+        fetch: The fetch clause, including the values of `keys` under their `field` names
+        keys: Sort key, must be unique per row (end with the id)
+        map_row: Maps a fetched row to the returned item
+        count_match: Match clause for counting all rows (with variables that do not occur in `match`)
+
+    Returns:
+        The items of the page, the cursor of the next page (None on the last page)
+        and the total number of rows if requested
+    """
+    params: dict[str, Any] = {"limit": page.limit + 1}
+    after = ""
+    if page.cursor:
+        after, after_params = _after(keys, decode_cursor(page.cursor, keys))
+        params.update(after_params)
+
+    query = f"""
+        match
+            {match}
+            {after}
+        sort {", ".join(f"{key.variable} asc" for key in keys)};
+        limit ~limit;
+        fetch {fetch}
+    """
+    # One row more than requested tells whether there is a next page
+    rows = Db.read_transact(query, params)
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor([str(rows[-1][key.field]) for key in keys])
+
+    total = None
+    if page.include_total and count_match:
+        # The outer match only anchors the fetch, so the count runs once
+        count_query = f"""
+            match
+                {match}
+            limit 1;
+            fetch {{
+                'total': (
+                    match
+                        {count_match}
+                    return count;
+                )
+            }};
+        """
+        counted = Db.read_transact(count_query)
+        total = counted[0]["total"] if counted else 0
+
+    return Page(items=[map_row(row) for row in rows], next_cursor=next_cursor, total=total)
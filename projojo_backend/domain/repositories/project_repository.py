@@ -2,7 +2,10 @@ from typing import Any
 from db.initDatabase import Db
 from exceptions import ItemRetrievalException
 from .base import BaseRepository
-from domain.models import Project, ProjectCreation
+from .batch_loader import BatchLoader, any_of
+from .pagination import PageRequest, by_created_at, read_page
+from .versions import entity_versions
+from domain.models import Project, ProjectCreation, Page
 from datetime import datetime
 from service.uuid_service import generate_uuid
 
@@ -10,8 +13,14 @@ from service.uuid_service import generate_uuid
 class ProjectRepository(BaseRepository[Project]):
     def __init__(self):
         super().__init__(Project, "project")
+        # Projects per business id, for loading the projects of many businesses at once
+        self.business_projects_loader = BatchLoader("business_projects", self.get_projects_by_businesses, default=list)
 
     def get_by_id(self, id: str) -> Project | None:
+        loaded = self._get_loaded(id)
+        if loaded is not None:
+            return loaded
+
         query = """
             match
                 $project isa project,
@@ -36,19 +45,56 @@ class ProjectRepository(BaseRepository[Project]):
         results = Db.read_transact(query, {"id": id})
         if not results:
             raise ItemRetrievalException(Project, f"Project with ID {id} not found.")
-        return self._map_to_model(results[0])
+        return self._remember(id, self._map_to_model(results[0]))
+
+    _LIST_MATCH = """
+        $project isa project,
+        has id $id,
+        has name $name,
+        has description $description,
+        has imagePath $imagePath,
+        has createdAt $createdAt;
+        $hasProjects isa hasProjects(business: $business, project: $project);
+        $business has id $business_id;
+    """
+    _LIST_FETCH = """{
+        'id': $id,
+        'name': $name,
+        'description': $description,
+        'imagePath': $imagePath,
+        'location': $project.location,
+        'createdAt': $createdAt,
+        'business': $business_id
+    };"""
+
+    def _load_many(self, ids: list[str]) -> dict[str, Project]:
+        clause, params = any_of("$id", ids)
+        query = f"match {self._LIST_MATCH} {clause} fetch {self._LIST_FETCH}"
+        results = Db.read_transact(query, params)
+        return {result["id"]: self._map_to_model(result) for result in results}
 
     def get_all(self) -> list[Project]:
+        results = Db.read_transact(f"match {self._LIST_MATCH} fetch {self._LIST_FETCH}")
+        return [self._map_to_model(result) for result in results]
+
+    def get_page(self, page: PageRequest) -> Page[Project]:
+        """One page of all projects, oldest first (see `read_page`)."""
+        return read_page(page, self._LIST_MATCH, self._LIST_FETCH, by_created_at("createdAt"), self._map_to_model,
+                         count_match="$counted isa project;")
+
+    def get_projects_by_business(self, business_id: str) -> list[Project]:
         query = """
             match
+                $business isa business,
+                has id ~business_id,
+                has id $business_id;
+                $hasProjects isa hasProjects (business: $business, project: $project);
                 $project isa project,
                 has id $id,
                 has name $name,
                 has description $description,
                 has imagePath $imagePath,
                 has createdAt $createdAt;
-                $hasProjects isa hasProjects(business: $business, project: $project);
-                $business has id $business_id;
             fetch {
                 'id': $id,
                 'name': $name,
@@ -59,15 +105,30 @@ class ProjectRepository(BaseRepository[Project]):
                 'business': $business_id
             };
         """
-        results = Db.read_transact(query)
-        return [self._map_to_model(result) for result in results]
+        results = Db.read_transact(query, {"business_id": business_id})
+        projects = [self._map_to_model(result) for result in results]
 
-    def get_projects_by_business(self, business_id: str) -> list[Project]:
-        query = """
+        # Add business_id to each project
+        for project in projects:
+            project.business_id = business_id
+
+        return projects
+
+    def get_projects_by_businesses(self, business_ids: list[str]) -> dict[str, list[Project]]:
+        """
+        Get the projects of several businesses with one query (see `business_projects_loader`).
+
+        Returns:
+            The projects per business id; businesses without projects are left out
+        """
+        if not business_ids:
+            return {}
+        clause, params = any_of("$business_id", business_ids)
+        query = f"""
             match
                 $business isa business,
-                has id ~business_id,
                 has id $business_id;
+                {clause}
                 $hasProjects isa hasProjects (business: $business, project: $project);
                 $project isa project,
                 has id $id,
@@ -75,7 +136,7 @@ class ProjectRepository(BaseRepository[Project]):
                 has description $description,
                 has imagePath $imagePath,
                 has createdAt $createdAt;
-            fetch {
+            fetch {{
                 'id': $id,
                 'name': $name,
                 'description': $description,
@@ -83,15 +144,13 @@ class ProjectRepository(BaseRepository[Project]):
                 'location': $project.location,
                 'createdAt': $createdAt,
                 'business': $business_id
-            };
+            }};
         """
-        results = Db.read_transact(query, {"business_id": business_id})
-        projects = [self._map_to_model(result) for result in results]
-
-        # Add business_id to each project
-        for project in projects:
-            project.business_id = business_id
+        results = Db.read_transact(query, params)
 
+        projects: dict[str, list[Project]] = {}
+        for result in results:
+            projects.setdefault(result["business"], []).append(self._map_to_model(result))
         return projects
 
     def get_business_by_project(self, project_id: str) -> dict | None:
@@ -188,7 +247,7 @@ class ProjectRepository(BaseRepository[Project]):
         # Optional location: None removes clause via build_query
         location_value = project.location.strip() if getattr(project, "location", None) else None
 
-        query = """
+        project_query = """
             match
                 $business isa business,
                 has id ~business_id;
@@ -202,7 +261,7 @@ class ProjectRepository(BaseRepository[Project]):
                 has createdAt ~created_at;
                 $hasProjects isa hasProjects($business, $project);
         """
-        Db.write_transact(query, {
+        project_params = {
             "business_id": project.business_id,
             "id": id,
             "name": project.name,
@@ -210,10 +269,10 @@ class ProjectRepository(BaseRepository[Project]):
             "image_path": project.image_path,
             "location": location_value,
             "created_at": created_at
-        })
+        }
 
         # Create the relationship with the supervisor
-        query = """
+        creates_query = """
             match
                 $supervisor isa supervisor,
                 has id ~supervisor_id;
@@ -222,11 +281,15 @@ class ProjectRepository(BaseRepository[Project]):
             insert $creates isa creates($supervisor, $project),
                 has createdAt ~created_at;
         """
-        Db.write_transact(query, {
+        creates_params = {
             "supervisor_id": project.supervisor_id,
             "project_id": id,
             "created_at": created_at
-        })
+        }
+
+        # Both in one transaction, so a project never exists without its creator
+        Db.write_batch([(project_query, project_params), (creates_query, creates_params)])
+        entity_versions.bump("project")
 
         return ProjectCreation(
             id=id,
@@ -264,3 +327,4 @@ class ProjectRepository(BaseRepository[Project]):
         '''
 
         Db.write_transact(query, params)
+        entity_versions.bump("project")
@@ -2,7 +2,11 @@ from typing import Any
 from db.initDatabase import Db
 from exceptions import ItemRetrievalException
 from .base import BaseRepository
-from domain.models import Skill
+from .batch_loader import BatchLoader, any_of
+from .pagination import PageRequest, by_created_at, read_page
+from .cache import skill_cache
+from .versions import entity_versions
+from domain.models import Skill, Page
 from datetime import datetime
 from service.uuid_service import generate_uuid
 
@@ -12,8 +16,14 @@ from ..models.skill import StudentSkill
 class SkillRepository(BaseRepository[Skill]):
     def __init__(self):
         super().__init__(Skill, "skill")
+        # Skills per task id, for loading the skills of many tasks at once
+        self.task_skills_loader = BatchLoader("task_skills", self.get_skills_by_tasks, default=list)
 
     def get_by_id(self, id: str) -> Skill | None:
+        loaded = self._get_loaded(id)
+        if loaded is not None:
+            return loaded
+
         query = """
             match
                 $skill isa skill,
@@ -31,9 +41,32 @@ class SkillRepository(BaseRepository[Skill]):
         results = Db.read_transact(query, {"id": id})
         if not results:
             raise ItemRetrievalException(Skill, "Deze skill kon niet worden gevonden.")
-        return self._map_to_model(results[0])
+        return self._remember(id, self._map_to_model(results[0]))
+
+    def _load_many(self, ids: list[str]) -> dict[str, Skill]:
+        clause, params = any_of("$id", ids)
+        query = f"""
+            match
+                $skill isa skill,
+                has id $id,
+                has name $name,
+                has isPending $isPending,
+                has createdAt $createdAt;
+                {clause}
+            fetch {{
+                'id': $id,
+                'name': $name,
+                'isPending': $isPending,
+                'createdAt': $createdAt
+            }};
+        """
+        results = Db.read_transact(query, params)
+        return {result["id"]: self._map_to_model(result) for result in results}
 
     def get_all(self) -> list[Skill]:
+        return skill_cache.get_or_load("all", self._load_all)
+
+    def _load_all(self) -> list[Skill]:
         query = """
             match
                 $skill isa skill,
@@ -48,6 +81,21 @@ class SkillRepository(BaseRepository[Skill]):
         results = Db.read_transact(query)
         return [self._map_to_model(result) for result in results]
 
+    def get_page(self, page: PageRequest) -> Page[Skill]:
+        """One page of all skills, oldest first (see `read_page`). Not cached, unlike `get_all`."""
+        match = """
+            $skill isa skill,
+            has id $id,
+            has createdAt $createdAt;
+        """
+        fetch = """{
+            'id': $id,
+            'name': $skill.name,
+            'isPending': $skill.isPending,
+            'createdAt': $createdAt
+        };"""
+        return read_page(page, match, fetch, by_created_at("createdAt"), self._map_to_model, count_match="$counted isa skill;")
+
     def get_by_name_case_insensitive(self, name: str) -> Skill | None:
         """
         Return a skill by exact name (case-insensitive) if it exists, otherwise None.
@@ -103,27 +151,28 @@ class SkillRepository(BaseRepository[Skill]):
         to_add = set(updated_skills) - (current_skill_ids)
         to_remove = (current_skill_ids) - set(updated_skills)
 
-        for skill_id in to_add:
-            query = """
-                match
-                    $student isa student, has id ~student_id;
-                    $skill isa skill, has id ~skill_id;
-                insert
-                    $hasSkill isa hasSkill (student: $student, skill: $skill),
-                    has description "";
-            """
-            Db.write_transact(query, {"student_id": student_id, "skill_id": skill_id})
-
-        for skill_id in to_remove:
-            query = """
-                match
-                    $student isa student, has id ~student_id;
-                    $skill isa skill, has id ~skill_id;
-                    $hasSkill isa hasSkill (student: $student, skill: $skill);
-                delete
-                    $hasSkill;
-            """
-            Db.write_transact(query, {"student_id": student_id, "skill_id": skill_id})
+        add_query = """
+            match
+                $student isa student, has id ~student_id;
+                $skill isa skill, has id ~skill_id;
+            insert
+                $hasSkill isa hasSkill (student: $student, skill: $skill),
+                has description "";
+        """
+        remove_query = """
+            match
+                $student isa student, has id ~student_id;
+                $skill isa skill, has id ~skill_id;
+                $hasSkill isa hasSkill (student: $student, skill: $skill);
+            delete
+                $hasSkill;
+        """
+
+        # Apply the whole diff in one transaction, so it is never left half-applied
+        statements = [(add_query, {"student_id": student_id, "skill_id": skill_id}) for skill_id in to_add]
+        statements += [(remove_query, {"student_id": student_id, "skill_id": skill_id}) for skill_id in to_remove]
+        Db.write_batch(statements)
+        entity_versions.bump("user")
 
     def update_student_skill_description(self, student_id: str, skill_id: str, description: str):
         query = """
@@ -139,6 +188,7 @@ class SkillRepository(BaseRepository[Skill]):
             "skill_id": skill_id,
             "description": description
         })
+        entity_versions.bump("user")
 
     def create(self, skill: Skill) -> Skill:
         id = generate_uuid()
@@ -160,6 +210,8 @@ class SkillRepository(BaseRepository[Skill]):
             "is_pending": skill.is_pending,
             "created_at": created_at
         })
+        skill_cache.invalidate()
+        entity_versions.bump("skill")
 
         # Update the returned skill with id and created_at if missing
         skill.id = id
@@ -231,6 +283,43 @@ class SkillRepository(BaseRepository[Skill]):
             )
         return skills
 
+    def get_skills_by_tasks(self, task_ids: list[str]) -> dict[str, list[Skill]]:
+        """
+        Get the skills of several tasks with one query (see `task_skills_loader`).
+
+        Returns:
+            The skills per task id; tasks without skills are left out
+        """
+        if not task_ids:
+            return {}
+        clause, params = any_of("$task_id", task_ids)
+        query = f"""
+            match
+                $task isa task, has id $task_id;
+                {clause}
+                $taskSkill isa requiresSkill (task: $task, skill: $skill);
+                $skill isa skill, has id $skill_id, has name $skill_name;
+            fetch {{
+                'task_id': $task_id,
+                'id': $skill_id,
+                'name': $skill_name,
+                'isPending': $skill.isPending
+            }};
+        """
+        results = Db.read_transact(query, params)
+
+        skills: dict[str, list[Skill]] = {}
+        for result in results:
+            skills.setdefault(result["task_id"], []).append(
+                Skill(
+                    id=result.get("id", ""),
+                    name=result.get("name", ""),
+                    is_pending=result.get("isPending", True),
+                    created_at=datetime.now(),  # Same as get_task_skills, created_at is not needed here
+                )
+            )
+        return skills
+
     def update_task_skills(self, task_id: str, updated_skills: list[str]) -> None:
         """
         Set-based update of a task's required skills (requiresSkill relation).
@@ -243,27 +332,27 @@ class SkillRepository(BaseRepository[Skill]):
         to_add = updated_skill_ids - current_skill_ids
         to_remove = current_skill_ids - updated_skill_ids
 
-        # Add new relations
-        for skill_id in to_add:
-            query = """
-                match
-                    $task isa task, has id ~task_id;
-                    $skill isa skill, has id ~skill_id;
-                insert
-                    $requiresSkill isa requiresSkill (task: $task, skill: $skill);
-            """
-            Db.write_transact(query, {"task_id": task_id, "skill_id": skill_id})
-        # Remove stale relations
-        for skill_id in to_remove:
-            query = """
-                match
-                    $task isa task, has id ~task_id;
-                    $skill isa skill, has id ~skill_id;
-                    $requiresSkill isa requiresSkill (task: $task, skill: $skill);
-                delete
-                    $requiresSkill;
-            """
-            Db.write_transact(query, {"task_id": task_id, "skill_id": skill_id})
+        add_query = """
+            match
+                $task isa task, has id ~task_id;
+                $skill isa skill, has id ~skill_id;
+            insert
+                $requiresSkill isa requiresSkill (task: $task, skill: $skill);
+        """
+        remove_query = """
+            match
+                $task isa task, has id ~task_id;
+                $skill isa skill, has id ~skill_id;
+                $requiresSkill isa requiresSkill (task: $task, skill: $skill);
+            delete
+                $requiresSkill;
+        """
+
+        # Add new relations and remove stale relations in a single commit
+        statements = [(add_query, {"task_id": task_id, "skill_id": skill_id}) for skill_id in to_add]
+        statements += [(remove_query, {"task_id": task_id, "skill_id": skill_id}) for skill_id in to_remove]
+        Db.write_batch(statements)
+        entity_versions.bump("task")
 
     def update_is_pending(self, skill_id: str, is_pending: bool) -> None:
         """
@@ -276,6 +365,8 @@ class SkillRepository(BaseRepository[Skill]):
                 $skill has isPending ~is_pending;
         """
         Db.write_transact(query, {"skill_id": skill_id, "is_pending": is_pending})
+        skill_cache.invalidate()
+        entity_versions.bump("skill")
 
     def update_name(self, skill_id: str, new_name: str) -> None:
         """
@@ -288,6 +379,8 @@ class SkillRepository(BaseRepository[Skill]):
                 $skill has name ~new_name;
         """
         Db.write_transact(query, {"skill_id": skill_id, "new_name": new_name})
+        skill_cache.invalidate()
+        entity_versions.bump("skill")
 
     def delete_by_id(self, skill_id: str) -> None:
         """
@@ -300,11 +393,14 @@ class SkillRepository(BaseRepository[Skill]):
                 $skill;
         """
         Db.write_transact(query, {"skill_id": skill_id})
+        skill_cache.invalidate()
+        entity_versions.bump("skill")
 
     def delete_with_cascade(self, skill_id: str) -> None:
         """
         Remove all relations that reference the given skill, then delete the skill.
         This avoids cardinality/relates constraint violations when the skill is in use.
+        All three steps run in one write transaction.
         """
         # 1) Remove requiresSkill relations from tasks
         query1 = """
@@ -314,8 +410,6 @@ class SkillRepository(BaseRepository[Skill]):
             delete
                 $rel;
         """
-        Db.write_transact(query1, {"skill_id": skill_id})
-
         # 2) Remove hasSkill relations from students
         query2 = """
             match
@@ -324,8 +418,6 @@ class SkillRepository(BaseRepository[Skill]):
             delete
                 $rel;
         """
-        Db.write_transact(query2, {"skill_id": skill_id})
-
         # 3) Delete the skill itself
         query3 = """
             match
@@ -333,4 +425,11 @@ class SkillRepository(BaseRepository[Skill]):
             delete
                 $skill;
         """
-        Db.write_transact(query3, {"skill_id": skill_id})
+        Db.write_batch([
+            (query1, {"skill_id": skill_id}),
+            (query2, {"skill_id": skill_id}),
+            (query3, {"skill_id": skill_id}),
+        ])
+        skill_cache.invalidate()
+        # The skill also disappears from the tasks and students that had it
+        entity_versions.bump("skill", "task", "user")
@@ -1,7 +1,11 @@
+from typing import Iterator
 from db.initDatabase import Db
 from exceptions import ItemRetrievalException
 from .base import BaseRepository
-from domain.models import Task
+from .batch_loader import any_of
+from .pagination import PageRequest, by_created_at, read_page
+from .versions import entity_versions
+from domain.models import Task, Page
 from datetime import datetime
 from service.uuid_service import generate_uuid
 
@@ -10,6 +14,10 @@ class TaskRepository(BaseRepository[Task]):
         super().__init__(Task, "task")
 
     def get_by_id(self, id: str) -> Task | None:
+        loaded = self._get_loaded(id)
+        if loaded is not None:
+            return loaded
+
         query = """
             match
                 $task isa task,
@@ -24,18 +32,8 @@ class TaskRepository(BaseRepository[Task]):
                 'description': $description,
                 'total_needed': $totalNeeded,
                 'created_at': $createdAt,
-                'total_registered': (
-                    match
-                        $registration isa registersForTask (task: $task, student: $student);
-                    not { $registration has isAccepted $any_value; };
-                    return count;
-                ),
-                'total_accepted': (
-                    match
-                        $registration isa registersForTask (task: $task, student: $student),
-                        has isAccepted true;
-                    return count;
-                )
+                'total_registered': $task.totalRegistered,
+                'total_accepted': $task.totalAccepted
             };
         """
         results = Db.read_transact(query, {"id": id})
@@ -43,10 +41,11 @@ class TaskRepository(BaseRepository[Task]):
             raise ItemRetrievalException(Task, f"Taak met ID {id} niet gevonden")
 
         # Convert to Task using Pydantic's model_validate
-        return Task.model_validate(results[0])
+        return self._remember(id, Task.model_validate(results[0]))
 
-    def get_all(self) -> list[Task]:
-        query = """
+    def _load_many(self, ids: list[str]) -> dict[str, Task]:
+        clause, params = any_of("$id", ids)
+        query = f"""
             match
                 $task isa task,
                 has id $id,
@@ -54,28 +53,53 @@ class TaskRepository(BaseRepository[Task]):
                 has description $description,
                 has totalNeeded $totalNeeded,
                 has createdAt $createdAt;
-            fetch {
+                {clause}
+            fetch {{
                 'id': $id,
                 'name': $name,
                 'description': $description,
                 'total_needed': $totalNeeded,
                 'created_at': $createdAt,
-                'total_registered': (
-                    match
-                        $registration isa registersForTask (task: $task, student: $student);
-                    not { $registration has isAccepted $any_value; };
-                    return count;
-                ),
-                'total_accepted': (
-                    match
-                        $registration isa registersForTask (task: $task, student: $student),
-                        has isAccepted true;
-                    return count;
-                )
-            };
+                'total_registered': $task.totalRegistered,
+                'total_accepted': $task.totalAccepted
+            }};
+        """
+        results = Db.read_transact(query, params)
+        return {result["id"]: Task.model_validate(result) for result in results}
+
+    def get_all(self) -> list[Task]:
+        return list(self.iter_all())
+
+    _LIST_MATCH = """
+        $task isa task,
+        has id $id,
+        has name $name,
+        has description $description,
+        has totalNeeded $totalNeeded,
+        has createdAt $createdAt;
+    """
+    _LIST_FETCH = """{
+        'id': $id,
+        'name': $name,
+        'description': $description,
+        'total_needed': $totalNeeded,
+        'created_at': $createdAt,
+        'total_registered': $task.totalRegistered,
+        'total_accepted': $task.totalAccepted
+    };"""
+
+    def iter_all(self) -> Iterator[Task]:
+        """
+        Yield all tasks one by one while they are read from the database (see `Db.read_stream`).
         """
-        results = Db.read_transact(query)
-        return [Task.model_validate(result) for result in results]
+        query = f"match {self._LIST_MATCH} fetch {self._LIST_FETCH}"
+        for result in Db.read_stream(query):
+            yield Task.model_validate(result)
+
+    def get_page(self, page: PageRequest) -> Page[Task]:
+        """One page of all tasks, oldest first (see `read_page`)."""
+        return read_page(page, self._LIST_MATCH, self._LIST_FETCH, by_created_at(), Task.model_validate,
+                         count_match="$counted isa task;")
 
     def get_tasks_by_project(self, project_id: str) -> list[Task]:
         query = """
@@ -97,18 +121,8 @@ class TaskRepository(BaseRepository[Task]):
                 'total_needed': $totalNeeded,
                 'created_at': $createdAt,
                 'project_id': $project_id,
-                'total_registered': (
-                    match
-                        $registration isa registersForTask (task: $task, student: $student);
-                    not { $registration has isAccepted $any_value; };
-                    return count;
-                ),
-                'total_accepted': (
-                    match
-                        $registration isa registersForTask (task: $task, student: $student),
-                        has isAccepted true;
-                    return count;
-                )
+                'total_registered': $task.totalRegistered,
+                'total_accepted': $task.totalAccepted
             };
         """
         results = Db.read_transact(query, {"project_id": project_id})
@@ -175,6 +189,8 @@ class TaskRepository(BaseRepository[Task]):
                 has name ~name,
                 has description ~description,
                 has totalNeeded ~total_needed,
+                has totalRegistered 0,
+                has totalAccepted 0,
                 has createdAt ~created_at;
                 $projectTask isa containsTask (project: $project, task: $task);
         """
@@ -186,6 +202,7 @@ class TaskRepository(BaseRepository[Task]):
             "total_needed": task.total_needed,
             "created_at": created_at
         })
+        entity_versions.bump("task")
 
         # Update the task with the generated ID and created_at
         task.id = id
@@ -225,6 +242,47 @@ class TaskRepository(BaseRepository[Task]):
         results = Db.read_transact(query, {"task_id": task_id})
         return results
 
+    # Statements that adjust the registration counters of a task (totalRegistered counts the
+    # pending registrations, totalAccepted the accepted ones). They run in the same transaction as
+    # the registration write; every task has both counters (created with 0, or filled in by migrate_schema).
+    _INCREMENT_REGISTERED = """
+        match
+            $task isa task, has id ~task_id, has totalRegistered $registered;
+            let $new_registered = $registered + 1;
+        update
+            $task has totalRegistered $new_registered;
+    """
+    _REGISTRATION_MATCH = """
+        match
+            $task isa task, has id ~task_id;
+            $student isa student, has id ~student_id;
+            $registration isa registersForTask (student: $student, task: $task);
+    """
+    # Only matches while the registration is still pending
+    _DECREMENT_REGISTERED = _REGISTRATION_MATCH + """
+            not { $registration has isAccepted $any_value; };
+            $task has totalRegistered $registered;
+            let $new_registered = $registered - 1;
+        update
+            $task has totalRegistered $new_registered;
+    """
+    # Only matches when the registration was not accepted before
+    _INCREMENT_ACCEPTED = _REGISTRATION_MATCH + """
+            not { $registration has isAccepted true; };
+            $task has totalAccepted $accepted;
+            let $new_accepted = $accepted + 1;
+        update
+            $task has totalAccepted $new_accepted;
+    """
+    # Only matches when the registration was accepted before
+    _DECREMENT_ACCEPTED = _REGISTRATION_MATCH + """
+            $registration has isAccepted true;
+            $task has totalAccepted $accepted;
+            let $new_accepted = $accepted - 1;
+        update
+            $task has totalAccepted $new_accepted;
+    """
+
     def create_registration(self, task_id: str, student_id: str, motivation: str) -> None:
         """
         Create a new registration for a student to a task
@@ -241,12 +299,16 @@ class TaskRepository(BaseRepository[Task]):
                 has createdAt ~created_at;
         """
 
-        Db.write_transact(query, {
-            "task_id": task_id,
-            "student_id": student_id,
-            "motivation": motivation,
-            "created_at": created_at
-        })
+        Db.write_batch([
+            (query, {
+                "task_id": task_id,
+                "student_id": student_id,
+                "motivation": motivation,
+                "created_at": created_at
+            }),
+            (self._INCREMENT_REGISTERED, {"task_id": task_id}),
+        ])
+        entity_versions.bump("registration")
 
     def update_registration(self, task_id: str, student_id: str, accepted: bool, response: str = "") -> None:
         """
@@ -261,13 +323,86 @@ class TaskRepository(BaseRepository[Task]):
                 $registration has isAccepted ~accepted;
                 $registration has response ~response;
         """
+        params = {"task_id": task_id, "student_id": student_id}
 
-        Db.write_transact(query, {
-            "task_id": task_id,
-            "student_id": student_id,
-            "accepted": accepted,
-            "response": response
-        })
+        # The counter statements look at the previous state, so they run before the update
+        counter_statements = [
+            (self._DECREMENT_REGISTERED, params),
+            (self._INCREMENT_ACCEPTED if accepted else self._DECREMENT_ACCEPTED, params),
+        ]
+        Db.write_batch([
+            *counter_statements,
+            (query, {**params, "accepted": accepted, "response": response}),
+        ])
+        entity_versions.bump("registration")
+
+    def reconcile_registration_counters(self) -> int:
+        """
+        Repair the registration counters of tasks that drifted from their registrations (or that
+        were created before the counters existed), by counting the registrations again.
+
+        A counter is only overwritten while it still has the value that was read, so a
+        registration committed in the meantime is never undone; that task is checked again on the
+        next run.
+
+        Returns:
+            The number of tasks whose counters were repaired
+        """
+        query = """
+            match
+                $task isa task, has id $id;
+            fetch {
+                'id': $id,
+                'stored_registered': $task.totalRegistered,
+                'stored_accepted': $task.totalAccepted,
+                'registered': (
+                    match
+                        $registration isa registersForTask (task: $task, student: $student);
+                    not { $registration has isAccepted $any_value; };
+                    return count;
+                ),
+                'accepted': (
+                    match
+                        $registration isa registersForTask (task: $task, student: $student),
+                        has isAccepted true;
+                    return count;
+                )
+            };
+        """
+        repair_query = """
+            match
+                $task isa task, has id ~task_id, has totalRegistered ~stored_registered, has totalAccepted ~stored_accepted;
+            update
+                $task has totalRegistered ~registered;
+                $task has totalAccepted ~accepted;
+        """
+        initialize_query = """
+            match
+                $task isa task, has id ~task_id;
+                { not { $task has totalRegistered $any_registered; }; }
+                or { not { $task has totalAccepted $any_accepted; }; };
+            update
+                $task has totalRegistered ~registered;
+                $task has totalAccepted ~accepted;
+        """
+
+        statements = []
+        for row in Db.read_transact(query):
+            stored = (row.get("stored_registered"), row.get("stored_accepted"))
+            if stored == (row["registered"], row["accepted"]):
+                continue
+            params = {"task_id": row["id"], "registered": row["registered"], "accepted": row["accepted"]}
+            if None in stored:
+                statements.append((initialize_query, params))
+            else:
+                statements.append((repair_query, {
+                    **params, "stored_registered": stored[0], "stored_accepted": stored[1],
+                }))
+
+        if statements:
+            Db.write_batch(statements)
+            entity_versions.bump("task")
+        return len(statements)
 
     def update(self, task_id: str, name: str, description: str, total_needed: int) -> Task:
         # Get project info and check for duplicate task names
@@ -305,20 +440,9 @@ class TaskRepository(BaseRepository[Task]):
                 raise ValueError(f"Er bestaat al een taak met de naam '{name}' in project '{project_name}'.")
 
         # Validate that total_needed is not less than current total_accepted
-        accepted_count_query = """
-            match
-                $task isa task, has id ~task_id;
-            fetch {
-                'total_accepted': (
-                    match
-                        $registration isa registersForTask (task: $task, student: $student),
-                        has isAccepted true;
-                    return count;
-                )
-            };
-        """
-        accepted_results = Db.read_transact(accepted_count_query, {"task_id": task_id})
-        current_accepted = accepted_results[0]['total_accepted'] if accepted_results else 0
+        # (the task is usually already loaded in this request, see BaseRepository._get_loaded)
+        current_task = self.get_by_id(task_id)
+        current_accepted = current_task.total_accepted if current_task else 0
         
         if total_needed < current_accepted:
             raise ValueError(f"Het totaal aantal plekken ({total_needed}) kan niet lager zijn dan het aantal al geaccepteerde deelnemers ({current_accepted}).")
@@ -344,4 +468,5 @@ class TaskRepository(BaseRepository[Task]):
         """
 
         Db.write_transact(query, update_params)
+        entity_versions.bump("task")
 
@@ -5,34 +5,163 @@ from fastapi import HTTPException
 from db.initDatabase import Db
 from exceptions import ItemRetrievalException
 from .base import BaseRepository
-from domain.models import User, Supervisor, Student, Teacher
+from .batch_loader import any_of
+from .cache import oauth_provider_cache, user_type_cache
+from .pagination import BY_ID, PageRequest, read_page
+from .versions import entity_versions
+from domain.models import User, Supervisor, Student, Teacher, Page
 from domain.models.authentication import OAuthProvider
-from service.image_service import save_image_from_url
 from service.uuid_service import generate_uuid
 
+# Type-specific parts of the polymorphic user query in get_by_id; each only matches users of its type
+_USER_TYPE_FETCH = {
+    "supervisor": """
+        'supervisor': [
+            match
+                $user isa supervisor;
+            fetch {
+                'businesses': [
+                    match
+                        $business isa business;
+                        $manages isa manages( $user, $business );
+                    fetch { 'id': $business.id };
+                ],
+                'created_project_ids': [
+                    match
+                        $project isa project;
+                        $creates isa creates( $user, $project );
+                    fetch { 'id': $project.id };
+                ]
+            };
+        ]""",
+    "student": """
+        'student': [
+            match
+                $user isa student;
+            fetch {
+                'description': $user.description,
+                'cv_path': $user.cvPath,
+                'registered_task_ids': [
+                    match
+                        $task isa task;
+                        $registration isa registersForTask( $user, $task );
+                    fetch { 'task_id': $task.id };
+                ],
+                'Skills': [
+                    match
+                        $skill isa skill;
+                        $hasSkill isa hasSkill( $skill, $user );
+                    fetch {
+                        'id': $skill.id,
+                        'name': $skill.name,
+                        'is_pending': $skill.isPending,
+                        'created_at': $skill.createdAt,
+                        'description': $hasSkill.description
+                    };
+                ]
+            };
+        ]""",
+    "teacher": "",
+}
+
 class UserRepository(BaseRepository[User]):
     def __init__(self):
         super().__init__(User, "user")
 
-    def get_by_id(self, id: str) -> User | None:
-        # First try to find as a supervisor
-        supervisor = self.get_supervisor_by_id(id)
-        if supervisor:
-            return supervisor
+    def get_by_id(self, id: str) -> User | dict | None:
+        """
+        Get a user of any type with one query: a Supervisor or Teacher, or for a student the dict
+        of `get_student_by_id`.
 
-        # Then try as a student
-        student = self.get_student_by_id(id)
-        if student:
-            return student
+        The concrete type is resolved in the query with `isa!` and remembered per id, so later
+        lookups of the same user only fetch the fields of that type.
+        """
+        user_type = user_type_cache.get(id)
+        result = self._fetch_user(id, user_type)
+        if result is None and user_type is not None:
+            # Stale entry (the user was removed), look the id up without assuming a type
+            user_type_cache.invalidate(id)
+            user_type = None
+            result = self._fetch_user(id, None)
+        if result is None:
+            raise ItemRetrievalException(User, f"Gebruiker met ID {id} niet gevonden")
 
-        # Finally try as a teacher
-        teacher = self.get_teacher_by_id(id)
-        if teacher:
-            return teacher
+        user_type_cache.put(id, result["usertype"]["label"].lower())
+        return self._map_user(result)
+
+    def _map_user(self, result: dict[str, Any]) -> User | dict:
+        """Map a row of the polymorphic user query to the model of its type (a dict for students)."""
+        user_type = result["usertype"]["label"].lower()
+        if user_type == "supervisor":
+            details = result["supervisor"][0]
+            businesses = details["businesses"]
+            return self._map_supervisor({
+                **result,
+                "business_association_id": businesses[0]["id"] if businesses else None,
+                "created_project_ids": [project["id"] for project in details["created_project_ids"]],
+            })
+        if user_type == "student":
+            details = result["student"][0]
+            return {
+                "id": result["id"],
+                "email": result["email"],
+                "full_name": result["fullName"],
+                "image_path": result["imagePath"],
+                "type": "student",
+                "description": details["description"],
+                "cv_path": details["cv_path"],
+                "registered_task_ids": details["registered_task_ids"],
+                "skill_ids": [{"skill_id": skill["id"]} for skill in details["Skills"]],
+                "Skills": details["Skills"],
+            }
+        return self._map_teacher(result)
 
-        if not supervisor and not student and not teacher:
-            raise ItemRetrievalException(User, f"Gebruiker met ID {id} niet gevonden")
-        return None
+    def _fetch_user(self, id: str, user_type: str | None) -> dict | None:
+        """Fetch a user with the fields of its type, or of every type when the type is not known yet."""
+        match, fetch = self._user_query(user_type, id="~id")
+        results = Db.read_transact(f"match {match} fetch {fetch}", {"id": id})
+        return results[0] if results else None
+
+    @staticmethod
+    def _user_query(user_type: str | None, id: str = "$id") -> tuple[str, str]:
+        """Match and fetch clause of the polymorphic user query, for one user type or for all of them."""
+        fetches = [_USER_TYPE_FETCH[user_type]] if user_type else list(_USER_TYPE_FETCH.values())
+        match = f"""
+            $user isa {user_type or "user"}, has id {id};
+            $user isa! $usertype;
+        """
+        fetch = f"""{{
+            'id': $user.id,
+            'email': $user.email,
+            'fullName': $user.fullName,
+            'imagePath': $user.imagePath,
+            'usertype': $usertype{"".join("," + fetch for fetch in fetches if fetch)}
+        }};"""
+        return match, fetch
+
+    def get_users_page(self, page: PageRequest, user_type: str | None = None) -> Page[User | dict]:
+        """One page of all users, or of the users of one type, ordered by id (users have no createdAt)."""
+        match, fetch = self._user_query(user_type)
+        return read_page(page, match, fetch, BY_ID, self._map_user,
+                         count_match=f"$counted isa {user_type or 'user'};")
+
+    def _load_many(self, ids: list[str]) -> dict[str, User]:
+        clause, params = any_of("$id", ids)
+        query = f"""
+            match
+                $user isa user, has id $id;
+                {clause}
+                $user isa! $usertype;
+            fetch {{
+                'id': $id,
+                'email': $user.email,
+                'fullName': $user.fullName,
+                'imagePath': $user.imagePath,
+                'usertype': $usertype
+            }};
+        """
+        results = Db.read_transact(query, params)
+        return {result["id"]: self._map_to_model(result) for result in results}
 
     def get_all(self) -> list[User]:
         # Combine all user types
@@ -226,38 +355,43 @@ class UserRepository(BaseRepository[User]):
         return [self._map_supervisor(data) for data in grouped.values()]
 
 
-    def get_all_students(self) -> list[Student]:
-        query = """
+    _STUDENT_LIST_MATCH = """
+        $student isa student,
+        has id $id,
+        has email $email,
+        has fullName $fullName,
+        has imagePath $imagePath;
+    """
+    _STUDENT_LIST_FETCH = """{
+        'id': $id,
+        'email': $email,
+        'full_name': $fullName,
+        'type': 'student',
+        'image_path': $imagePath,
+        'registered_task_ids': [
             match
-                $student isa student,
-                has id $id,
-                has email $email,
-                has fullName $fullName,
-                has imagePath $imagePath;
-            fetch {
-                'id': $id,
-                'email': $email,
-                'full_name': $fullName,
-                'type': 'student',
-                'image_path': $imagePath,
-                'registered_task_ids': [
-                    match
-                        $task isa task;
-                        $registersForTask isa registersForTask( $student, $task );
-                    fetch { 'task_id': $task.id };
-                ],
-                'skill_ids': [
-                    match
-                        $skill isa skill;
-                        $hasSkill isa hasSkill( $student, $skill );
-                    fetch { 'skill_id': $skill.id };
-                ]
-            };
-        """
-        results = Db.read_transact(query)
+                $task isa task;
+                $registersForTask isa registersForTask( $student, $task );
+            fetch { 'task_id': $task.id };
+        ],
+        'skill_ids': [
+            match
+                $skill isa skill;
+                $hasSkill isa hasSkill( $student, $skill );
+            fetch { 'skill_id': $skill.id };
+        ]
+    };"""
+
+    def get_all_students(self) -> list[Student]:
+        results = Db.read_transact(f"match {self._STUDENT_LIST_MATCH} fetch {self._STUDENT_LIST_FETCH}")
 
         return results
 
+    def get_students_page(self, page: PageRequest) -> Page[dict]:
+        """One page of all students in the shape of `get_all_students`, ordered by id."""
+        return read_page(page, self._STUDENT_LIST_MATCH, self._STUDENT_LIST_FETCH, BY_ID, lambda row: row,
+                         count_match="$counted isa student;")
+
     def get_all_teachers(self) -> list[Teacher]:
         query = """
             match
@@ -457,6 +591,7 @@ class UserRepository(BaseRepository[User]):
         Update student profile information (description, profile picture, CV)
         """
         # Build update statements for provided fields
+        statements = []
         update_statements = []
         params = {"id": id}
 
@@ -479,12 +614,11 @@ class UserRepository(BaseRepository[User]):
                     delete
                         has $cvPath of $student;
                 """
-                Db.write_transact(delete_query, {"id": id})
+                statements.append((delete_query, {"id": id}))
             else:
                 update_statements.append('$student has cvPath ~cv_path;')
                 params["cv_path"] = cv_path
 
-        # Only execute if there are updates to make
         if update_statements:
             update_query = f"""
                 match
@@ -492,7 +626,22 @@ class UserRepository(BaseRepository[User]):
                 update
                     {' '.join(update_statements)}
             """
-            Db.write_transact(update_query, params)
+            statements.append((update_query, params))
+
+        # Apply the CV removal and the other updates together (no-op if nothing changed)
+        Db.write_batch(statements)
+        entity_versions.bump("user")
+
+    def update_image_path(self, id: str, image_path: str) -> None:
+        """Set the profile picture of a user of any type"""
+        query = """
+            match
+                $user isa user, has id ~id;
+            update
+                $user has imagePath ~image_path;
+        """
+        Db.write_transact(query, {"id": id, "image_path": image_path})
+        entity_versions.bump("user")
 
     def get_by_sub_and_provider(self, sub: str, provider: str) -> User | None:
         """Get user from database by OAuth sub (provider user ID) and provider"""
@@ -546,25 +695,24 @@ class UserRepository(BaseRepository[User]):
                 $name like ~provider_pattern;
             fetch { 'name': $provider.name };
         """
-        provider_results = Db.read_transact(provider_query, {
-            "provider_pattern": f"(?i){oauth_provider.provider_name}"
-        })
+        provider_results = oauth_provider_cache.get_or_load(
+            oauth_provider.provider_name.lower(),
+            lambda: Db.read_transact(provider_query, {
+                "provider_pattern": f"(?i){oauth_provider.provider_name}"
+            })
+        )
 
         if not provider_results:
             raise HTTPException(400, f"We ondersteunen '{oauth_provider.provider_name}' nog niet")
 
         id = generate_uuid()
 
-        # Handle image path - could be a URL (Google/GitHub) or already a filename (Microsoft)
+        # A picture URL (Google/GitHub) is downloaded in the background by the AvatarDownloader,
+        # until then the user gets the default image
         downloaded_image_name = ""
-        if user.image_path:
-            parsed_url = urlparse(user.image_path)
-            # Check if it's a URL with http or https scheme
-            if parsed_url.scheme in ('http', 'https'):
-                downloaded_image_name = save_image_from_url(user.image_path)
-            else:
-                # It's already a filename or local path
-                downloaded_image_name = user.image_path
+        if user.image_path and urlparse(user.image_path).scheme not in ('http', 'https'):
+            # It's already a filename or local path
+            downloaded_image_name = user.image_path
 
         if role == "teacher":
             # TODO: still need to determine if the user is student/teacher (probably based on email domain)
@@ -607,6 +755,7 @@ class UserRepository(BaseRepository[User]):
                 "oauth_sub": oauth_provider.oauth_sub,
                 "location": location_value
             })
+            entity_versions.bump("user")
 
             # Return the created supervisor
             return self.get_supervisor_by_id(id)
@@ -634,6 +783,7 @@ class UserRepository(BaseRepository[User]):
                 "image_path": downloaded_image_name,
                 "oauth_sub": oauth_provider.oauth_sub
             })
+            entity_versions.bump("user")
 
             # if user is a student, it returns a dict which needs to be mapped to Student model
             created_user = self.get_by_id(id)
@@ -646,7 +796,7 @@ class UserRepository(BaseRepository[User]):
         else:
             raise HTTPException(400, f"Onbekende rol '{role}' bij het aanmaken van gebruiker")
 
-    async def get_supervisor_accessible_resources_with_id(self, supervisor_company_id: str, resource_id: str) -> dict:
+    def get_supervisor_accessible_resources_with_id(self, supervisor_company_id: str, resource_id: str) -> dict:
         """
         Fetch all accessible resources (projects, tasks, users) for a supervisor's company by resource ID.
         (should only have 1 result, but its technically possible to have multiple matches, though infinitely unlikely)
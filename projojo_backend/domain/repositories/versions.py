@@ -0,0 +1,77 @@
+import secrets
+import threading
+import time
+from typing import Callable
+
+
+class EntityVersions:
+    """
+    Process-wide version counter per entity type, bumped by the repository write methods.
+
+    A read endpoint that only returns data of some entity types can tell whether that data
+    changed by comparing versions, without querying TypeDB. Repositories call `bump()` after
+    the write has been committed, so a version is never newer than the data a reader sees.
+
+    The counters live in memory and start at 0 on every start, so the ETags include a token
+    per process: ETags handed out before a restart never match afterwards.
+
+    Usage:
+    ```python
+    def create(self, skill: Skill) -> Skill:
+        Db.write_transact(...)
+        entity_versions.bump("skill")
+
+    entity_versions.etag("skill")  # 'W/"3f9a1c2e-4"'
+    ```
+    """
+
+    def __init__(self):
+        self._versions: dict[str, int] = {}
+        self._changed_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._process_token = secrets.token_hex(4)
+        self._started_at = time.time()
+        self._listeners: list[Callable[[tuple[str, ...]], None]] = []
+
+    def bump(self, *entity_types: str) -> None:
+        """Mark the data of the entity types as changed and tell the listeners."""
+        now = time.time()
+        with self._lock:
+            for entity_type in entity_types:
+                self._versions[entity_type] = self._versions.get(entity_type, 0) + 1
+                self._changed_at[entity_type] = now
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(entity_types)
+
+    def add_listener(self, listener: Callable[[tuple[str, ...]], None]) -> None:
+        """
+        Call `listener` with the bumped entity types after every bump. It runs on the thread of the
+        write (usually a database executor thread), so it must be quick and thread-safe.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[tuple[str, ...]], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def version(self, entity_type: str) -> int:
+        with self._lock:
+            return self._versions.get(entity_type, 0)
+
+    def etag(self, *entity_types: str) -> str:
+        """Weak ETag of the combined versions of the entity types (changes when any of them changes)."""
+        with self._lock:
+            versions = ".".join(str(self._versions.get(entity_type, 0)) for entity_type in entity_types)
+        return f'W/"{self._process_token}-{versions}"'
+
+    def last_modified(self, *entity_types: str) -> float:
+        """Unix time of the last change of any of the entity types (the start of the process if none changed)."""
+        with self._lock:
+            return max((self._changed_at.get(entity_type, self._started_at) for entity_type in entity_types),
+                       default=self._started_at)
+
+
+entity_versions = EntityVersions()
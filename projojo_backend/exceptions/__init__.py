@@ -1,2 +1,4 @@
 from .exceptions import ItemRetrievalException
-from .exceptions import UnauthorizedException
\ No newline at end of file
+from .exceptions import UnauthorizedException
+from .exceptions import DatabaseBusyException, DatabaseTimeoutException, DatabaseUnavailableException
+from .exceptions import InvalidCursorException
@@ -14,4 +14,20 @@ class ItemRetrievalException(GenericException):
     def __init__(self, item_class: type, message="Could not be found"):
         class_name = item_class.__name__
         full_message = f"{class_name} retrieval failed: {message}"
-        super().__init__(message=full_message, status_code=404)
\ No newline at end of file
+        super().__init__(message=full_message, status_code=404)
+
+class DatabaseBusyException(GenericException):
+    def __init__(self, message="De server is momenteel erg druk. Probeer het over een paar seconden opnieuw."):
+        super().__init__(message=message, status_code=503)
+
+class DatabaseTimeoutException(GenericException):
+    def __init__(self, message="De database reageerde niet op tijd. Probeer het later opnieuw."):
+        super().__init__(message=message, status_code=504)
+
+class InvalidCursorException(GenericException):
+    def __init__(self, message="Ongeldige cursor. Begin opnieuw bij de eerste pagina."):
+        super().__init__(message=message, status_code=400)
+
+class DatabaseUnavailableException(GenericException):
+    def __init__(self, message="De database is tijdelijk niet bereikbaar. Probeer het over een moment opnieuw."):
+        super().__init__(message=message, status_code=503)
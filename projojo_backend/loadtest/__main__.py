@@ -0,0 +1,43 @@
+"""
+In-process end-to-end load test: virtual students and supervisors send a realistic traffic mix
+to the FastAPI app over an ASGI transport, against the in-memory TypeDB stand-in.
+
+Run from the projojo_backend directory (the settings need the usual environment variables):
+
+    python -m loadtest --students 20 --supervisors 5 --duration 30 --latency 0.002
+    python -m loadtest --output loadtest/results/$(git rev-parse --short HEAD).json
+
+The in-memory database starts from seed.tql; --latency is the time every query takes.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from benchmarks.runner import save
+from .harness import build_users, format_report, run_load_test, setup_in_memory_database
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="In-process end-to-end load test")
+    parser.add_argument("--students", type=int, default=10, help="Number of virtual students")
+    parser.add_argument("--supervisors", type=int, default=3, help="Number of virtual supervisors")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duration of the test in seconds")
+    parser.add_argument("--latency", type=float, default=0.002, help="Seconds every database query takes")
+    parser.add_argument("--think-time", type=float, default=0.05, help="Mean pause between requests of a user in seconds")
+    parser.add_argument("--seed", type=int, help="Random seed, for a reproducible request sequence")
+    parser.add_argument("--output", "-o", help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    driver = setup_in_memory_database(latency=args.latency)
+    from main import app
+
+    users = build_users(driver.graph, args.students, args.supervisors)
+    results = asyncio.run(run_load_test(app, users, args.duration, args.think_time, args.seed))
+    print("\n".join(format_report(results)))
+    if args.output:
+        save(results, args.output)
+    return 1 if results["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
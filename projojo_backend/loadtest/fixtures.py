@@ -0,0 +1,210 @@
+"""
+Handlers that let the in-memory driver answer the queries of the load test routes from its graph
+(the seed data of seed.tql, loaded through the normal `create_database_if_needed` code path).
+
+When one of these queries changes in a repository, the matching pattern below has to follow.
+"""
+import re
+from typing import Any
+from db.in_memory_driver import InMemoryDriver, InMemoryGraph, Thing
+
+_ID = r'"(?P<{}>[^"]+)"'
+_STRING = r'"(?P<{}>(?:[^"\\]|\\.)*)"'
+
+
+def _datetime(value: Any) -> Any:
+    # Seed datetimes carry a timezone (2025-01-15T09:00:00+0000), TypeDB returns them without one
+    return value[:19] if isinstance(value, str) else value
+
+
+def _unescape(value: str) -> str:
+    return value.replace('\\"', '"').replace('\\\\', '\\')
+
+
+def _registrations(graph: InMemoryGraph, task: Thing) -> list[Thing]:
+    return graph.relations("registersForTask", task=task)
+
+
+def _task_row(graph: InMemoryGraph, task: Thing) -> dict[str, Any]:
+    return {
+        "id": task.get("id"),
+        "name": task.get("name"),
+        "description": task.get("description"),
+        "total_needed": task.get("totalNeeded"),
+        "created_at": _datetime(task.get("createdAt")),
+        "total_registered": task.get("totalRegistered"),
+        "total_accepted": task.get("totalAccepted"),
+    }
+
+
+def _skill_row(skill: Thing) -> dict[str, Any]:
+    return {
+        "id": skill.get("id"),
+        "name": skill.get("name"),
+        "is_pending": skill.get("isPending"),
+        "created_at": _datetime(skill.get("createdAt")),
+    }
+
+
+def _businesses_with_full_nesting(query: str, graph: InMemoryGraph, match: re.Match) -> list[dict[str, Any]]:
+    rows = []
+    for business in graph.things("business"):
+        projects = []
+        for has_projects in graph.relations("hasProjects", business=business):
+            project = has_projects.player("project")
+            tasks = []
+            for contains in graph.relations("containsTask", project=project):
+                task = contains.player("task")
+                tasks.append({
+                    **_task_row(graph, task),
+                    "project_id": project.get("id"),
+                    "skills": [
+                        _skill_row(requires.player("skill"))
+                        for requires in graph.relations("requiresSkill", task=task)
+                    ],
+                })
+            projects.append({
+                "id": project.get("id"),
+                "name": project.get("name"),
+                "description": project.get("description"),
+                "image_path": project.get("imagePath"),
+                "created_at": _datetime(project.get("createdAt")),
+                "location": project.get("location"),
+                "tasks": tasks,
+            })
+        rows.append({
+            "id": business.get("id"),
+            "name": business.get("name"),
+            "description": business.get("description"),
+            "image_path": business.get("imagePath"),
+            "location": business.get("location"),
+            "projects": projects,
+        })
+    return rows
+
+
+def _task_by_id(query: str, graph: InMemoryGraph, match: re.Match) -> list[dict[str, Any]]:
+    task = graph.find("task", id=match["id"])
+    return [_task_row(graph, task)] if task else []
+
+
+def _student_registrations(query: str, graph: InMemoryGraph, match: re.Match) -> list[dict[str, Any]]:
+    student = graph.find("student", id=match["student_id"])
+    if student is None:
+        return []
+    return [
+        {"id": registration.player("task").get("id")}
+        for registration in graph.relations("registersForTask", student=student)
+    ]
+
+
+def _create_registration(query: str, graph: InMemoryGraph, match: re.Match) -> None:
+    task = graph.find("task", id=match["task_id"])
+    student = graph.find("student", id=match["student_id"])
+    if task is None or student is None:
+        return
+    graph.add(
+        "registersForTask",
+        roles={"student": student, "task": task},
+        description=_unescape(match["motivation"]),
+        createdAt=match["created_at"],
+    )
+
+
+def _increment_registered(query: str, graph: InMemoryGraph, match: re.Match) -> None:
+    task = graph.find("task", id=match["task_id"])
+    if task is not None and "totalRegistered" in task.attributes:
+        task.attributes["totalRegistered"] = [task.get("totalRegistered") + 1]
+
+
+def _task_registrations(query: str, graph: InMemoryGraph, match: re.Match) -> list[dict[str, Any]]:
+    task = graph.find("task", id=match["task_id"])
+    if task is None:
+        return []
+    rows = []
+    for registration in _registrations(graph, task):
+        if "isAccepted" in registration.attributes:
+            continue
+        student = registration.player("student")
+        rows.append({
+            "reason": registration.get("description"),
+            "student": {
+                "id": student.get("id"),
+                "full_name": student.get("fullName"),
+                "skills": [
+                    {**_skill_row(has_skill.player("skill")), "description": has_skill.get("description")}
+                    for has_skill in graph.relations("hasSkill", student=student)
+                ],
+            },
+        })
+    return rows
+
+
+def _supervisor_accessible_resources(query: str, graph: InMemoryGraph, match: re.Match) -> list[dict[str, Any]]:
+    business = graph.find("business", id=match["business_id"])
+    if business is None:
+        return []
+    resource_id = match["resource_id"]
+
+    projects = [r.player("project") for r in graph.relations("hasProjects", business=business)]
+    tasks = [c.player("task") for project in projects for c in graph.relations("containsTask", project=project)]
+    supervisors = [m.player("supervisor") for m in graph.relations("manages", business=business)]
+    return [{
+        "projects": [{"project_id": p.get("id")} for p in projects if p.get("id") == resource_id],
+        "tasks": [{"task_id": t.get("id")} for t in tasks if t.get("id") == resource_id],
+        "users": [{"user_id": s.get("id")} for s in supervisors if s.get("id") == resource_id],
+    }]
+
+
+HANDLERS = [
+    # BusinessRepository.iter_all_with_full_nesting
+    (r'match \$business isa business; fetch \{ "id": \$business\.id', _businesses_with_full_nesting),
+    # TaskRepository.get_by_id
+    (r'match \$task isa task, has id ' + _ID.format("id") + r', has name \$name', _task_by_id),
+    # UserRepository.get_student_registrations
+    (r'match \$student isa student, has id ' + _ID.format("student_id")
+     + r'; \$registration isa registersForTask \(student: \$student, task: \$task\); fetch \{ \'id\': \$task\.id',
+     _student_registrations),
+    # TaskRepository.create_registration
+    (r'match \$task isa task, has id ' + _ID.format("task_id")
+     + r'; \$student isa student, has id ' + _ID.format("student_id")
+     + r'; insert \$registration isa registersForTask \(student: \$student, task: \$task\), has description '
+     + _STRING.format("motivation") + r', has createdAt (?P<created_at>[0-9T:.+-]+);',
+     _create_registration),
+    # TaskRepository.create_registration (counter, same transaction)
+    (r'match \$task isa task, has id ' + _ID.format("task_id")
+     + r', has totalRegistered \$registered; let \$new_registered = \$registered \+ 1;',
+     _increment_registered),
+    # TaskRepository.get_registrations
+    (r'match \$task isa task, has id ' + _ID.format("task_id")
+     + r'; \$student isa student, has id \$student_id; \$registration isa registersForTask',
+     _task_registrations),
+    # UserRepository.get_supervisor_accessible_resources_with_id (ownership checks of @auth)
+    (r'match \$business isa business, has id ' + _ID.format("business_id")
+     + r'; fetch \{ \'projects\': \[ match \$p1 isa project, has id ' + _ID.format("resource_id"),
+     _supervisor_accessible_resources),
+]
+
+
+def install_handlers(driver: InMemoryDriver) -> None:
+    """Register the handlers for all queries issued by the load test routes."""
+    for pattern, handler in HANDLERS:
+        driver.on(pattern, handler)
+
+
+def add_students(graph: InMemoryGraph, count: int) -> list[str]:
+    """Add `count` synthetic students (for more virtual students than the seed has) and return their ids."""
+    ids = []
+    for number in range(count):
+        student_id = f"00000000-0000-4000-8000-{number:012d}"
+        graph.add(
+            "student",
+            id=student_id,
+            email=f"loadtest{number}@student.han.nl",
+            fullName=f"Load Test {number}",
+            imagePath="default.png",
+            description="",
+            createdAt="2025-01-15T09:00:00",
+        )
+        ids.append(student_id)
+    return ids
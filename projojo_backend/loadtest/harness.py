@@ -0,0 +1,195 @@
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+import httpx
+from auth.jwt_utils import create_jwt_token
+from db.in_memory_driver import InMemoryDriver, InMemoryGraph
+from db.initDatabase import Db, create_database_if_needed
+from .fixtures import add_students, install_handlers
+
+MOTIVATION = "Ik wil graag meewerken aan deze taak en heb ervaring met vergelijkbare projecten."
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+    def record(self, seconds: float, status: int | None) -> None:
+        self.latencies.append(seconds)
+        if status is None:
+            self.statuses["exception"] += 1
+            self.errors += 1
+            return
+        self.statuses[str(status)] += 1
+        if status >= 500:
+            self.errors += 1
+
+    def summary(self, duration: float) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / duration, 1) if duration > 0 else 0.0,
+            "errors": self.errors,
+            "statuses": dict(sorted(self.statuses.items())),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+
+
+@dataclass
+class VirtualUser:
+    user_id: str
+    token: str
+    # (route template, weight, request factory) the user picks from on every iteration
+    actions: list[tuple[str, int, Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]]]
+
+
+def setup_in_memory_database(latency: float = 0.002, commit_latency: float = 0.0) -> InMemoryDriver:
+    """Plug the in-memory driver into `Db` and load schema.tql and seed.tql, as on a fresh TypeDB server."""
+    driver = InMemoryDriver(latency=latency, commit_latency=commit_latency)
+    Db.use_driver(driver)
+    create_database_if_needed()
+    install_handlers(driver)
+    return driver
+
+
+def _supervisor_tasks(graph: InMemoryGraph) -> list[tuple[str, str, list[str]]]:
+    """(supervisor id, business id, ids of the tasks of that business) for every supervisor."""
+    result = []
+    for manages in graph.relations("manages"):
+        business = manages.player("business")
+        task_ids = [
+            contains.player("task").get("id")
+            for has_projects in graph.relations("hasProjects", business=business)
+            for contains in graph.relations("containsTask", project=has_projects.player("project"))
+        ]
+        if task_ids:
+            result.append((manages.player("supervisor").get("id"), business.get("id"), task_ids))
+    return result
+
+
+def build_users(graph: InMemoryGraph, students: int, supervisors: int) -> list[VirtualUser]:
+    """
+    Create the virtual users and their traffic mix:
+    - students browse /businesses/complete, open tasks and sometimes register for one
+    - supervisors review the registrations of the tasks of their own business
+    """
+    task_ids = [task.get("id") for task in graph.things("task")]
+    student_ids = [student.get("id") for student in graph.things("student")]
+    if students > len(student_ids):
+        student_ids += add_students(graph, students - len(student_ids))
+
+    def get(path: Callable[[random.Random], str]):
+        return lambda client, rng: client.get(path(rng))
+
+    users = []
+    for student_id in student_ids[:students]:
+        users.append(VirtualUser(student_id, create_jwt_token(student_id, "student"), [
+            ("GET /businesses/complete", 2, get(lambda rng: "/businesses/complete")),
+            ("GET /tasks/{id}", 6, get(lambda rng: f"/tasks/{rng.choice(task_ids)}")),
+            ("POST /tasks/{id}/registrations", 1, lambda client, rng: client.post(
+                f"/tasks/{rng.choice(task_ids)}/registrations", json={"motivation": MOTIVATION})),
+        ]))
+
+    available = _supervisor_tasks(graph)
+    for supervisor_id, business_id, own_task_ids in available[:supervisors]:
+        users.append(VirtualUser(supervisor_id, create_jwt_token(supervisor_id, "supervisor", business_id), [
+            ("GET /tasks/{id}/registrations", 1,
+             lambda client, rng, own=own_task_ids: client.get(f"/tasks/{rng.choice(own)}/registrations")),
+        ]))
+    return users
+
+
+async def _run_user(client: httpx.AsyncClient, user: VirtualUser, stats: dict[str, RouteStats],
+                    deadline: float, think_time: float, rng: random.Random) -> None:
+    weights = [weight for _, weight, _ in user.actions]
+    while time.perf_counter() < deadline:
+        route, _, request = rng.choices(user.actions, weights=weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await request(client, rng)
+            status = response.status_code
+        except Exception:
+            status = None
+        stats.setdefault(route, RouteStats()).record(time.perf_counter() - started, status)
+        if think_time > 0:
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+
+
+async def run_load_test(app: Any, users: list[VirtualUser], duration: float = 10.0,
+                        think_time: float = 0.05, seed: int | None = None) -> dict[str, Any]:
+    """
+    Let all virtual users send requests to `app` in-process (over an ASGI transport, no network)
+    for `duration` seconds, with an exponentially distributed think time between requests.
+
+    Returns:
+        Per route template: request count, throughput, status codes, errors (5xx and exceptions)
+        and p50/p95/p99 latency, plus a "total" entry over all routes
+    """
+    stats: dict[str, RouteStats] = {}
+    transport = httpx.ASGITransport(app=app)
+    rng = random.Random(seed)
+
+    started = time.perf_counter()
+    deadline = started + duration
+    clients = [
+        httpx.AsyncClient(transport=transport, base_url="http://loadtest",
+                          headers={"Authorization": f"Bearer {user.token}"})
+        for user in users
+    ]
+    try:
+        await asyncio.gather(*(
+            _run_user(client, user, stats, deadline, think_time, random.Random(rng.random()))
+            for client, user in zip(clients, users)
+        ))
+    finally:
+        for client in clients:
+            await client.aclose()
+    elapsed = time.perf_counter() - started
+
+    total = RouteStats()
+    for route_stats in stats.values():
+        total.latencies += route_stats.latencies
+        total.statuses.update(route_stats.statuses)
+        total.errors += route_stats.errors
+
+    routes = {route: stats[route].summary(elapsed) for route in sorted(stats)}
+    return {
+        "meta": {
+            "duration_s": round(elapsed, 2),
+            "users": len(users),
+            "think_time_s": think_time,
+        },
+        "routes": routes,
+        "total": total.summary(elapsed),
+    }
+
+
+def format_report(results: dict[str, Any]) -> list[str]:
+    lines = [
+        f"{results['meta']['users']} virtual users for {results['meta']['duration_s']} s",
+        f"{'route':<34} {'requests':>8} {'req/s':>8} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses",
+    ]
+    for route, summary in [*results["routes"].items(), ("total", results["total"])]:
+        statuses = " ".join(f"{status}:{count}" for status, count in summary["statuses"].items())
+        lines.append(
+            f"{route:<34} {summary['requests']:>8} {summary['throughput_rps']:>8.1f} {summary['errors']:>6} "
+            f"{summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f}  {statuses}"
+        )
+    return lines
@@ -1,18 +1,18 @@
 from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
-from fastapi.staticfiles import StaticFiles
 import uvicorn
 import logging
 import os
 from contextlib import asynccontextmanager
 from config.settings import IS_PRODUCTION, IS_DEVELOPMENT, SESSIONS_SECRET_KEY
-from exceptions.exceptions import ItemRetrievalException, UnauthorizedException
+from exceptions.exceptions import ItemRetrievalException, UnauthorizedException, DatabaseBusyException, DatabaseTimeoutException, DatabaseUnavailableException, InvalidCursorException
 from exceptions.global_exception_handler import generic_handler
 from auth.jwt_middleware import JWTMiddleware
 from auth.permissions import auth
-from service.custom_static_files import FallbackStaticFiles
+from service.custom_static_files import CachedStaticFiles, FallbackStaticFiles
 
 # ============================================================================
 # EMAIL TEST IMPORTS - REMOVE AFTER TESTING
@@ -37,6 +37,16 @@ from routes.user_router import router as user_router
 
 # Import the TypeDB connection module
 from db.initDatabase import get_database
+from db.async_db import AsyncDb
+from db.connection_supervisor import connection_supervisor
+from db.slow_query_log import slow_query_log
+from domain.repositories.cache import get_cache_stats
+from service import metrics_service
+from db.unit_of_work import UnitOfWorkMiddleware
+from service.registration_counter_service import registration_counter_reconciler
+from service.discovery_service import discovery_snapshot
+from service.image_variant_service import image_variants
+from service.avatar_service import avatar_downloader
 
 # Set up logger
 logger = logging.getLogger('uvicorn.error')
@@ -47,11 +57,23 @@ async def lifespan(app: FastAPI):
     # Initialize TypeDB connection
     print("Initializing TypeDB connection...")
     Db = get_database()
+    # From here on reconnects happen in the background, requests fail fast while TypeDB is down
+    connection_supervisor.start()
+    # Recounts the registration counters of tasks now and then, see RegistrationCounterReconciler
+    registration_counter_reconciler.start()
+    # Builds the snapshot /businesses/complete is served from, see DiscoverySnapshotRefresher
+    discovery_snapshot.start()
 
     yield {}
 
     # Close TypeDB connection on shutdown
     print("Closing TypeDB connection...")
+    await discovery_snapshot.stop()
+    await registration_counter_reconciler.stop()
+    await avatar_downloader.stop()
+    await connection_supervisor.stop()
+    image_variants.shutdown()
+    AsyncDb.shutdown()
     Db.close()
 
 app = FastAPI(
@@ -74,6 +96,9 @@ app.add_middleware(
 # Add JWT validation middleware
 app.add_middleware(JWTMiddleware)
 
+# Share one TypeDB read transaction between all reads of a request
+app.add_middleware(UnitOfWorkMiddleware)
+
 # Add session middleware (required by authlib for OAuth state)
 app.add_middleware(
     SessionMiddleware,
@@ -111,18 +136,45 @@ app.include_router(user_router)
 # Add exception handler for Custom exceptions
 app.add_exception_handler(ItemRetrievalException, generic_handler)
 app.add_exception_handler(UnauthorizedException, generic_handler)
+app.add_exception_handler(DatabaseBusyException, generic_handler)
+app.add_exception_handler(DatabaseTimeoutException, generic_handler)
+app.add_exception_handler(DatabaseUnavailableException, generic_handler)
+app.add_exception_handler(InvalidCursorException, generic_handler)
 
 # Dependency to get TypeDB connection
 def get_db():
     return get_database()
 
-app.mount("/image", FallbackStaticFiles(directory="static/images", default_file="static/default.svg"), name="image")
-app.mount("/pdf", StaticFiles(directory="static/pdf"), name="pdf")
+app.mount("/image", FallbackStaticFiles(directory="static/images", default_file="static/default.svg",
+                                        variants=image_variants), name="image")
+app.mount("/pdf", CachedStaticFiles(directory="static/pdf", private=True), name="pdf")
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to Projojo Backend API"}
 
+@app.get("/typedb/health")
+async def typedb_health():
+    """Connection supervisor and circuit breaker state (503 while TypeDB is unreachable)"""
+    state = connection_supervisor.snapshot()
+    healthy = state["connected"] and state["breaker"]["state"] != "open"
+    return JSONResponse(state, status_code=200 if healthy else 503)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Query, circuit breaker and cache metrics in Prometheus text format"""
+    return Response(metrics_service.render_metrics(), media_type=metrics_service.CONTENT_TYPE)
+
+@app.get("/typedb/slow-queries")
+@auth(role="teacher")
+async def typedb_slow_queries(limit: int = 10, window_minutes: int = 60):
+    """Slowest query fingerprints of the last `window_minutes`, by total time spent"""
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "window_minutes": window_minutes,
+        "queries": slow_query_log.top(limit, window_minutes * 60)
+    }
+
 @app.get("/typedb/status")
 async def typedb_status(db=Depends(get_db)):
     """Check TypeDB connection status"""
@@ -135,7 +187,13 @@ async def typedb_status(db=Depends(get_db)):
         return {
             "status": "connected",
             "database": db_name,
-            "server": db.address
+            "server": db.address,
+            "supervisor": connection_supervisor.snapshot(),
+            "registration_counters": registration_counter_reconciler.snapshot(),
+            "discovery_snapshot": discovery_snapshot.stats(),
+            "image_variants": image_variants.stats(),
+            "avatar_downloads": avatar_downloader.stats(),
+            "cache": get_cache_stats()
         }
     except Exception as e:
         return {
@@ -8,6 +8,7 @@ from auth.permissions import auth
 from service.auth_service import AuthService
 from config.settings import FRONTEND_URL, IS_DEVELOPMENT
 from urllib.parse import urlparse
+from db.async_db import AsyncDb
 
 user_repo = UserRepository()
 router = APIRouter(prefix="/auth", tags=["Auth Endpoints"])
@@ -117,7 +118,7 @@ async def test_login(user_id: str, request: Request):
         raise HTTPException(status_code=403, detail="Dit kan alleen in de test-omgeving")
 
     # Get user from database
-    user = user_repo.get_by_id(user_id)
+    user = await AsyncDb.run(user_repo.get_by_id, user_id)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -139,7 +140,7 @@ async def test_login(user_id: str, request: Request):
     # Get business_id if user is a supervisor
     business_id = None
     if user_type == "supervisor":
-        supervisor = user_repo.get_supervisor_by_id(user_id_value)
+        supervisor = await AsyncDb.run(user_repo.get_supervisor_by_id, user_id_value)
         if supervisor:
             business_id = supervisor.business_association_id
 
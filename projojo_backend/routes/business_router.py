@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Path, Body, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Path, Body, HTTPException, File, UploadFile, Form, Request
 from typing import Optional
 from auth.permissions import auth
 
@@ -12,6 +12,10 @@ from domain.repositories import (
 from domain.models import Business
 from service import save_image
 from service.validation_service import is_valid_length
+from service.streaming_service import accepts_ndjson, stream_json_array, stream_ndjson
+from service.conditional_get_service import conditional_get
+from service.discovery_service import DISCOVERY_ENTITY_TYPES, discovery_snapshot
+from db.async_db import AsyncDb
 
 business_repo = BusinessRepository()
 project_repo = ProjectRepository()
@@ -29,9 +33,12 @@ async def get_all_businesses_with_projects():
     """
     Get all businesses for debugging purposes
     """
-    businesses = business_repo.get_all()
+    businesses = await AsyncDb.run(business_repo.get_all)
+    projects_per_business = await AsyncDb.run(
+        project_repo.business_projects_loader.load_many, [business.id for business in businesses]
+    )
     for business in businesses:
-        business.projects = project_repo.get_projects_by_business(business.id)
+        business.projects = projects_per_business[business.id]
 
     return businesses
 
@@ -42,16 +49,34 @@ async def get_all_businesses_basic():
     """
     Get all businesses without projects
     """
-    return business_repo.get_all()
+    return await AsyncDb.run(business_repo.get_all)
 
 
 @router.get("/complete")
 @auth(role="authenticated")
-async def get_all_businesses_with_full_nesting():
+async def get_all_businesses_with_full_nesting(request: Request):
     """
     Get all businesses with projects, tasks, and skills nested.
+    Served from the in-memory discovery snapshot (see `service.discovery_service`) once it has
+    been built; before that businesses are streamed to the client while they are read from the database.
+
+    With `Accept: application/x-ndjson` every business (with its projects, tasks and skills)
+    is sent as a separate line of JSON.
+
+    Answers 304 Not Modified, without querying, when the client's ETag is still current.
     """
-    return business_repo.get_all_with_full_nesting()
+    snapshot = discovery_snapshot.current
+    if snapshot is not None:
+        return snapshot.response(request)
+    return await _stream_businesses_with_full_nesting(request)
+
+
+@conditional_get(*DISCOVERY_ENTITY_TYPES)
+async def _stream_businesses_with_full_nesting(request: Request):
+    businesses = AsyncDb.iterate(business_repo.iter_all_with_full_nesting)
+    if accepts_ndjson(request):
+        return await stream_ndjson(businesses)
+    return await stream_json_array(businesses, vary_accept=True)
 
 @router.get("/{business_id}")
 @auth(role="authenticated")
@@ -59,7 +84,7 @@ async def get_business(business_id: str = Path(..., description="Business ID")):
     """
     Get a specific business by ID
     """
-    business = business_repo.get_by_id(business_id)
+    business = await AsyncDb.run(business_repo.get_by_id, business_id)
     return business
 
 @router.get("/{business_id}/projects")
@@ -68,7 +93,7 @@ async def get_business_projects(business_id: str = Path(..., description="Busine
     """
     Get all projects for a business
     """
-    projects = project_repo.get_projects_by_business(business_id)
+    projects = await AsyncDb.run(project_repo.get_projects_by_business, business_id)
     return projects
 
 
@@ -85,7 +110,7 @@ async def create_business(name: str = Body(...)):
         )
 
     try:
-        created_business = business_repo.create(name)
+        created_business = await AsyncDb.run(business_repo.create, name)
         return created_business
     except Exception as e:
         if "has a key constraint violation" in str(e):
@@ -112,7 +137,7 @@ async def update_business(
     Update business information with optional photo upload.
     """
     # Verify business exists
-    existing_business = business_repo.get_by_id(business_id)
+    existing_business = await AsyncDb.run(business_repo.get_by_id, business_id)
     if not existing_business:
         raise HTTPException(status_code=404, detail="Bedrijf niet gevonden")
 
@@ -147,7 +172,7 @@ async def update_business(
             raise HTTPException(status_code=500, detail="Er is een fout opgetreden bij het opslaan van de afbeelding")
 
     try:
-        business_repo.update(business_id, name, description, location, image_filename)
+        await AsyncDb.run(business_repo.update, business_id, name, description, location, image_filename)
         return {"message": "Bedrijf succesvol bijgewerkt"}
     except Exception as e:
         print(f"Error updating business {business_id}: {e}")
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Path, HTTPException
 from domain.repositories import InviteRepository, BusinessRepository
 from auth.permissions import auth
+from db.async_db import AsyncDb
 
 invite_repo = InviteRepository()
 business_repo = BusinessRepository()
@@ -13,7 +14,7 @@ async def validate_invite(token: str = Path(..., description="Invite Token")):
     """
     Validate an invite token and return business details if valid.
     """
-    result = invite_repo.validate_invite_key(token)
+    result = await AsyncDb.run(invite_repo.validate_invite_key, token)
     if not result:
         raise HTTPException(status_code=404, detail="Ongeldige of verlopen uitnodiging")
     return result
@@ -24,9 +25,9 @@ async def create_supervisor_invite_key(business_id: str = Path(..., description=
     """
     Create an invite key for a supervisor
     """
-    business = business_repo.get_by_id(business_id)
+    business = await AsyncDb.run(business_repo.get_by_id, business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Bedrijf is niet gevonden")
 
-    invite_key = invite_repo.save_invite_key(business_id)
+    invite_key = await AsyncDb.run(invite_repo.save_invite_key, business_id)
     return invite_key
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Path, File, UploadFile, Form, HTTPException
+from fastapi import APIRouter, Depends, Path, File, UploadFile, Form, HTTPException
 from typing import Annotated
 from datetime import datetime
 from auth.permissions import auth
@@ -7,6 +7,11 @@ from domain.repositories import ProjectRepository
 from domain.models import ProjectCreation
 from service import task_service, save_image
 from service.validation_service import is_valid_length
+from db.async_db import AsyncDb
+from service.pagination_service import page_params
+from service.conditional_get_service import conditional_get
+from service.discovery_service import DISCOVERY_ENTITY_TYPES
+from domain.repositories.pagination import PageRequest
 
 project_repo = ProjectRepository()
 
@@ -15,11 +20,13 @@ router = APIRouter(prefix="/projects", tags=["Project Endpoints"])
 # Project endpoints
 @router.get("/")
 @auth(role="authenticated")
-async def get_all_projects():
+async def get_all_projects(page: PageRequest | None = Depends(page_params)):
     """
-    Get all projects for debugging purposes
+    Get all projects for debugging purposes, or one page of them when `limit` or `cursor` is given
     """
-    projects = project_repo.get_all()
+    if page is not None:
+        return await AsyncDb.run(project_repo.get_page, page)
+    projects = await AsyncDb.run(project_repo.get_all)
     return projects
 
 @router.get("/{project_id}")
@@ -28,21 +35,22 @@ async def get_project(project_id: str = Path(..., description="Project ID")):
     """
     Get a specific project by ID
     """
-    project = project_repo.get_by_id(project_id)
+    project = await AsyncDb.run(project_repo.get_by_id, project_id)
     return project
 
 
 @router.get("/{project_id}/complete")
 @auth(role="authenticated")
+@conditional_get(*DISCOVERY_ENTITY_TYPES)
 async def get_project_full(project_id: str = Path(..., description="Project ID")):
     """
     Get a specific project by ID with all tasks and skills
     """
-    project = project_repo.get_by_id(project_id)
-    project.tasks = task_service.get_tasks_with_skills_by_project(project_id)
+    project = await AsyncDb.run(project_repo.get_by_id, project_id)
+    project.tasks = await AsyncDb.run(task_service.get_tasks_with_skills_by_project, project_id)
 
     project_dict = project.__dict__
-    project_dict["business"] = project_repo.get_business_by_project(project_id)
+    project_dict["business"] = await AsyncDb.run(project_repo.get_business_by_project, project_id)
     return project_dict
 
 
@@ -52,7 +60,7 @@ async def get_project_tasks(project_id: str = Path(..., description="Project ID"
     """
     Get all tasks for a project
     """
-    tasks = task_service.get_tasks_with_skills_by_project(project_id)
+    tasks = await AsyncDb.run(task_service.get_tasks_with_skills_by_project, project_id)
     return tasks
 
 @router.post("/", response_model=ProjectCreation, status_code=201)
@@ -93,7 +101,7 @@ async def create_project(
             detail="Een projectafbeelding is verplicht."
         )
 
-    if project_repo.check_project_exists(name, business_id):
+    if await AsyncDb.run(project_repo.check_project_exists, name, business_id):
         raise HTTPException(
             status_code=400,
             detail=f"Project met de naam '{name}' bestaat al binnen dit bedrijf."
@@ -115,7 +123,7 @@ async def create_project(
     )
 
     # Create the project in the database
-    created_project = project_repo.create(project_creation)
+    created_project = await AsyncDb.run(project_repo.create, project_creation)
     return created_project
 
 @router.put("/{project_id}")
@@ -161,7 +169,7 @@ async def update_project(
             raise HTTPException(status_code=500, detail="Er is een fout opgetreden bij het opslaan van de afbeelding")
 
     try:
-        project_repo.update(project_id, name, description, location, image_filename)
+        await AsyncDb.run(project_repo.update, project_id, name, description, location, image_filename)
         return {"message": "Project succesvol bijgewerkt"}
     except Exception as e:
         if hasattr(e, 'status_code'):
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Path, Body, HTTPException
+from fastapi import APIRouter, Depends, Path, Body, HTTPException
 from auth.permissions import auth
 
 from domain.repositories import SkillRepository
 from domain.models import Skill
 from exceptions import ItemRetrievalException
+from db.async_db import AsyncDb
+from service.pagination_service import page_params
+from service.conditional_get_service import conditional_get
+from domain.repositories.pagination import PageRequest
 
 skill_repo = SkillRepository()
 
@@ -12,11 +16,14 @@ router = APIRouter(prefix="/skills", tags=["Skill Endpoints"])
 # Skill endpoints
 @router.get("/")
 @auth(role="authenticated")
-async def get_all_skills():
+@conditional_get("skill")
+async def get_all_skills(page: PageRequest | None = Depends(page_params)):
     """
-    Get all skills for debugging purposes
+    Get all skills for debugging purposes, or one page of them when `limit` or `cursor` is given
     """
-    skills = skill_repo.get_all()
+    if page is not None:
+        return await AsyncDb.run(skill_repo.get_page, page)
+    skills = await AsyncDb.run(skill_repo.get_all)
     return skills
 
 @router.get("/{skill_id}")
@@ -25,7 +32,7 @@ async def get_skill(skill_id: str = Path(..., description="Skill ID")):
     """
     Get a specific skill by ID
     """
-    skill = skill_repo.get_by_id(skill_id)
+    skill = await AsyncDb.run(skill_repo.get_by_id, skill_id)
     return skill
 
 @router.post("/", response_model=Skill, status_code=201)
@@ -40,7 +47,7 @@ async def create_skill(skill: Skill = Body(...)):
         raise HTTPException(status_code=400, detail="Veld 'name' is verplicht")
 
     # Check for existing skill by (case-insensitive) exact name
-    existing = skill_repo.get_by_name_case_insensitive(name)
+    existing = await AsyncDb.run(skill_repo.get_by_name_case_insensitive, name)
     if existing:
         if getattr(existing, "is_pending", False):
             raise HTTPException(status_code=409, detail=f"De skill '{name}' bestaat al en wacht op beoordeling.")
@@ -48,7 +55,7 @@ async def create_skill(skill: Skill = Body(...)):
 
     # Normalize name before creating
     skill.name = name
-    created_skill = skill_repo.create(skill)
+    created_skill = await AsyncDb.run(skill_repo.create, skill)
     return created_skill
 
 @router.patch("/{skill_id}/acceptance")
@@ -67,24 +74,24 @@ async def update_skill_acceptance(
 
     # Ensure skill exists
     try:
-        skill_repo.get_by_id(skill_id)
+        await AsyncDb.run(skill_repo.get_by_id, skill_id)
     except ItemRetrievalException:
         raise
     except Exception:
         raise HTTPException(status_code=404, detail="Skill niet gevonden")
 
     try:
-        existing = skill_repo.get_by_id(skill_id)
+        existing = await AsyncDb.run(skill_repo.get_by_id, skill_id)
         if bool(accepted):
             # Accept: mark as approved (isPending -> false)
-            skill_repo.update_is_pending(skill_id, False)
+            await AsyncDb.run(skill_repo.update_is_pending, skill_id, False)
             return {"message": "Skill geaccepteerd"}
         else:
             # Only delete pending skills
             if not getattr(existing, "is_pending", True):
                 raise HTTPException(status_code=409, detail="Deze skill is al verwerkt en kan niet worden verwijderd.")
             # Decline: remove relations first, then delete the pending skill
-            skill_repo.delete_with_cascade(skill_id)
+            await AsyncDb.run(skill_repo.delete_with_cascade, skill_id)
             return {"message": "Skill afgewezen en verwijderd"}
     except Exception as e:
         print(f"Error {'updating' if accepted else 'deleting'} skill {skill_id}: {e}")
@@ -105,14 +112,14 @@ async def update_skill_name(
 
     # Ensure skill exists
     try:
-        skill_repo.get_by_id(skill_id)
+        await AsyncDb.run(skill_repo.get_by_id, skill_id)
     except ItemRetrievalException:
         raise
     except Exception:
         raise HTTPException(status_code=404, detail="Skill niet gevonden")
 
     try:
-        skill_repo.update_name(skill_id, new_name)
+        await AsyncDb.run(skill_repo.update_name, skill_id, new_name)
         return {"message": "Skillnaam bijgewerkt"}
     except Exception as e:
         # Unique constraint (if enforced by TypeDB schema) could surface here
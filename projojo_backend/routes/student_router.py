@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Path, Body, HTTPException, Request, UploadFile, File, Form
+from fastapi import APIRouter, Depends, Path, Body, HTTPException, Request, UploadFile, File, Form
 from auth.permissions import auth
 
 from domain.repositories import SkillRepository, UserRepository
 from domain.models.skill import StudentSkill
 from service.image_service import save_image, delete_image
+from db.async_db import AsyncDb
+from service.pagination_service import page_params
+from domain.repositories.pagination import PageRequest
 
 skill_repo = SkillRepository()
 user_repo = UserRepository()
@@ -13,11 +16,13 @@ router = APIRouter(prefix="/students", tags=["Student Endpoints"])
 
 @router.get("/")
 @auth(role="authenticated")
-async def get_all_students():
+async def get_all_students(page: PageRequest | None = Depends(page_params)):
     """
-    Get all students for debugging purposes
+    Get all students for debugging purposes, or one page of them when `limit` or `cursor` is given
     """
-    students = user_repo.get_all_students()
+    if page is not None:
+        return await AsyncDb.run(user_repo.get_students_page, page)
+    students = await AsyncDb.run(user_repo.get_all_students)
     return students
 
 
@@ -27,7 +32,7 @@ async def get_student_skills(student_id: str = Path(..., description="Student ID
     """
     Get all skills for a student
     """
-    student = user_repo.get_student_by_id(student_id)
+    student = await AsyncDb.run(user_repo.get_student_by_id, student_id)
 
     if not student:
         raise HTTPException(status_code=404, detail="Student niet gevonden")
@@ -43,8 +48,12 @@ async def update_student_skills(
     """
     Update skills for a student
     """
+    _, missing = await AsyncDb.run(skill_repo.get_many, skills)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Onbekende skill IDs: {', '.join(missing)}")
+
     try:
-        skill_repo.update_student_skills(student_id, skills)
+        await AsyncDb.run(skill_repo.update_student_skills, student_id, skills)
         return {"message": "Skills succesvol bijgewerkt"}
     except Exception:
         raise HTTPException(
@@ -63,7 +72,7 @@ async def update_student_skill_description(
     """
     Update a specific skill's description for a student
     """
-    user = user_repo.get_student_by_id(student_id)
+    user = await AsyncDb.run(user_repo.get_student_by_id, student_id)
     if not user:
         raise HTTPException(status_code=404, detail="Student bestaat niet")
 
@@ -72,7 +81,7 @@ async def update_student_skill_description(
         raise HTTPException(status_code=404, detail="De skill die je probeert te updaten staat niet in jouw profiel")
 
     try:
-        skill_repo.update_student_skill_description(student_id, skill_id, skill.description or "")
+        await AsyncDb.run(skill_repo.update_student_skill_description, student_id, skill_id, skill.description or "")
         return {"message": "Skillbeschrijving succesvol bijgewerkt"}
     except Exception:
         raise HTTPException(
@@ -87,7 +96,7 @@ async def get_student_registrations(request: Request) -> list[str]:
     Get all student registrations for debugging purposes
     """
     student_id = request.state.user_id
-    registrations = user_repo.get_student_registrations(student_id)
+    registrations = await AsyncDb.run(user_repo.get_student_registrations, student_id)
     return registrations
 
 
@@ -104,7 +113,7 @@ async def update_student(
     Update student profile information (description, profile picture, CV)
     """
     # Verify student exists
-    student = user_repo.get_student_by_id(student_id)
+    student = await AsyncDb.run(user_repo.get_student_by_id, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student niet gevonden")
 
@@ -128,7 +137,8 @@ async def update_student(
             cv_filename = ""
 
         # Update student in database
-        user_repo.update_student(
+        await AsyncDb.run(
+            user_repo.update_student,
             id=student_id,
             description=description,
             image_path=image_filename,
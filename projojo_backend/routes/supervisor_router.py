@@ -1,6 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from auth.permissions import auth
 from domain.repositories import UserRepository
+from db.async_db import AsyncDb
+from service.pagination_service import page_params
+from domain.repositories.pagination import PageRequest
 
 user_repo = UserRepository()
 
@@ -8,9 +11,11 @@ router = APIRouter(prefix="/supervisors", tags=["Supervisor Endpoints"])
 
 @router.get("/")
 @auth(role="authenticated")
-async def get_all_supervisors():
+async def get_all_supervisors(page: PageRequest | None = Depends(page_params)):
     """
-    Get all supervisors for debugging purposes
+    Get all supervisors for debugging purposes, or one page of them when `limit` or `cursor` is given
     """
-    supervisors = user_repo.get_all_supervisors()
+    if page is not None:
+        return await AsyncDb.run(user_repo.get_users_page, page, "supervisor")
+    supervisors = await AsyncDb.run(user_repo.get_all_supervisors)
     return supervisors
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Path, Query, Body, HTTPException, Request, Form
+from fastapi import APIRouter, Depends, Path, Query, Body, HTTPException, Request, Form
 from domain.repositories import TaskRepository, UserRepository, SkillRepository
 from auth.permissions import auth
 from service import task_service
 from domain.models.task import RegistrationCreate, RegistrationUpdate, Task, TaskCreate
 from service.validation_service import is_valid_length
+from service.streaming_service import stream_json_array
 from datetime import datetime
+from db.async_db import AsyncDb
+from service.pagination_service import page_params
+from domain.repositories.pagination import PageRequest
 
 task_repo = TaskRepository()
 user_repo = UserRepository()
@@ -15,12 +19,14 @@ router = APIRouter(prefix="/tasks", tags=["Task Endpoints"])
 # Task endpoints
 @router.get("/")
 @auth(role="authenticated")
-async def get_all_tasks():
+async def get_all_tasks(page: PageRequest | None = Depends(page_params)):
     """
-    Get all tasks for debugging purposes
+    Get all tasks for debugging purposes (streamed while the tasks are read),
+    or one page of them when `limit` or `cursor` is given
     """
-    tasks = task_repo.get_all()
-    return tasks
+    if page is not None:
+        return await AsyncDb.run(task_repo.get_page, page)
+    return await stream_json_array(AsyncDb.iterate(task_repo.iter_all))
 
 
 @router.get("/{task_id}/emails/colleagues")
@@ -30,7 +36,7 @@ async def get_colleague_email_addresses(request: Request, task_id: str = Path(..
     Get email addresses of supervisors which are colleagues of the requesting supervisor (or teacher) for the business of the task
     """
     # Get colleagues in the business of the task
-    return user_repo.get_colleagues(task_id, request.state.user_id)
+    return await AsyncDb.run(user_repo.get_colleagues, task_id, request.state.user_id)
 
 @router.get("/{task_id}/student-emails")
 @auth(role="supervisor", owner_id_key="task_id")
@@ -48,7 +54,7 @@ async def get_student_email_addresses(
     # Get students based on selection criteria
     for status in statuses:
         if status in ["registered", "accepted", "rejected"]:
-            students = user_repo.get_students_by_task_status(task_id, status)
+            students = await AsyncDb.run(user_repo.get_students_by_task_status, task_id, status)
             emails.extend([student.email for student in students])
 
     # Remove duplicates
@@ -62,7 +68,7 @@ async def get_task(task_id: str = Path(..., description="Task ID")):
     """
     Get a specific task by ID
     """
-    task = task_repo.get_by_id(task_id)
+    task = await AsyncDb.run(task_repo.get_by_id, task_id)
     return task
 
 @router.get("/{task_id}/skills")
@@ -73,11 +79,11 @@ async def get_task_skills(task_id: str = Path(..., description="Task ID")):
     """
     # Ensure task exists
     try:
-        task_repo.get_by_id(task_id)
+        await AsyncDb.run(task_repo.get_by_id, task_id)
     except Exception:
         raise HTTPException(status_code=404, detail="Taak niet gevonden")
 
-    skills = skill_repo.get_task_skills(task_id)
+    skills = await AsyncDb.run(skill_repo.get_task_skills, task_id)
     return skills
 
 @router.put("/{task_id}/skills")
@@ -91,7 +97,7 @@ async def update_task_skills_endpoint(
     """
     # Validate task exists
     try:
-        task_repo.get_by_id(task_id)
+        await AsyncDb.run(task_repo.get_by_id, task_id)
     except Exception:
         raise HTTPException(status_code=404, detail="Taak niet gevonden")
 
@@ -106,17 +112,12 @@ async def update_task_skills_endpoint(
         raise HTTPException(status_code=400, detail="Ongeldige invoer: kan skill-IDs niet verwerken")
 
     # Verify that all skill IDs exist
-    missing: list[str] = []
-    for sid in unique_ids:
-        try:
-            skill_repo.get_by_id(sid)
-        except Exception:
-            missing.append(sid)
+    _, missing = await AsyncDb.run(skill_repo.get_many, unique_ids)
     if missing:
         raise HTTPException(status_code=404, detail=f"Onbekende skill IDs: {', '.join(missing)}")
 
     try:
-        skill_repo.update_task_skills(task_id, unique_ids)
+        await AsyncDb.run(skill_repo.update_task_skills, task_id, unique_ids)
         return {"message": "Skills bijgewerkt"}
     except Exception as e:
         raise HTTPException(status_code=500, detail="Er is een fout opgetreden bij het bijwerken van de skills: " + str(e))
@@ -128,7 +129,7 @@ async def get_registrations(task_id: str = Path(..., description="Task ID")):
     """
     Get all open registrations for a task with student details and skills
     """
-    registrations = task_repo.get_registrations(task_id)
+    registrations = await AsyncDb.run(task_repo.get_registrations, task_id)
     return registrations
 
 @router.post("/{task_id}/registrations")
@@ -143,7 +144,7 @@ async def create_registration(
     """
     student_id = request.state.user_id
 
-    task = task_repo.get_by_id(task_id)
+    task = await AsyncDb.run(task_repo.get_by_id, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Taak niet gevonden")
 
@@ -151,12 +152,12 @@ async def create_registration(
         raise HTTPException(status_code=400, detail="Deze taak heeft geen beschikbare plekken meer")
 
     # check if the student is already registered for this task
-    existing_registration = user_repo.get_student_registrations(student_id)
+    existing_registration = await AsyncDb.run(user_repo.get_student_registrations, student_id)
     if task_id in existing_registration:
         raise HTTPException(status_code=400, detail="Je bent al geregistreerd voor deze taak")
 
     try:
-        task_repo.create_registration(task_id, student_id, registration.motivation)
+        await AsyncDb.run(task_repo.create_registration, task_id, student_id, registration.motivation)
         return {"message": "Registratie succesvol aangemaakt"}
     except Exception as e:
         if (hasattr(e, 'status_code')):
@@ -174,7 +175,7 @@ async def update_registration(
     """
     Update a registration status (accept/reject) with optional response
     """
-    task = task_repo.get_by_id(task_id)
+    task = await AsyncDb.run(task_repo.get_by_id, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Taak niet gevonden")
 
@@ -182,7 +183,7 @@ async def update_registration(
         raise HTTPException(status_code=400, detail="Deze taak heeft geen beschikbare plekken meer")
 
     try:
-        task_repo.update_registration(task_id, student_id, registration.accepted, registration.response)
+        await AsyncDb.run(task_repo.update_registration, task_id, student_id, registration.accepted, registration.response)
         return {"message": "Registratie succesvol bijgewerkt"}
     except Exception as e:
         if (hasattr(e, 'status_code')):
@@ -221,7 +222,7 @@ async def create_task(
             created_at=datetime.now()
         )
 
-        created_task = task_repo.create(task)
+        created_task = await AsyncDb.run(task_repo.create, task)
         return created_task
     except Exception as e:
         if (hasattr(e, 'status_code')):
@@ -253,12 +254,12 @@ async def update_task(
         )
 
     # Verify task exists
-    existing_task = task_repo.get_by_id(task_id)
+    existing_task = await AsyncDb.run(task_repo.get_by_id, task_id)
     if not existing_task:
         raise HTTPException(status_code=404, detail="Taak niet gevonden.")
 
     try:
-        task_repo.update(task_id, name, description, total_needed)
+        await AsyncDb.run(task_repo.update, task_id, name, description, total_needed)
         return {"message": "Taak succesvol bijgewerkt"}
     except Exception as e:
         print(f"Error updating task {task_id}: {e}")
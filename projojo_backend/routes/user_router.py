@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path
 from auth.permissions import auth
 from domain.repositories import UserRepository
 from config.settings import IS_DEVELOPMENT
+from db.async_db import AsyncDb
+from service.pagination_service import page_params
+from domain.repositories.pagination import PageRequest
 
 user_repo = UserRepository()
 
@@ -9,14 +12,17 @@ router = APIRouter(prefix="/users", tags=["User Endpoints"])
 
 @router.get("/")
 @auth(role="unauthenticated")
-async def get_all_users():
+async def get_all_users(page: PageRequest | None = Depends(page_params)):
     """
-    Get all users for debugging purposes
+    Get all users for debugging purposes, or one page of them when `limit` or `cursor` is given
     """
     if not IS_DEVELOPMENT:
         raise HTTPException(status_code=403, detail="Dit kan alleen in de test-omgeving")
 
-    users = user_repo.get_all()
+    if page is not None:
+        return await AsyncDb.run(user_repo.get_users_page, page)
+
+    users = await AsyncDb.run(user_repo.get_all)
     return users
 
 @router.get("/{user_id}")
@@ -25,5 +31,5 @@ async def get_user(user_id: str = Path(..., description="User ID")):
     """
     Get a specific user by ID
     """
-    user = user_repo.get_by_id(user_id)
+    user = await AsyncDb.run(user_repo.get_by_id, user_id)
     return user
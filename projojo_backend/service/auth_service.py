@@ -1,4 +1,5 @@
 import asyncio
+from urllib.parse import urlparse
 from fastapi import Request, Depends
 from domain.models.user import User
 from domain.repositories.user_repository import UserRepository
@@ -6,7 +7,9 @@ from domain.repositories.invite_repository import InviteRepository
 from auth.jwt_utils import create_jwt_token
 from auth.oauth_config import oauth_client
 from domain.models.authentication import OAuthProvider
+from service.avatar_service import avatar_downloader
 from service.image_service import save_image_from_bytes
+from db.async_db import AsyncDb
 
 class AuthService:
     def __init__(self, user_repo: UserRepository = Depends(UserRepository), invite_repo: InviteRepository = Depends(InviteRepository)):
@@ -27,7 +30,11 @@ class AuthService:
         extracted_user = await self._extract_user_from_token(provider, client, token)
 
         # Get or create user in database
-        final_user, is_new_user = self._get_or_create_user(extracted_user, invite_token)
+        final_user, is_new_user = await AsyncDb.run(self._get_or_create_user, extracted_user, invite_token)
+
+        # The profile picture is downloaded after the redirect, the new user starts with the default image
+        if is_new_user:
+            self._schedule_picture_download(provider, client, token, extracted_user, final_user.id)
 
         # Create JWT token
         # Pass business_id if user is a supervisor
@@ -37,7 +44,7 @@ class AuthService:
                 business_id = final_user.business_association_id
             else:
                 # Fetch supervisor details to get business_id if not present in the user object
-                supervisor = self.user_repo.get_supervisor_by_id(final_user.id)
+                supervisor = await AsyncDb.run(self.user_repo.get_supervisor_by_id, final_user.id)
                 if supervisor:
                     business_id = supervisor.business_association_id
 
@@ -128,24 +135,22 @@ class AuthService:
             oauth_sub=user_info['sub']
         )
 
-        # Check if user already exists
-        existing_user = self.user_repo.get_by_sub_and_provider(
-            oauth_provider.oauth_sub,
-            oauth_provider.provider_name
-        )
-
-        # Only download profile picture for new users
-        image_filename = ""
-        if not existing_user:
-            image_filename = await self._download_microsoft_picture(client, token)
-
+        # The profile picture of a new user is downloaded in the background, see _schedule_picture_download
         return User(
             email=user_info['email'],
             full_name=user_info.get('name', ''),
-            image_path=image_filename,
+            image_path='',
             oauth_providers=[oauth_provider]
         )
 
+    def _schedule_picture_download(self, provider: str, client, token, extracted_user: User, user_id: str) -> None:
+        """Download the profile picture of a new user in the background"""
+        if provider == 'microsoft':
+            # Microsoft has no picture URL, the picture is fetched with the user's token
+            avatar_downloader.schedule(user_id, self._download_microsoft_picture(client, token))
+        elif extracted_user.image_path and urlparse(extracted_user.image_path).scheme in ('http', 'https'):
+            avatar_downloader.schedule_url(user_id, extracted_user.image_path)
+
     async def _download_microsoft_picture(self, client, token) -> str:
         """Download Microsoft profile picture and return the filename"""
         image_filename = ""
@@ -164,7 +169,7 @@ class AuthService:
                     file_extension = '.gif'
 
                 # Save the image bytes
-                image_filename = save_image_from_bytes(picture_resp.content, file_extension)
+                image_filename = await asyncio.to_thread(save_image_from_bytes, picture_resp.content, file_extension)
         except Exception as e:
             # Log error but don't fail. User can proceed without profile picture.
             print(f"Failed to download Microsoft profile picture: {e}")
@@ -0,0 +1,105 @@
+import asyncio
+from collections.abc import Coroutine
+from typing import Any
+import httpx
+from config.settings import AVATAR_DOWNLOAD_TIMEOUT, AVATAR_DOWNLOAD_MAX_CONNECTIONS
+from db.async_db import AsyncDb
+from domain.repositories import UserRepository
+from service.image_service import is_safe_url, save_image_from_url
+
+
+async def _refuse_unsafe_redirect(request: httpx.Request) -> None:
+    # Runs before every request, including the ones for redirects, so no other host is ever contacted
+    is_safe, error_message = is_safe_url(str(request.url))
+    if not is_safe:
+        raise ValueError(error_message)
+
+
+class AvatarDownloader:
+    """
+    Downloads the profile pictures of new users in the background.
+
+    A new user is created with the default image (an empty imagePath), so the OAuth login redirects
+    right away instead of waiting on the Google/GitHub/Microsoft CDN; once the picture is saved the
+    user's imagePath is updated. All downloads share one pooled `httpx.AsyncClient`, so repeated
+    downloads from the same CDN reuse their connections.
+
+    Usage:
+    ```python
+    avatar_downloader.schedule_url(user.id, "https://avatars.githubusercontent.com/u/1")
+    ```
+    """
+
+    def __init__(self, timeout: float = AVATAR_DOWNLOAD_TIMEOUT, max_connections: int = AVATAR_DOWNLOAD_MAX_CONNECTIONS,
+                 directory: str = "static/images", transport: httpx.AsyncBaseTransport | None = None):
+        self.timeout = timeout
+        self.directory = directory
+        # None for the network; tests pass an httpx.MockTransport
+        self.transport = transport
+        self.max_connections = max_connections
+        self.user_repo = UserRepository()
+        self._client: httpx.AsyncClient | None = None
+        # Strong references, otherwise running downloads could be garbage collected
+        self._tasks: set[asyncio.Task] = set()
+        self.saved = 0
+        self.failed = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client, created on first use (on the event loop it is used from)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                # Avatar CDNs redirect; every hop must stay on an allowed domain (see is_safe_url)
+                follow_redirects=True,
+                event_hooks={"request": [_refuse_unsafe_redirect]},
+                transport=self.transport,
+            )
+        return self._client
+
+    def schedule_url(self, user_id: str, image_url: str) -> None:
+        """Download the picture at `image_url` and make it the image of the user."""
+        self.schedule(user_id, save_image_from_url(image_url, self.client, self.directory))
+
+    def schedule(self, user_id: str, download: Coroutine[Any, Any, str]) -> None:
+        """Run `download` (which returns the saved filename, or "" on failure) and store the result."""
+        task = asyncio.create_task(self._save(user_id, download), name=f"avatar-download-{user_id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _save(self, user_id: str, download: Coroutine[Any, Any, str]) -> None:
+        try:
+            image_filename = await download
+            if image_filename:
+                await AsyncDb.run(self.user_repo.update_image_path, user_id, image_filename)
+        except Exception as e:
+            # Not fatal: the user keeps the default image and can upload one later
+            self.failed += 1
+            print(f"Failed to save profile picture of user {user_id}: {e}")
+            return
+
+        if image_filename:
+            self.saved += 1
+        else:
+            self.failed += 1
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict[str, int]:
+        """Current state for monitoring."""
+        return {
+            "pending": len(self._tasks),
+            "saved": self.saved,
+            "failed": self.failed,
+        }
+
+
+avatar_downloader = AvatarDownloader()
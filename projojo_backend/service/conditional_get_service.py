@@ -0,0 +1,95 @@
+"""
+Conditional GET (`If-None-Match` / `If-Modified-Since`) for read endpoints.
+
+The ETag and Last-Modified of a response are derived from the version counters of the entity
+types it is built from (see `domain.repositories.versions`), so an unchanged resource is
+answered with 304 Not Modified before the endpoint runs a single query.
+
+Example:
+    >>> @router.get("/")
+    >>> @auth(role="authenticated")
+    >>> @conditional_get("skill")
+    >>> async def get_all_skills():
+    ...     return await AsyncDb.run(skill_repo.get_all)
+"""
+
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from functools import wraps
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from auth.permissions import get_request_context
+from domain.repositories.versions import entity_versions
+
+# Clients may keep the response, but have to revalidate it before every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" are the same tag
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have a resolution of one second
+    return int(last_modified) <= since
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """Whether the client's copy (by If-None-Match, or else If-Modified-Since) is still current."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110, 13.1.3)
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        return _not_modified_since(if_modified_since, last_modified)
+    return False
+
+
+def validator_headers(*entity_types: str) -> tuple[dict[str, str], str, float]:
+    """The ETag, Last-Modified and Cache-Control headers for data of the entity types."""
+    etag = entity_versions.etag(*entity_types)
+    last_modified = entity_versions.last_modified(*entity_types)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    # Only announce a second that has passed completely: a write later in the same second would
+    # otherwise get the same Last-Modified and the client would keep the stale copy
+    if time.time() - last_modified >= 1:
+        headers["Last-Modified"] = formatdate(int(last_modified), usegmt=True)
+    return headers, etag, last_modified
+
+
+def conditional_get(*entity_types: str):
+    """
+    Decorator for GET endpoints whose response only depends on data of `entity_types`.
+
+    Answers 304 Not Modified when the client's ETag (or Last-Modified date) is still current, and
+    adds ETag, Last-Modified and Cache-Control headers to every other response. Put it below
+    `@auth`, so only authorized requests learn whether the data changed.
+
+    The versions are read before the endpoint runs: if a write commits while the endpoint reads,
+    the response carries the older ETag and the next request simply gets the new data.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            headers, etag, last_modified = validator_headers(*entity_types)
+            request = get_request_context()
+            if request is not None and is_not_modified(request, etag, last_modified):
+                return Response(status_code=304, headers=headers)
+
+            response = await func(*args, **kwargs)
+            if not isinstance(response, Response):
+                response = JSONResponse(jsonable_encoder(response))
+            response.headers.update(headers)
+            return response
+        return wrapper
+    return decorator
@@ -1,22 +1,271 @@
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, QueryParams
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.responses import FileResponse
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+from service.image_variant_service import ImageVariants, MEDIA_TYPES, PRESETS, SOURCE_FORMATS
+from service.streaming_service import accepts_gzip
+import gzip
 import os
+import re
+import stat
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# Uploaded files are named by generate_unique_filename (a random UUID), so the content of such a
+# file never changes: a new upload always gets a new name
+_UUID_FILENAME = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.[A-Za-z0-9]+$")
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Seed images and the fallback image may be replaced, browsers check them again after a few minutes
+SHORT_MAX_AGE = 5 * 60
+
+# How many names of missing files FallbackStaticFiles remembers
+MISSING_CACHE_SIZE = 4096
+
+# Bumped whenever an image is saved, which makes FallbackStaticFiles forget the missing files
+_files_saved = 0
+
+
+def forget_missing_files() -> None:
+    """Called after saving a file: a name that was missing before may exist now."""
+    global _files_saved
+    _files_saved += 1
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with HTTP caching headers for the uploaded images and PDFs.
+
+    - UUID-named (uploaded) files are cached for a year as `immutable`, so browsers no longer even
+      revalidate them on every dashboard load
+    - other files (seed images, the fallback image) are cached for `SHORT_MAX_AGE` seconds
+    - SVGs are sent gzipped to clients that accept it, from a `.gz` file next to the original
+      that is written (in the thread pool) the first time it is asked for
+    - with `variants`, raster images are sent as a resized (`?size=avatar|card|hero`) and/or WebP/AVIF
+      variant, depending on the `Accept` header; the original is sent when none can be rendered
+
+    The strong ETag / Last-Modified validators, conditional requests and Range requests (e.g. for
+    scrolling through a CV in the browser's PDF viewer) are handled by Starlette's FileResponse.
+
+    Usage:
+    ```python
+    app.mount("/pdf", CachedStaticFiles(directory="static/pdf", private=True), name="pdf")
+    ```
+    """
+
+    def __init__(self, directory: str, private: bool = False, variants: ImageVariants | None = None, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        # Private files (CVs) may be cached by the browser, but not by shared caches/proxies
+        self.cache_scope = "private" if private else "public"
+        self.variants = variants
+
+    def cache_control(self, full_path: str | os.PathLike[str]) -> str:
+        if _UUID_FILENAME.match(os.path.basename(full_path)):
+            return f"{self.cache_scope}, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        return f"{self.cache_scope}, max-age={SHORT_MAX_AGE}"
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if path.endswith(".svg") and scope["method"] in ("GET", "HEAD") and accepts_gzip(Headers(scope=scope)):
+            response = await self._gzip_response(path, scope)
+            if response is not None:
+                return response
+
+        if self.variants is None or not self.variants.available or "/" in path or not self.variants.is_source(path):
+            return await super().get_response(path, scope)
+
+        # The representation depends on the Accept header from here on
+        response = await self._variant_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["Vary"] = "Accept"
+        return response
+
+    async def _variant_response(self, path: str, scope: Scope) -> Response | None:
+        """The variant asked for, or None to send the original (as is) instead."""
+        full_path, stat_result = await run_in_threadpool(self.lookup_path, path)
+        if stat_result is None:
+            return None
+
+        preset = QueryParams(scope["query_string"]).get("size")
+        if preset not in PRESETS:
+            preset = None
+        image_format = self.variants.negotiate(Headers(scope=scope).get("accept", ""), full_path)
+        if preset is None:
+            if image_format == SOURCE_FORMATS[os.path.splitext(full_path)[1].lower()]:
+                return None
+            preset = "full"
+
+        variant_path = await self.variants.get(full_path, preset, image_format)
+        if variant_path is None:
+            # Rendering failed: send the original, but let browsers ask for the variant again soon
+            return self.file_response(full_path, stat_result, scope,
+                                      cache_control=f"{self.cache_scope}, max-age={SHORT_MAX_AGE}")
+        # A variant changes when its original does, so it is cached like the original
+        return self.file_response(variant_path, await run_in_threadpool(os.stat, variant_path), scope,
+                                  cache_control=self.cache_control(full_path), media_type=MEDIA_TYPES[image_format])
+
+    async def _gzip_response(self, path: str, scope: Scope) -> Response | None:
+        """The gzipped copy of an SVG, or None to let StaticFiles handle the request."""
+        try:
+            full_path, stat_result = await run_in_threadpool(self.lookup_path, path)
+        except OSError:
+            # StaticFiles turns these into the right error response
+            return None
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return None
+        # Reading, compressing and writing a large SVG must not block the event loop
+        compressed = await run_in_threadpool(_gzip_variant, full_path, stat_result)
+        return self.file_response(full_path, stat_result, scope, compressed=compressed)
+
+    def file_response(self, full_path: str | os.PathLike[str], stat_result: os.stat_result, scope: Scope,
+                      status_code: int = 200, cache_control: str | None = None, media_type: str | None = None,
+                      compressed: tuple[str, os.stat_result] | None = None) -> Response:
+        """Runs on the event loop, so no file I/O here: `compressed` is the gzipped copy to send instead."""
+        request_headers = Headers(scope=scope)
+        headers = {"Cache-Control": cache_control or self.cache_control(full_path)}
+
+        if str(full_path).endswith(".svg"):
+            headers["Vary"] = "Accept-Encoding"
+            if compressed is not None:
+                # The .gz file has its own size and mtime, so it also gets its own ETag
+                full_path, stat_result = compressed
+                headers["Content-Encoding"] = "gzip"
+                media_type = "image/svg+xml"
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result,
+                                headers=headers, media_type=media_type)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def _gzip_variant(path: str, stat_result: os.stat_result) -> tuple[str, os.stat_result] | None:
+    """The path and stat of the gzipped copy of `path`, (re)written when missing or older than `path`."""
+    compressed_path = path + ".gz"
+    try:
+        compressed_stat = os.stat(compressed_path)
+        if compressed_stat.st_mtime >= stat_result.st_mtime:
+            return compressed_path, compressed_stat
+    except FileNotFoundError:
+        pass
+
+    try:
+        with open(path, "rb") as file:
+            data = gzip.compress(file.read(), compresslevel=9, mtime=0)
+        # Write to a temporary file first, so a concurrent request never serves a partial file
+        temporary_path = f"{compressed_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, compressed_path)
+        return compressed_path, os.stat(compressed_path)
+    except OSError as e:
+        # e.g. a read-only directory: serve the original instead
+        print(f"Could not write gzipped copy of {path}: {e}")
+        return None
+
+
+@dataclass(frozen=True)
+class _PreparedFile:
+    """A small file held in memory, with the headers FileResponse would send for it."""
+    headers: Headers
+    body: bytes
+
+    @staticmethod
+    def load(path: str, stat_result: os.stat_result, headers: dict[str, str], media_type: str | None = None) -> "_PreparedFile":
+        response = FileResponse(path, stat_result=stat_result, headers=headers, media_type=media_type)
+        with open(path, "rb") as file:
+            return _PreparedFile(Headers(raw=response.raw_headers), file.read())
+
+
+class FallbackStaticFiles(CachedStaticFiles):
+    """
+    CachedStaticFiles that sends `default_file` instead of a 404.
+
+    Missing images are common (seed data refers to images that do not exist), so the default file
+    is read and compressed once when the app is set up and then sent from memory, and the names
+    found missing are remembered (the last `MISSING_CACHE_SIZE`) so they are not looked up on disk
+    again until a new file is saved (see `forget_missing_files`). Replacing the default file takes
+    a restart.
+    """
 
-class FallbackStaticFiles(StaticFiles):
     def __init__(self, directory: str, default_file: str, **kwargs):
         super().__init__(directory=directory, **kwargs)
         self.default_file = default_file
+        # Keyed by whether it is gzipped, None without a default file (requests then get a 404)
+        self._fallback = self._load_default()
+        self._missing: OrderedDict[str, None] = OrderedDict()
+        self._missing_generation = _files_saved
 
     async def get_response(self, path: str, scope):
+        if self._is_known_missing(path):
+            response = self._default_response(scope)
+            if response is not None:
+                return response
+
         try:
             response = await super().get_response(path, scope)
         except StarletteHTTPException as e:
-            if e.status_code == 404 and os.path.exists(self.default_file):
-                return FileResponse(self.default_file)
-            raise e
+            if e.status_code != 404:
+                raise e
+            self._remember_missing(path)
+            fallback = self._default_response(scope)
+            if fallback is None:
+                raise e
+            return fallback
 
-        if response.status_code == 404 and os.path.exists(self.default_file):
-            return FileResponse(self.default_file)
+        if response.status_code == 404:
+            self._remember_missing(path)
+            return self._default_response(scope) or response
 
         return response
+
+    def _is_known_missing(self, path: str) -> bool:
+        if self._missing_generation != _files_saved:
+            self._missing.clear()
+            self._missing_generation = _files_saved
+        if path not in self._missing:
+            return False
+        self._missing.move_to_end(path)
+        return True
+
+    def _remember_missing(self, path: str) -> None:
+        self._missing[path] = None
+        self._missing.move_to_end(path)
+        if len(self._missing) > MISSING_CACHE_SIZE:
+            self._missing.popitem(last=False)
+
+    def _load_default(self) -> dict[bool, _PreparedFile] | None:
+        # Called from __init__, before the app serves requests, so the blocking I/O is fine here
+        try:
+            stat_result = os.stat(self.default_file)
+        except FileNotFoundError:
+            return None
+
+        # Not named by UUID, so a missing file that appears later is not hidden for long
+        headers = {"Cache-Control": self.cache_control(self.default_file)}
+        compressed = None
+        if self.default_file.endswith(".svg"):
+            headers["Vary"] = "Accept-Encoding"
+            compressed = _gzip_variant(self.default_file, stat_result)
+
+        fallback = {False: _PreparedFile.load(self.default_file, stat_result, headers)}
+        if compressed is not None:
+            compressed_path, compressed_stat = compressed
+            fallback[True] = _PreparedFile.load(compressed_path, compressed_stat,
+                                                {**headers, "Content-Encoding": "gzip"}, media_type="image/svg+xml")
+        return fallback
+
+    def _default_response(self, scope: Scope) -> Response | None:
+        """The default file from memory, None when there is no default file."""
+        if self._fallback is None:
+            return None
+
+        request_headers = Headers(scope=scope)
+        prepared = self._fallback.get(True) if accepts_gzip(request_headers) else None
+        prepared = prepared or self._fallback[False]
+        if self.is_not_modified(prepared.headers, request_headers):
+            return NotModifiedResponse(prepared.headers)
+        return Response(prepared.body, headers=prepared.headers)
@@ -0,0 +1,178 @@
+"""
+In-memory snapshot of the business -> project -> task -> skill tree behind the discovery pages.
+
+`GET /businesses/complete` is most of our traffic and runs the heaviest query there is. Instead,
+a background task builds the tree once, serializes it (JSON and NDJSON, plain and gzipped) and
+swaps the finished snapshot in with a single assignment, so readers never see a half-built one.
+Requests are answered from those bytes without touching TypeDB.
+
+Writes bump the entity versions (see `domain.repositories.versions`); that wakes the refresher,
+which rebuilds the snapshot once the writes have settled (debounce).
+"""
+
+import asyncio
+import gzip
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from fastapi import Request, Response
+from config.settings import DISCOVERY_SNAPSHOT_ENABLED, DISCOVERY_SNAPSHOT_DEBOUNCE
+from db.async_db import AsyncDb
+from domain.repositories import BusinessRepository
+from domain.repositories.versions import entity_versions
+from service.conditional_get_service import is_not_modified, validator_headers
+from service.streaming_service import NDJSON_MEDIA_TYPE, accepts_gzip, accepts_ndjson, encode_json
+
+# The entity types the business tree is built from
+DISCOVERY_ENTITY_TYPES = ("business", "project", "task", "skill", "registration")
+
+# While writes keep coming in, rebuild at the latest this many debounce periods after the first one
+MAX_DEBOUNCE_PERIODS = 10
+
+_VARY = {"Vary": "Accept, Accept-Encoding"}
+
+
+@dataclass(frozen=True)
+class DiscoverySnapshot:
+    """One immutable build of the business tree, pre-serialized in every representation we serve."""
+    json: bytes
+    json_gzip: bytes
+    ndjson: bytes
+    ndjson_gzip: bytes
+    # ETag, Last-Modified and Cache-Control of the data the snapshot was built from
+    headers: dict[str, str]
+    etag: str
+    last_modified: float
+    businesses: int
+    built_at: datetime
+
+    @staticmethod
+    def build(businesses: list[dict[str, Any]], headers: dict[str, str], etag: str, last_modified: float) -> "DiscoverySnapshot":
+        lines = [encode_json(business) for business in businesses]
+        json_body = b"[" + b",".join(lines) + b"]"
+        ndjson_body = b"".join(line + b"\n" for line in lines)
+        return DiscoverySnapshot(
+            json=json_body,
+            json_gzip=gzip.compress(json_body, compresslevel=6),
+            ndjson=ndjson_body,
+            ndjson_gzip=gzip.compress(ndjson_body, compresslevel=6),
+            headers=headers,
+            etag=etag,
+            last_modified=last_modified,
+            businesses=len(businesses),
+            built_at=datetime.now(),
+        )
+
+    def response(self, request: Request) -> Response:
+        """The response for `request`: 304, or the representation it asked for, as prepared bytes."""
+        headers = {**self.headers, **_VARY}
+        if is_not_modified(request, self.etag, self.last_modified):
+            return Response(status_code=304, headers=headers)
+
+        ndjson = accepts_ndjson(request)
+        if accepts_gzip(request.headers):
+            headers["Content-Encoding"] = "gzip"
+            body = self.ndjson_gzip if ndjson else self.json_gzip
+        else:
+            body = self.ndjson if ndjson else self.json
+        return Response(body, media_type=NDJSON_MEDIA_TYPE if ndjson else "application/json", headers=headers)
+
+
+class DiscoverySnapshotRefresher:
+    """
+    Background task that keeps `current` up to date with the database.
+
+    The first snapshot is built right after startup; until then (and when it is disabled)
+    `current` is None and the endpoint queries TypeDB as before. A failed rebuild keeps serving
+    the previous snapshot and is retried.
+    """
+
+    def __init__(self, enabled: bool = DISCOVERY_SNAPSHOT_ENABLED, debounce: float = DISCOVERY_SNAPSHOT_DEBOUNCE):
+        self.enabled = enabled
+        self.debounce = debounce
+        self.business_repo = BusinessRepository()
+        self.current: DiscoverySnapshot | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._changed: asyncio.Event | None = None
+        self.builds = 0
+        self.last_error: str | None = None
+
+    def start(self) -> None:
+        if self._task is not None or not self.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        # Build the first snapshot right away
+        self._changed.set()
+        entity_versions.add_listener(self._on_change)
+        self._task = asyncio.create_task(self._run(), name="discovery-snapshot-refresher")
+
+    async def stop(self) -> None:
+        entity_versions.remove_listener(self._on_change)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.current = None
+
+    def _on_change(self, entity_types: tuple[str, ...]) -> None:
+        # Called on the thread of the write
+        if self._loop is not None and self._changed is not None and set(entity_types) & set(DISCOVERY_ENTITY_TYPES):
+            self._loop.call_soon_threadsafe(self._changed.set)
+
+    async def _run(self) -> None:
+        assert self._changed is not None
+        while True:
+            await self._changed.wait()
+            await self._settle()
+            try:
+                await self.rebuild()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                # TypeDB may be down: keep the old snapshot and try again later
+                await asyncio.sleep(max(self.debounce, 5.0))
+                self._changed.set()
+
+    async def _settle(self) -> None:
+        """Wait until no write arrived for `debounce` seconds, so a burst of writes causes one rebuild."""
+        assert self._changed is not None
+        deadline = time.monotonic() + self.debounce * MAX_DEBOUNCE_PERIODS
+        while True:
+            self._changed.clear()
+            await asyncio.sleep(self.debounce)
+            if not self._changed.is_set() or time.monotonic() >= deadline:
+                # A write that arrives from here on sets the event again and triggers the next rebuild
+                self._changed.clear()
+                return
+
+    async def rebuild(self) -> DiscoverySnapshot:
+        """Build a new snapshot and swap it in."""
+        # The versions are read before the data, so the snapshot's ETag is never newer than its data
+        headers, etag, last_modified = validator_headers(*DISCOVERY_ENTITY_TYPES)
+        businesses = await AsyncDb.run(self.business_repo.get_all_with_full_nesting)
+        # Serializing and compressing the whole tree is CPU work, keep it off the event loop
+        snapshot = await asyncio.to_thread(DiscoverySnapshot.build, businesses, headers, etag, last_modified)
+        self.current = snapshot
+        self.builds += 1
+        self.last_error = None
+        return snapshot
+
+    def stats(self) -> dict[str, Any]:
+        """Current state for monitoring."""
+        snapshot = self.current
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "builds": self.builds,
+            "last_error": self.last_error,
+            "built_at": snapshot.built_at.isoformat() if snapshot else None,
+            "businesses": snapshot.businesses if snapshot else None,
+            "bytes": len(snapshot.json) if snapshot else None,
+        }
+
+
+discovery_snapshot = DiscoverySnapshotRefresher()
@@ -1,11 +1,14 @@
+import asyncio
 import os
 import shutil
 import uuid
 from fastapi import UploadFile, HTTPException
-import requests
+import httpx
 from urllib.parse import urlparse
 import mimetypes
 from config.settings import IS_DEVELOPMENT
+from service.custom_static_files import forget_missing_files
+from service.image_variant_service import image_variants
 
 
 # Whitelist of allowed domains for image downloads
@@ -196,15 +199,21 @@ def save_image(file: UploadFile, directory: str = "static/images") -> str:
     with open(file_path, "wb") as buffer:
         shutil.copyfileobj(file.file, buffer)
 
+    # The fallback image may have been sent for this name before
+    forget_missing_files()
+    # Render the resized variants in the background, see ImageVariants
+    image_variants.schedule(file_path)
+
     return unique_filename
 
 
-def save_image_from_url(image_url: str, directory: str = "static/images") -> str:
+async def save_image_from_url(image_url: str, client: httpx.AsyncClient, directory: str = "static/images") -> str:
     """
     Download and save an image from a URL to the specified directory with a randomly generated filename
 
     Args:
         image_url (str): The URL of the image to download
+        client (httpx.AsyncClient): The (shared, connection pooling) client to download with
         directory (str, optional): The directory to save the image to. Defaults to "static/images".
 
     Returns:
@@ -223,71 +232,74 @@ def save_image_from_url(image_url: str, directory: str = "static/images") -> str
         raise ValueError(error_message)
 
     try:
-        # Create the directory if it doesn't exist
-        os.makedirs(directory, exist_ok=True)
-
-        # Download the image
-        response = requests.get(image_url, stream=True, timeout=10)
-        response.raise_for_status()
-
-        # Check Content-Length if present
-        content_length = response.headers.get('Content-Length')
-        if content_length and int(content_length) > MAX_FILE_SIZE:
-            print(f"File too large from URL: {content_length}")
-            return ""
-
-        # Get Content-Type from response
-        content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+        async with client.stream("GET", image_url) as response:
+            response.raise_for_status()
+
+            # The client may have followed redirects: the image must still come from an allowed domain
+            if str(response.url) != image_url:
+                is_safe, error_message = is_safe_url(str(response.url))
+                if not is_safe:
+                    print(f"Security validation failed for redirect of {image_url} to {response.url}: {error_message}")
+                    return ""
 
-        # Try to determine the file extension from the URL
-        parsed_url = urlparse(image_url)
-        file_extension = os.path.splitext(parsed_url.path)[1]
+            # Check Content-Length if present
+            content_length = response.headers.get('Content-Length')
+            if content_length and int(content_length) > MAX_FILE_SIZE:
+                print(f"File too large from URL: {content_length}")
+                return ""
 
-        # If no extension in URL, derive it from content_type
-        if not file_extension:
-            file_extension = ALLOWED_IMAGE_MIMETYPES.get(content_type, '.jpg')
+            # Get Content-Type from response
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
 
-        # Validate file type after determining extension
-        validate_file_type(file_extension, content_type, directory)
+            # Try to determine the file extension from the URL
+            parsed_url = urlparse(image_url)
+            file_extension = os.path.splitext(parsed_url.path)[1]
 
-        # Generate a unique filename
-        unique_filename = generate_unique_filename(file_extension)
-        file_path = os.path.join(directory, unique_filename)
+            # If no extension in URL, derive it from content_type
+            if not file_extension:
+                file_extension = ALLOWED_IMAGE_MIMETYPES.get(content_type, '.jpg')
 
-        # Save the image
-        downloaded_size = 0
-        first_chunk = True
+            # Validate file type after determining extension
+            validate_file_type(file_extension, content_type, directory)
 
-        with open(file_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                downloaded_size += len(chunk)
-                if downloaded_size > MAX_FILE_SIZE:
-                    f.close()
-                    os.remove(file_path)
+            # Read the image (at most MAX_FILE_SIZE bytes) before anything is written to disk
+            image_bytes = bytearray()
+            async for chunk in response.aiter_bytes(chunk_size=8192):
+                image_bytes += chunk
+                if len(image_bytes) > MAX_FILE_SIZE:
                     print(f"File too large from URL (streamed): >{MAX_FILE_SIZE}")
                     return ""
 
-                if first_chunk:
-                    try:
-                        validate_header_bytes(chunk[:12], content_type)
-                    except HTTPException as e:
-                        f.close()
-                        os.remove(file_path)
-                        print(f"Magic bytes validation failed for URL: {e.detail}")
-                        return ""
-                    first_chunk = False
-
-                f.write(chunk)
+        try:
+            validate_header_bytes(bytes(image_bytes[:12]), content_type)
+        except HTTPException as e:
+            print(f"Magic bytes validation failed for URL: {e.detail}")
+            return ""
 
-        return unique_filename
+        return await asyncio.to_thread(_write_image, bytes(image_bytes), file_extension, directory)
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Failed to download image from {image_url}: {e}")
         return ""
     except Exception as e:
         print(f"Error saving image from {image_url}: {e}")
         return ""
 
+
+def _write_image(image_bytes: bytes, file_extension: str, directory: str) -> str:
+    """Write validated image bytes under a new unique filename and return that filename"""
+    # Create the directory if it doesn't exist
+    os.makedirs(directory, exist_ok=True)
+
+    unique_filename = generate_unique_filename(file_extension)
+    file_path = os.path.join(directory, unique_filename)
+    with open(file_path, "wb") as f:
+        f.write(image_bytes)
+
+    forget_missing_files()
+    image_variants.schedule(file_path)
+    return unique_filename
+
 def save_image_from_bytes(image_bytes: bytes, file_extension: str = ".jpg", directory: str = "static/images") -> str:
     """
     Save image bytes to the specified directory with a randomly generated filename
@@ -325,18 +337,8 @@ def save_image_from_bytes(image_bytes: bytes, file_extension: str = ".jpg", dire
             print(f"Magic bytes validation failed: {e.detail}")
             return ""
 
-        # Create the directory if it doesn't exist
-        os.makedirs(directory, exist_ok=True)
-
-        # Generate a unique filename
-        unique_filename = generate_unique_filename(file_extension)
-        file_path = os.path.join(directory, unique_filename)
-
-        # Save the image
-        with open(file_path, "wb") as f:
-            f.write(image_bytes)
-
-        return unique_filename
+        # Save the image under a unique filename
+        return _write_image(image_bytes, file_extension, directory)
 
     except Exception as e:
         print(f"Error saving image from bytes: {e}")
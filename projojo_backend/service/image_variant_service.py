@@ -0,0 +1,246 @@
+"""
+Resized WebP/AVIF variants of the uploaded images.
+
+Dashboards show logos and avatars as small cards, but the originals can be up to 5 MB. For every
+image a few size presets are rendered (when it is saved, or the first time a variant is asked for,
+which backfills the images that existed before) in a process pool, so encoding never blocks the
+event loop or holds the GIL of the API process. The variants are kept on disk in `IMAGE_VARIANT_DIR`,
+bounded to `IMAGE_VARIANT_CACHE_MAX_MB` by removing the least recently used ones.
+
+With IMAGE_VARIANTS_ENABLED off (or when rendering fails) the originals are served.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from PIL import Image, ImageOps, features as pil_features
+from config.settings import (
+    IMAGE_VARIANTS_ENABLED, IMAGE_VARIANT_WORKERS, IMAGE_VARIANT_DIR, IMAGE_VARIANT_CACHE_MAX_MB
+)
+
+# Longest side in pixels per preset; "full" only converts the format
+PRESETS: dict[str, int | None] = {
+    "avatar": 128,
+    "card": 480,
+    "hero": 1280,
+    "full": None,
+}
+
+# Originals we can render variants of, by extension
+SOURCE_FORMATS = {".png": "png", ".jpg": "jpeg", ".jpeg": "jpeg", ".webp": "webp"}
+
+MEDIA_TYPES = {"avif": "image/avif", "webp": "image/webp", "png": "image/png", "jpeg": "image/jpeg"}
+
+# Quality per output format (ignored for PNG)
+_QUALITY = {"avif": 60, "webp": 80, "jpeg": 85}
+
+
+def render_variant(source_path: str, target_path: str, max_size: int | None, image_format: str) -> int:
+    """
+    Render one variant (runs in a worker process) and return its size in bytes.
+
+    The image is scaled down (never up) to fit `max_size` x `max_size`, rotated according to its
+    EXIF orientation, and written to a temporary file first, so readers never see a partial file.
+    """
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if max_size is not None:
+            image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        if image_format == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        temporary_path = f"{target_path}.{os.getpid()}.tmp"
+        options = {"quality": _QUALITY[image_format]} if image_format in _QUALITY else {"optimize": True}
+        image.save(temporary_path, format=image_format.upper(), **options)
+    os.replace(temporary_path, target_path)
+    return os.path.getsize(target_path)
+
+
+def _preferred_formats(accept: str) -> list[str]:
+    """The modern formats the `Accept` header allows, best first."""
+    allowed = set()
+    for media_range in accept.split(","):
+        media_type, *parameters = media_range.split(";")
+        quality = next((p.split("=", 1)[1] for p in parameters if p.strip().lower().startswith("q=")), "1")
+        try:
+            if float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        allowed.add(media_type.strip().lower())
+    return [image_format for image_format in ("avif", "webp") if MEDIA_TYPES[image_format] in allowed]
+
+
+class ImageVariants:
+    """
+    Generates, caches and looks up the variants of the images in one directory.
+
+    Usage:
+    ```python
+    image_variants.schedule("static/images/<uuid>.png")        # after saving an upload
+    path = await image_variants.get("static/images/<uuid>.png", "card", "webp")
+    ```
+    """
+
+    def __init__(self, directory: str = IMAGE_VARIANT_DIR, max_bytes: int = IMAGE_VARIANT_CACHE_MAX_MB * 1024 * 1024,
+                 workers: int = IMAGE_VARIANT_WORKERS, enabled: bool = IMAGE_VARIANTS_ENABLED):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.enabled = enabled
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        # Variant file name -> size in bytes, least recently used first (loaded from disk on first use)
+        self._index: OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+        # Variants being rendered, so concurrent requests for the same variant share one job
+        self._pending: dict[str, Future] = {}
+        self.generated = 0
+        self.evictions = 0
+
+    @property
+    def available(self) -> bool:
+        return self.enabled
+
+    def output_formats(self) -> list[str]:
+        """Formats variants can be rendered in; AVIF only when Pillow was built with it (the PyPI wheels are)."""
+        if not self.available:
+            return []
+        return ["avif", "webp"] if pil_features.check("avif") else ["webp"]
+
+    def negotiate(self, accept: str, source_path: str) -> str:
+        """The format to send: the best modern format the client accepts, else the original format."""
+        supported = self.output_formats()
+        for image_format in _preferred_formats(accept):
+            if image_format in supported:
+                return image_format
+        return SOURCE_FORMATS[os.path.splitext(source_path)[1].lower()]
+
+    @staticmethod
+    def is_source(path: str) -> bool:
+        return os.path.splitext(path)[1].lower() in SOURCE_FORMATS
+
+    def variant_name(self, source_path: str, preset: str, image_format: str) -> str:
+        return f"{os.path.basename(source_path)}.{preset}.{image_format}"
+
+    async def get(self, source_path: str, preset: str, image_format: str) -> str | None:
+        """
+        Path of the variant, rendered first if it does not exist yet (or is older than the source).
+        None when variants are unavailable or rendering failed; the caller serves the original.
+        """
+        if not self.available or preset not in PRESETS or not self.is_source(source_path):
+            return None
+        name = self.variant_name(source_path, preset, image_format)
+        path = os.path.join(self.directory, name)
+        if await asyncio.to_thread(self._is_current, path, source_path):
+            self._touch(name)
+            return path
+
+        try:
+            await asyncio.wrap_future(self._render(source_path, preset, image_format))
+        except Exception as e:
+            print(f"Could not render {preset} {image_format} variant of {source_path}: {e}")
+            return None
+        return path
+
+    @staticmethod
+    def _is_current(path: str, source_path: str) -> bool:
+        try:
+            return os.stat(path).st_mtime >= os.stat(source_path).st_mtime
+        except FileNotFoundError:
+            return False
+
+    def schedule(self, source_path: str) -> None:
+        """Render all variants of a newly saved image in the background."""
+        if not self.available or not self.is_source(source_path):
+            return
+        try:
+            for preset in PRESETS:
+                for image_format in self.output_formats():
+                    self._render(source_path, preset, image_format)
+        except Exception as e:
+            # The upload itself succeeded; the variants are rendered on first request instead
+            print(f"Could not schedule variants of {source_path}: {e}")
+
+    def _render(self, source_path: str, preset: str, image_format: str) -> Future:
+        name = self.variant_name(source_path, preset, image_format)
+        with self._lock:
+            pending = self._pending.get(name)
+            if pending is not None:
+                return pending
+            if self._executor is None:
+                os.makedirs(self.directory, exist_ok=True)
+                # Not forked: the API process has threads (driver, thread pool) that may hold locks
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            future = self._executor.submit(
+                render_variant, source_path, os.path.join(self.directory, name), PRESETS[preset], image_format
+            )
+            self._pending[name] = future
+        future.add_done_callback(lambda done: self._rendered(name, done))
+        return future
+
+    def _rendered(self, name: str, future: Future) -> None:
+        with self._lock:
+            self._pending.pop(name, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.generated += 1
+        self._add(name, future.result())
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        # Called with the lock held
+        if self._index is None:
+            entries = []
+            if os.path.isdir(self.directory):
+                with os.scandir(self.directory) as scan:
+                    for entry in scan:
+                        if entry.is_file() and not entry.name.endswith(".tmp"):
+                            stat_result = entry.stat()
+                            entries.append((stat_result.st_mtime, entry.name, stat_result.st_size))
+            self._index = OrderedDict((name, size) for _, name, size in sorted(entries))
+            self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _touch(self, name: str) -> None:
+        with self._lock:
+            index = self._load_index()
+            if name in index:
+                index.move_to_end(name)
+
+    def _add(self, name: str, size: int) -> None:
+        with self._lock:
+            index = self._load_index()
+            self._total_bytes += size - index.pop(name, 0)
+            index[name] = size
+            # Never evict the variant that was just rendered
+            while self._total_bytes > self.max_bytes and len(index) > 1:
+                evicted, evicted_size = index.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+                try:
+                    os.remove(os.path.join(self.directory, evicted))
+                except FileNotFoundError:
+                    pass
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, int | bool]:
+        with self._lock:
+            return {
+                "available": self.available,
+                "generated": self.generated,
+                "evictions": self.evictions,
+                "pending": len(self._pending),
+                "bytes": self._total_bytes,
+            }
+
+
+image_variants = ImageVariants()
@@ -0,0 +1,75 @@
+"""
+Prometheus text exposition (format 0.0.4) of the backend's own metrics, served on /metrics.
+
+Written by hand instead of using prometheus_client: the few metric families below do not
+justify an extra dependency.
+"""
+from db.initDatabase import Db
+from db.metrics import db_metrics
+from domain.repositories.cache import get_cache_stats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_BREAKER_STATES = ("closed", "open", "half_open")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _header(lines: list[str], name: str, metric_type: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {metric_type}")
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    series = db_metrics.snapshot()
+
+    name = "projojo_db_query_duration_seconds"
+    _header(lines, name, "histogram", "TypeDB query latency per repository method.")
+    for item in series:
+        labels = {"operation": item["operation"], "query": item["query"]}
+        for bound, count in item["buckets"]:
+            lines.append(f"{name}_bucket{_labels(**labels, le=repr(bound))} {count}")
+        lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {item['count']}")
+        lines.append(f"{name}_sum{_labels(**labels)} {item['sum']}")
+        lines.append(f"{name}_count{_labels(**labels)} {item['count']}")
+
+    name = "projojo_db_query_rows_total"
+    _header(lines, name, "counter", "Rows returned by reads, statements executed by writes.")
+    for item in series:
+        lines.append(f"{name}{_labels(operation=item['operation'], query=item['query'])} {item['rows']}")
+
+    name = "projojo_db_query_errors_total"
+    _header(lines, name, "counter", "Failed TypeDB queries per repository method.")
+    for item in series:
+        lines.append(f"{name}{_labels(operation=item['operation'], query=item['query'])} {item['errors']}")
+
+    breaker = Db.breaker.snapshot()
+    name = "projojo_db_circuit_breaker_state"
+    _header(lines, name, "gauge", "1 for the current state of the TypeDB circuit breaker.")
+    for state in _BREAKER_STATES:
+        lines.append(f"{name}{_labels(state=state)} {1 if breaker['state'] == state else 0}")
+    name = "projojo_db_circuit_breaker_rejected_total"
+    _header(lines, name, "counter", "Requests rejected while the circuit breaker was open.")
+    lines.append(f"{name} {breaker['rejected_calls']}")
+
+    cache_stats = get_cache_stats()
+    for stat, metric_type, help_text in (
+        ("hits", "counter", "Cache hits."),
+        ("misses", "counter", "Cache misses (loads from TypeDB)."),
+        ("evictions", "counter", "Entries evicted because the cache was full."),
+        ("invalidations", "counter", "Invalidations caused by writes."),
+        ("size", "gauge", "Entries currently cached."),
+    ):
+        name = f"projojo_cache_{stat}" + ("_total" if metric_type == "counter" else "")
+        _header(lines, name, metric_type, help_text)
+        for cache_name, stats in cache_stats.items():
+            lines.append(f"{name}{_labels(cache=cache_name)} {stats[stat]}")
+
+    return "\n".join(lines) + "\n"
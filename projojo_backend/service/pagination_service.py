@@ -0,0 +1,18 @@
+from fastapi import Query
+from domain.repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageRequest
+
+
+def page_params(
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Number of items per page"),
+    cursor: str | None = Query(None, description="The next_cursor of the previous page"),
+    include_total: bool = Query(False, description="Also count all items (costs an extra query)"),
+) -> PageRequest | None:
+    """
+    Dependency for list endpoints that can be paginated.
+
+    Returns None when the client passes neither `limit` nor `cursor`, the endpoint then returns
+    the complete list as before; otherwise it returns a `Page` envelope.
+    """
+    if limit is None and cursor is None:
+        return None
+    return PageRequest(limit=limit or DEFAULT_PAGE_SIZE, cursor=cursor, include_total=include_total)
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+from config.settings import REGISTRATION_COUNTER_RECONCILE_INTERVAL
+from db.async_db import AsyncDb
+from domain.repositories import TaskRepository
+
+
+class RegistrationCounterReconciler:
+    """
+    Background task that repairs the registration counters stored on tasks.
+
+    The counters (totalRegistered / totalAccepted) are updated in the same transaction as every
+    registration write, but a write outside the repositories or two concurrent updates of the
+    same task can still make them drift. Every `interval` seconds (0 turns this off) the
+    registrations are counted again and wrong counters are corrected. Tasks created before the
+    counters existed already got them from `migrate_schema` at startup.
+    """
+
+    def __init__(self, interval: float = REGISTRATION_COUNTER_RECONCILE_INTERVAL):
+        self.interval = interval
+        self.task_repo = TaskRepository()
+        self._task: asyncio.Task | None = None
+        self.last_run_at: datetime | None = None
+        self.last_error: str | None = None
+        self.repaired = 0
+
+    def start(self) -> None:
+        if self._task is not None or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run(), name="registration-counter-reconciler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.reconcile()
+            await asyncio.sleep(self.interval)
+
+    async def reconcile(self) -> int:
+        """Recount once; returns the number of repaired tasks (0 when the run failed)."""
+        self.last_run_at = datetime.now()
+        try:
+            repaired = await AsyncDb.run(self.task_repo.reconcile_registration_counters, timeout=self.interval or None)
+        except Exception as e:
+            # TypeDB may be down, the next run tries again
+            self.last_error = f"{type(e).__name__}: {e}"
+            return 0
+
+        self.last_error = None
+        self.repaired += repaired
+        if repaired:
+            print(f"Repaired the registration counters of {repaired} task(s)")
+        return repaired
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current state for monitoring."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_error": self.last_error,
+            "repaired": self.repaired,
+        }
+
+
+registration_counter_reconciler = RegistrationCounterReconciler()
@@ -0,0 +1,130 @@
+"""
+Helpers for streaming large query results straight into an HTTP response.
+
+Combined with `Db.read_stream` / `AsyncDb.iterate`, rows are serialized and sent while the
+TypeDB transaction is still producing them, instead of first building the complete result
+(and its JSON document) in memory.
+
+Example:
+    >>> @router.get("/")
+    >>> async def get_all_tasks():
+    ...     return await stream_json_array(AsyncDb.iterate(task_repo.iter_all))
+
+Clients that send `Accept: application/x-ndjson` can get newline-delimited JSON instead
+(see `accepts_ndjson` and `stream_ndjson`): one complete JSON document per line, sent as soon as
+it is read, so the client can process each item before the last one has been loaded.
+"""
+
+import json
+from typing import Any, AsyncIterator, Mapping
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+# Send the body in chunks of roughly this many bytes instead of one chunk per row
+CHUNK_SIZE = 16 * 1024
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# The representation depends on the Accept header, caches must keep them apart
+_VARY_ACCEPT = {"Vary": "Accept"}
+
+
+def encode_json(item: Any) -> bytes:
+    """Serialize an item (dict, Pydantic model, ...) the same way FastAPI serializes a response"""
+    return json.dumps(
+        jsonable_encoder(item),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+async def _json_array_chunks(first: Any, items: AsyncIterator[Any], has_first: bool) -> AsyncIterator[bytes]:
+    buffer = bytearray(b"[")
+    if has_first:
+        buffer += encode_json(first)
+        async for item in items:
+            buffer += b","
+            buffer += encode_json(item)
+            if len(buffer) >= CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+async def _ndjson_lines(first: Any, items: AsyncIterator[Any], has_first: bool) -> AsyncIterator[bytes]:
+    if not has_first:
+        return
+    # One chunk per item: every line is sent as soon as its item has been read
+    yield encode_json(first) + b"\n"
+    async for item in items:
+        yield encode_json(item) + b"\n"
+
+
+async def _first_item(items: AsyncIterator[Any]) -> tuple[Any, bool]:
+    """
+    Fetch the first item before the response is created, so errors that happen before any
+    data is available (e.g. the database is unreachable) still result in a normal error
+    response instead of a broken stream.
+    """
+    try:
+        return await anext(items), True
+    except StopAsyncIteration:
+        return None, False
+
+
+async def stream_json_array(items: AsyncIterator[Any], status_code: int = 200, vary_accept: bool = False) -> StreamingResponse:
+    """
+    Create a response that streams `items` as one JSON array.
+
+    Set `vary_accept` when the endpoint can also respond with NDJSON.
+    """
+    first, has_first = await _first_item(items)
+    return StreamingResponse(
+        _json_array_chunks(first, items, has_first),
+        status_code=status_code,
+        media_type="application/json",
+        headers=_VARY_ACCEPT if vary_accept else None,
+    )
+
+
+async def stream_ndjson(items: AsyncIterator[Any], status_code: int = 200) -> StreamingResponse:
+    """Create a response that streams `items` as newline-delimited JSON, one item per line."""
+    first, has_first = await _first_item(items)
+    return StreamingResponse(
+        _ndjson_lines(first, items, has_first),
+        status_code=status_code,
+        media_type=NDJSON_MEDIA_TYPE,
+        headers=_VARY_ACCEPT,
+    )
+
+
+def accepts_ndjson(request: Request) -> bool:
+    """Whether the client asked for NDJSON (`Accept: application/x-ndjson`) rather than a JSON array."""
+    for media_range in request.headers.get("accept", "").split(","):
+        media_type, *parameters = media_range.split(";")
+        if media_type.strip().lower() != NDJSON_MEDIA_TYPE:
+            continue
+        quality = next((p.split("=", 1)[1] for p in parameters if p.strip().lower().startswith("q=")), "1")
+        try:
+            # "q=0" explicitly refuses the media type
+            return float(quality) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def accepts_gzip(headers: Mapping[str, str]) -> bool:
+    """Whether the `Accept-Encoding` request header allows a gzip-encoded body."""
+    for coding in headers.get("accept-encoding", "").split(","):
+        name, *parameters = coding.split(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = next((p.split("=", 1)[1] for p in parameters if p.strip().lower().startswith("q=")), "1")
+        try:
+            return float(quality) > 0
+        except ValueError:
+            return False
+    return False
@@ -23,7 +23,8 @@ def get_tasks_with_skills_by_project(project_id: str) -> list[Task]:
     """
     tasks = task_repo.get_tasks_by_project(project_id)
 
+    skills_per_task = skill_repo.task_skills_loader.load_many(task.id for task in tasks)
     for task in tasks:
-        task.skills = skill_repo.get_task_skills(task.id)
+        task.skills = skills_per_task[task.id]
 
     return tasks
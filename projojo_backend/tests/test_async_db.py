@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+import pytest
+from db.async_db import AsyncDb
+from exceptions import DatabaseBusyException, DatabaseTimeoutException
+
+
+@pytest.fixture(autouse=True)
+def small_executor():
+    original = (AsyncDb.max_workers, AsyncDb.max_pending, AsyncDb.timeout)
+    AsyncDb.shutdown()
+    AsyncDb.max_workers, AsyncDb.max_pending, AsyncDb.timeout = 1, 2, 5.0
+    yield
+    AsyncDb.shutdown()
+    AsyncDb.max_workers, AsyncDb.max_pending, AsyncDb.timeout = original
+
+
+class TestAsyncDb:
+    def test_runs_off_the_event_loop_thread(self):
+        async def main():
+            loop_thread = threading.get_ident()
+            worker_thread = await AsyncDb.run(threading.get_ident)
+            return loop_thread, worker_thread
+
+        loop_thread, worker_thread = asyncio.run(main())
+        assert loop_thread != worker_thread
+
+    def test_passes_arguments_and_copies_context(self):
+        current_user: ContextVar[str | None] = ContextVar("current_user", default=None)
+
+        def read(prefix, suffix=""):
+            return f"{prefix}{current_user.get()}{suffix}"
+
+        async def main():
+            current_user.set("student-1")
+            return await AsyncDb.run(read, "user=", suffix="!")
+
+        assert asyncio.run(main()) == "user=student-1!"
+
+    def test_rejects_calls_when_queue_is_full(self):
+        release = threading.Event()
+
+        async def main():
+            running = asyncio.ensure_future(AsyncDb.run(release.wait))
+            queued = asyncio.ensure_future(AsyncDb.run(release.wait))
+            await asyncio.sleep(0.05)
+            try:
+                with pytest.raises(DatabaseBusyException):
+                    await AsyncDb.run(release.wait)
+            finally:
+                release.set()
+            await asyncio.gather(running, queued)
+
+        asyncio.run(main())
+
+    def test_times_out_slow_calls(self):
+        async def main():
+            with pytest.raises(DatabaseTimeoutException):
+                await AsyncDb.run(time.sleep, 0.5, timeout=0.05)
+
+        asyncio.run(main())
+
+    def test_iterate_yields_all_items_in_batches(self):
+        async def main():
+            return [item async for item in AsyncDb.iterate(range, 5, batch_size=2)]
+
+        assert asyncio.run(main()) == [0, 1, 2, 3, 4]
+
+    def test_iterate_closes_generator_on_early_exit(self):
+        closed = threading.Event()
+
+        def rows():
+            try:
+                yield from range(100)
+            finally:
+                closed.set()
+
+        async def main():
+            async for item in AsyncDb.iterate(rows, batch_size=10):
+                if item == 3:
+                    break
+
+        asyncio.run(main())
+        assert closed.is_set()
@@ -0,0 +1,95 @@
+import asyncio
+import httpx
+import pytest
+import service.image_service
+from service.avatar_service import AvatarDownloader
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"0" * 100
+URL = "https://avatars.githubusercontent.com/u/1"
+
+
+@pytest.fixture
+def downloader(tmp_path, monkeypatch):
+    monkeypatch.setattr(service.image_service.image_variants, "enabled", False)
+    downloader = AvatarDownloader(directory=str(tmp_path))
+    updates = []
+    monkeypatch.setattr(downloader.user_repo, "update_image_path", lambda id, image_path: updates.append((id, image_path)))
+    downloader.updates = updates
+    return downloader
+
+
+def _run(downloader: AvatarDownloader, handler) -> None:
+    async def main():
+        # The shared client's settings (redirects, hooks), with the network replaced by `handler`
+        downloader.transport = httpx.MockTransport(handler)
+        try:
+            downloader.schedule_url("u1", URL)
+            # Scheduling returns right away, the download runs in the background
+            assert downloader.stats()["pending"] == 1
+            await asyncio.gather(*downloader._tasks)
+        finally:
+            await downloader.stop()
+
+    asyncio.run(main())
+
+
+def test_picture_becomes_the_users_image(downloader, tmp_path):
+    connections = []
+
+    def handler(request):
+        connections.append(request.url)
+        return httpx.Response(200, content=PNG, headers={"Content-Type": "image/png"})
+
+    _run(downloader, handler)
+    [(user_id, filename)] = downloader.updates
+    assert user_id == "u1" and filename.endswith(".png")
+    assert (tmp_path / filename).read_bytes() == PNG
+    assert downloader.stats() == {"pending": 0, "saved": 1, "failed": 0}
+    assert downloader._client is None
+
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(404),
+    httpx.Response(200, content=b"<html>", headers={"Content-Type": "image/png"}),
+    httpx.Response(200, content=PNG, headers={"Content-Type": "image/png", "Content-Length": str(6 * 1024 * 1024)}),
+])
+def test_failed_download_keeps_the_default_image(downloader, tmp_path, response):
+    _run(downloader, lambda request: response)
+    assert downloader.updates == []
+    assert list(tmp_path.iterdir()) == []
+    assert downloader.stats()["failed"] == 1
+
+
+def test_other_domains_are_refused(downloader):
+    async def main():
+        downloader.schedule_url("u1", "https://example.com/evil.png")
+        await asyncio.gather(*downloader._tasks)
+        await downloader.stop()
+
+    asyncio.run(main())
+    assert downloader.updates == []
+    assert downloader.failed == 1
+
+
+def test_redirects_within_allowed_domains_are_followed(downloader, tmp_path):
+    def handler(request):
+        if request.url.path == "/u/1":
+            return httpx.Response(302, headers={"Location": "https://avatars.githubusercontent.com/u/1/picture"})
+        return httpx.Response(200, content=PNG, headers={"Content-Type": "image/png"})
+
+    _run(downloader, handler)
+    [(_, filename)] = downloader.updates
+    assert (tmp_path / filename).read_bytes() == PNG
+
+
+def test_redirects_to_other_domains_are_not_followed(downloader, tmp_path):
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.host)
+        return httpx.Response(302, headers={"Location": "https://example.com/evil.png"})
+
+    _run(downloader, handler)
+    assert requested == ["avatars.githubusercontent.com"]
+    assert downloader.updates == []
+    assert downloader.failed == 1
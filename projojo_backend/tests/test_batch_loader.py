@@ -0,0 +1,91 @@
+import pytest
+from db.initDatabase import build_query
+from db.unit_of_work import unit_of_work
+from domain.repositories.batch_loader import BatchLoader, any_of
+
+
+class RecordingBatch:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, keys):
+        self.calls.append(list(keys))
+        return {key: [key.upper()] for key in keys if key != "empty"}
+
+
+class TestAnyOf:
+    def test_builds_a_disjunction_with_parameters(self):
+        clause, params = any_of("$task_id", ["a", "b"])
+        assert clause == "{ $task_id == ~key_0; } or { $task_id == ~key_1; };"
+        assert build_query(clause, params) == '{ $task_id == "a"; } or { $task_id == "b"; };'
+
+
+class TestBatchLoader:
+    def test_loads_all_keys_with_one_call(self):
+        batch = RecordingBatch()
+        loader = BatchLoader("test", batch, default=list)
+        result = loader.load_many(["b", "a", "b", "empty"])
+        assert batch.calls == [["b", "a", "empty"]]
+        assert result == {"b": ["B"], "a": ["A"], "empty": []}
+
+    def test_splits_large_batches(self):
+        batch = RecordingBatch()
+        loader = BatchLoader("test", batch, default=list, max_batch_size=2)
+        loader.load_many(["a", "b", "c"])
+        assert batch.calls == [["a", "b"], ["c"]]
+
+    def test_reuses_loaded_keys_within_a_unit_of_work(self):
+        batch = RecordingBatch()
+        loader = BatchLoader("test", batch, default=list)
+        with unit_of_work() as uow:
+            loader.load_many(["a", "b"])
+            assert loader.load("a") == ["A"]
+            loader.load_many(["b", "c"])
+            assert batch.calls == [["a", "b"], ["c"]]
+
+            uow.after_write()
+            loader.load("a")
+            assert batch.calls[-1] == ["a"]
+
+    def test_does_not_keep_values_outside_a_unit_of_work(self):
+        batch = RecordingBatch()
+        loader = BatchLoader("test", batch)
+        loader.load("a")
+        loader.load("a")
+        assert batch.calls == [["a"], ["a"]]
+
+
+class TestGetMany:
+    def test_one_query_reports_missing_ids_and_shares_identity_map(self, monkeypatch):
+        from db.initDatabase import Db
+        from domain.repositories.task_repository import TaskRepository
+
+        queries = []
+
+        def read_transact(query, params=None, sort_fields=True):
+            queries.append(params)
+            return [{"id": id, "name": "Taak", "description": "", "total_needed": 2,
+                     "created_at": "2025-01-01T00:00:00", "total_registered": 0, "total_accepted": 0}
+                    for id in params.values() if id != "unknown"]
+
+        monkeypatch.setattr(Db, "read_transact", read_transact)
+        repo = TaskRepository()
+        with unit_of_work():
+            found, missing = repo.get_many(["1", "unknown", "2"])
+            assert [task.id for task in found] == ["1", "2"]
+            assert missing == ["unknown"]
+            assert len(queries) == 1
+            assert repo.get_by_id("2") is found[1]
+            assert len(queries) == 1
+
+    @pytest.mark.parametrize("repository", ["BusinessRepository", "ProjectRepository", "TaskRepository", "SkillRepository"])
+    def test_every_repository_with_get_many_supports_it(self, repository):
+        import domain.repositories
+        from loadtest.harness import setup_in_memory_database
+
+        setup_in_memory_database(latency=0)
+        repo = getattr(domain.repositories, repository)()
+        ids = [entity.id for entity in repo.get_all()][:2]
+        found, missing = repo.get_many([*ids, "unknown"])
+        assert [entity.id for entity in found] == ids
+        assert missing == ["unknown"]
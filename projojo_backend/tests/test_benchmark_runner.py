@@ -0,0 +1,30 @@
+from benchmarks.runner import Benchmark, compare, measure
+
+
+def result(median_us):
+    return {"median_us": median_us}
+
+
+class TestBenchmarkRunner:
+    def test_measure_sync_and_async(self):
+        async def noop_async():
+            pass
+
+        for func in (lambda: None, noop_async):
+            measured = measure(Benchmark("noop", "test", func), repeat=2, min_time=0.001)
+            assert measured["median_us"] > 0
+            assert measured["rounds"] == 2
+
+    def test_compare_flags_regressions(self):
+        baseline = {"meta": {"commit": "a"}, "results": {"fast": result(10.0), "slow": result(10.0)}}
+        current = {"meta": {"commit": "b"}, "results": {"fast": result(5.0), "slow": result(12.0), "new": result(1.0)}}
+        lines, regressed = compare(baseline, current, threshold=10)
+        assert regressed
+        assert any("slow" in line and "SLOWER" in line for line in lines)
+        assert any("fast" in line and "faster" in line for line in lines)
+        assert any(line.startswith("new") and "new" in line.split()[-1] for line in lines)
+
+    def test_compare_within_threshold(self):
+        baseline = {"meta": {}, "results": {"x": result(10.0)}}
+        current = {"meta": {}, "results": {"x": result(10.5)}}
+        assert compare(baseline, current, threshold=10)[1] is False
@@ -0,0 +1,64 @@
+"""
+Precompiled templates (build_query / CompiledQuery) must render exactly what the original
+regex-based build_query rendered. Their speed is compared by the build_query.* benchmarks
+(`python -m benchmarks run -k build_query`).
+"""
+from datetime import datetime
+from db.initDatabase import CompiledQuery, build_query
+from benchmarks.baselines import legacy_build_query
+
+READ_TEMPLATE = """
+    match
+        $task isa task,
+        has id ~id,
+        has name $name,
+        has description $description,
+        has totalNeeded $totalNeeded,
+        has createdAt $createdAt;
+    fetch {
+        'id': $task.id,
+        'name': $name,
+        'description': $description,
+        'total_needed': $totalNeeded,
+        'created_at': $createdAt
+    };
+"""
+
+WRITE_TEMPLATE = """
+    match
+        $business isa business,
+        has id ~business_id;
+    insert
+        $project isa project,
+        has id ~id,
+        has name ~name,
+        has description ~description,
+        has imagePath ~image_path,
+        has location ~location,
+        has createdAt ~created_at;
+        $hasProjects isa hasProjects($business, $project);
+"""
+
+WRITE_PARAMS = {
+    "business_id": "b-1",
+    "id": "p-1",
+    "name": "Slimme kas",
+    "description": "Een \"project\" met quotes",
+    "image_path": "image.png",
+    "location": None,
+    "created_at": datetime(2025, 1, 1, 12, 0, 0),
+}
+
+
+def _assert_same_query(template, params, allow_none):
+    expected = legacy_build_query(template, params, allow_none)
+    assert CompiledQuery(template).render(params, allow_none) == expected
+    assert build_query(template, params, allow_none) == expected
+
+
+class TestSameQueryAsLegacy:
+    def test_read_query(self):
+        _assert_same_query(READ_TEMPLATE, {"id": "task-1"}, allow_none=False)
+
+    def test_write_query_with_optional_attribute(self):
+        _assert_same_query(WRITE_TEMPLATE, WRITE_PARAMS, allow_none=True)
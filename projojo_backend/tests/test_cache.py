@@ -0,0 +1,80 @@
+from domain.repositories.cache import ReadThroughCache, get_cache_stats
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return [{"call": self.calls}]
+
+
+class TestReadThroughCache:
+    def test_hit_after_first_load(self):
+        cache = ReadThroughCache("test-hit", ttl=60, max_entries=10)
+        loader = Loader()
+        assert cache.get_or_load("all", loader) == [{"call": 1}]
+        assert cache.get_or_load("all", loader) == [{"call": 1}]
+        assert loader.calls == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_returns_copies(self):
+        cache = ReadThroughCache("test-copy", ttl=60, max_entries=10)
+        first = cache.get_or_load("all", Loader())
+        first.append("changed")
+        assert cache.get_or_load("all", Loader()) == [{"call": 1}]
+
+    def test_invalidate_reloads(self):
+        cache = ReadThroughCache("test-invalidate", ttl=60, max_entries=10)
+        loader = Loader()
+        cache.get_or_load("all", loader)
+        cache.invalidate()
+        assert cache.get_or_load("all", loader) == [{"call": 2}]
+
+    def test_expired_entry_reloads(self, monkeypatch):
+        cache = ReadThroughCache("test-ttl", ttl=10, max_entries=10)
+        loader = Loader()
+        now = [1000.0]
+        monkeypatch.setattr("domain.repositories.cache.time.monotonic", lambda: now[0])
+        cache.get_or_load("all", loader)
+        now[0] += 11
+        cache.get_or_load("all", loader)
+        assert loader.calls == 2
+
+    def test_evicts_least_recently_used(self):
+        cache = ReadThroughCache("test-lru", ttl=60, max_entries=2)
+        cache.get_or_load("a", Loader())
+        cache.get_or_load("b", Loader())
+        cache.get_or_load("a", Loader())
+        cache.get_or_load("c", Loader())
+        loader = Loader()
+        cache.get_or_load("a", loader)
+        cache.get_or_load("b", loader)
+        assert loader.calls == 1  # only "b" was evicted
+        assert cache.stats()["evictions"] == 2
+
+    def test_load_racing_with_invalidation_is_not_stored(self):
+        cache = ReadThroughCache("test-race", ttl=60, max_entries=10)
+
+        def loader():
+            cache.invalidate()  # a write commits while the value is being loaded
+            return "stale"
+
+        assert cache.get_or_load("all", loader) == "stale"
+        assert cache.stats()["size"] == 0
+
+    def test_get_and_put_without_loader(self):
+        cache = ReadThroughCache("test-put", ttl=60, max_entries=1)
+        assert cache.get("a") is None
+        cache.put("a", "student")
+        assert cache.get("a") == "student"
+        cache.put("b", "teacher")
+        assert cache.get("a") is None
+        assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 1, "invalidations": 0, "size": 1}
+
+    def test_registered_in_stats(self):
+        ReadThroughCache("test-stats", ttl=60, max_entries=10)
+        assert "test-stats" in get_cache_stats()
+        assert "skill" in get_cache_stats()
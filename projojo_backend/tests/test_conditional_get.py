@@ -0,0 +1,115 @@
+import asyncio
+import json
+from email.utils import formatdate
+import pytest
+from starlette.requests import Request
+from auth.permissions import set_request_context
+from domain.repositories.versions import EntityVersions
+from service import conditional_get_service
+from service.conditional_get_service import conditional_get, is_not_modified
+
+
+def _request(**headers: str) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+class TestEntityVersions:
+    def test_etag_changes_only_for_bumped_types(self):
+        versions = EntityVersions()
+        skills, tasks = versions.etag("skill"), versions.etag("task")
+
+        versions.bump("task")
+
+        assert versions.etag("skill") == skills
+        assert versions.etag("task") != tasks
+        assert versions.etag("skill", "task") != versions.etag("skill")
+
+    def test_etag_differs_per_process(self):
+        assert EntityVersions().etag("skill") != EntityVersions().etag("skill")
+
+    def test_last_modified_is_latest_change(self):
+        versions = EntityVersions()
+        started = versions.last_modified("skill")
+
+        versions.bump("task")
+
+        assert versions.last_modified("skill") == started
+        assert versions.last_modified("skill", "task") >= started
+
+
+class TestIsNotModified:
+    @pytest.mark.parametrize("if_none_match", ['W/"a-1"', '"a-1"', 'W/"x", W/"a-1"', "*"])
+    def test_matching_etag(self, if_none_match):
+        assert is_not_modified(_request(if_none_match=if_none_match), 'W/"a-1"', 0)
+
+    def test_other_etag(self):
+        assert not is_not_modified(_request(if_none_match='W/"a-0"'), 'W/"a-1"', 0)
+
+    def test_if_modified_since(self):
+        request = _request(if_modified_since=formatdate(1_700_000_000, usegmt=True))
+        assert is_not_modified(request, 'W/"a-1"', 1_700_000_000.5)
+        assert not is_not_modified(request, 'W/"a-1"', 1_700_000_001.2)
+
+    def test_if_none_match_takes_precedence(self):
+        request = _request(if_none_match='W/"a-0"', if_modified_since=formatdate(2_000_000_000, usegmt=True))
+        assert not is_not_modified(request, 'W/"a-1"', 0)
+
+    def test_invalid_date_is_ignored(self):
+        assert not is_not_modified(_request(if_modified_since="gisteren"), 'W/"a-1"', 0)
+
+
+class TestConditionalGet:
+    @pytest.fixture
+    def versions(self, monkeypatch):
+        versions = EntityVersions()
+        monkeypatch.setattr(conditional_get_service, "entity_versions", versions)
+        return versions
+
+    @staticmethod
+    def _get(handler, **headers):
+        async def main():
+            set_request_context(_request(**headers))
+            return await handler()
+        return asyncio.run(main())
+
+    def test_not_modified_without_running_the_endpoint(self, versions):
+        calls = []
+
+        @conditional_get("skill")
+        async def handler():
+            calls.append(1)
+            return [{"id": "s1"}]
+
+        first = self._get(handler)
+        assert first.status_code == 200
+        assert json.loads(first.body) == [{"id": "s1"}]
+        assert first.headers["cache-control"] == "private, no-cache"
+
+        second = self._get(handler, if_none_match=first.headers["etag"])
+        assert second.status_code == 304
+        assert second.headers["etag"] == first.headers["etag"]
+        assert len(calls) == 1
+
+    def test_write_invalidates_etag(self, versions):
+        @conditional_get("skill")
+        async def handler():
+            return []
+
+        etag = self._get(handler).headers["etag"]
+        versions.bump("skill")
+
+        response = self._get(handler, if_none_match=etag)
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_last_modified_only_for_completed_second(self, versions):
+        @conditional_get("skill")
+        async def handler():
+            return []
+
+        versions.bump("skill")
+        assert "last-modified" not in self._get(handler).headers
+
+        versions._changed_at["skill"] -= 5
+        assert "last-modified" in self._get(handler).headers
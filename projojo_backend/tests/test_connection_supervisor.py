@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+from db.circuit_breaker import CircuitBreaker
+from db.connection_supervisor import ConnectionSupervisor
+from db.initDatabase import Db
+from exceptions import DatabaseUnavailableException
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure(RuntimeError("down"))
+        breaker.before_call()
+        breaker.record_failure(RuntimeError("down"))
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(DatabaseUnavailableException):
+            breaker.before_call()
+        assert breaker.snapshot()["rejected_calls"] == 1
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_single_trial(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("db.circuit_breaker.time.monotonic", lambda: now[0])
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+        now[0] += 11
+        breaker.before_call()  # the trial call
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(DatabaseUnavailableException):
+            breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestRequestPath:
+    def test_supervised_request_fails_fast_without_connection(self, monkeypatch):
+        monkeypatch.setattr(Db, "driver", None)
+        monkeypatch.setattr(Db, "_connection_established", False)
+        monkeypatch.setattr(Db, "supervised", True)
+        monkeypatch.setattr(Db, "breaker", CircuitBreaker(failure_threshold=5, reset_timeout=60))
+        monkeypatch.setattr(Db, "connect", lambda: pytest.fail("requests must not reconnect"))
+        with pytest.raises(DatabaseUnavailableException):
+            Db.read_transact("match $x isa task;")
+        assert Db.breaker.snapshot()["consecutive_failures"] == 1
+
+
+class TestConnectionSupervisor:
+    @pytest.fixture(autouse=True)
+    def fake_db(self, monkeypatch):
+        self.connected = True
+        self.probe_error = None
+        monkeypatch.setattr(Db, "breaker", CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        monkeypatch.setattr(Db, "is_connected", lambda: self.connected)
+        monkeypatch.setattr(Db, "close", lambda: setattr(self, "connected", False))
+        monkeypatch.setattr(Db, "reconnect", lambda: setattr(self, "connected", True))
+
+        def probe():
+            if self.probe_error:
+                raise self.probe_error
+
+        monkeypatch.setattr(Db, "probe", probe)
+
+    def test_healthy_probe_closes_breaker(self):
+        Db.breaker.record_failure()
+        assert asyncio.run(ConnectionSupervisor(interval=1).check())
+        assert Db.breaker.snapshot()["consecutive_failures"] == 0
+
+    def test_failed_probes_open_breaker_and_reconnect(self):
+        supervisor = ConnectionSupervisor(interval=1)
+        self.probe_error = RuntimeError("connection reset")
+        assert not asyncio.run(supervisor.check())
+        assert self.connected  # one failure is not enough to drop the connection
+        assert not asyncio.run(supervisor.check())
+        assert Db.breaker.state == CircuitBreaker.OPEN
+        assert not self.connected
+
+        self.probe_error = None
+        assert asyncio.run(supervisor.check())
+        assert self.connected
+        assert supervisor.reconnects == 1
+        assert Db.breaker.state == CircuitBreaker.CLOSED
+
+    def test_start_and_stop(self, monkeypatch):
+        monkeypatch.setattr(Db, "supervised", False)
+
+        async def run():
+            supervisor = ConnectionSupervisor(interval=0.01)
+            supervisor.start()
+            assert Db.supervised
+            await asyncio.sleep(0.05)
+            assert supervisor.snapshot()["running"]
+            await supervisor.stop()
+            assert not Db.supervised
+
+        asyncio.run(run())
+
+
+class TestReconnect:
+    def test_uses_working_credentials_without_printing_secrets(self, monkeypatch, capsys):
+        credentials = []
+
+        class FakeDatabases:
+            def contains(self, name):
+                return False
+
+        class FakeDriver:
+            databases = FakeDatabases()
+
+        def driver(address, credential, options):
+            credentials.append(credential)
+            return FakeDriver()
+
+        monkeypatch.setattr("db.initDatabase.TypeDB.driver", driver)
+        monkeypatch.setattr("db.initDatabase.Credentials", lambda username, password: (username, password))
+        monkeypatch.setattr(Db, "initialize_connection", lambda: pytest.fail("reconnects skip the first-start checks"))
+        for name, value in (("driver", None), ("db", None), ("_connection_established", False),
+                            ("connected_password", "s3cret-default")):
+            monkeypatch.setattr(Db, name, value)
+
+        Db.reconnect()
+
+        assert credentials == [(Db.username, "s3cret-default")]
+        assert Db.is_connected()
+        assert "s3cret-default" not in capsys.readouterr().out
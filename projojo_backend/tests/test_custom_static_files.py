@@ -0,0 +1,145 @@
+import asyncio
+import gzip
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+import service.custom_static_files
+from service.custom_static_files import CachedStaticFiles, FallbackStaticFiles, forget_missing_files
+
+UPLOAD = "0b7f6c1e-5d2a-4c3b-9e8f-1a2b3c4d5e6f.png"
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg">' + b"<rect/>" * 200 + b"</svg>"
+
+
+@pytest.fixture
+def client(tmp_path):
+    images = tmp_path / "images"
+    pdf = tmp_path / "pdf"
+    images.mkdir()
+    pdf.mkdir()
+    (images / UPLOAD).write_bytes(b"\x89PNG\r\n\x1a\n" + b"0" * 100)
+    (images / "logo_seed.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+    (pdf / "cv.pdf").write_bytes(b"%PDF-1.4 " + bytes(range(256)) * 4)
+    default_file = tmp_path / "default.svg"
+    default_file.write_bytes(SVG)
+
+    app = Starlette(routes=[
+        Mount("/image", FallbackStaticFiles(directory=str(images), default_file=str(default_file))),
+        Mount("/pdf", CachedStaticFiles(directory=str(pdf), private=True)),
+    ])
+    return TestClient(app)
+
+
+class TestCacheControl:
+    def test_uploads_are_immutable(self, client):
+        response = client.get(f"/image/{UPLOAD}")
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert response.headers["etag"].startswith('"')
+
+    def test_other_files_are_cached_briefly(self, client):
+        assert client.get("/image/logo_seed.png").headers["cache-control"] == "public, max-age=300"
+
+    def test_fallback_is_not_immutable(self, client):
+        response = client.get("/image/ffffffff-ffff-4fff-8fff-ffffffffffff.png", headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert response.content == SVG
+        assert response.headers["cache-control"] == "public, max-age=300"
+
+    def test_pdfs_are_private(self, client):
+        assert client.get("/pdf/cv.pdf").headers["cache-control"].startswith("private, ")
+
+
+class TestConditionalAndRange:
+    def test_etag_revalidation(self, client):
+        etag = client.get(f"/image/{UPLOAD}").headers["etag"]
+        response = client.get(f"/image/{UPLOAD}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+    def test_byte_range_of_pdf(self, client):
+        response = client.get("/pdf/cv.pdf", headers={"Range": "bytes=0-8"})
+        assert response.status_code == 206
+        assert response.content == b"%PDF-1.4 "
+        assert response.headers["content-range"].endswith(f"/{9 + 1024}")
+
+
+class TestPrecompressedSvg:
+    def test_gzipped_when_accepted(self, client, tmp_path):
+        response = client.get("/image/missing.png", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"] == "image/svg+xml"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(SVG)
+        # The client decodes the body
+        assert response.content == SVG
+        assert gzip.decompress((tmp_path / "default.svg.gz").read_bytes()) == SVG
+
+    def test_compressed_off_the_event_loop(self, client, tmp_path, monkeypatch):
+        (tmp_path / "images" / "logo.svg").write_bytes(SVG)
+        on_event_loop = []
+        gzip_variant = service.custom_static_files._gzip_variant
+
+        def record(path, stat_result):
+            try:
+                asyncio.get_running_loop()
+                on_event_loop.append(True)
+            except RuntimeError:
+                on_event_loop.append(False)
+            return gzip_variant(path, stat_result)
+
+        monkeypatch.setattr(service.custom_static_files, "_gzip_variant", record)
+        response = client.get("/image/logo.svg", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == SVG
+        assert on_event_loop == [False]
+
+    def test_variants_have_different_etags(self, client):
+        plain = client.get("/image/missing.png", headers={"Accept-Encoding": "identity"})
+        compressed = client.get("/image/missing.png", headers={"Accept-Encoding": "gzip"})
+        assert plain.headers["etag"] != compressed.headers["etag"]
+
+
+class TestFallback:
+    def test_sent_from_memory(self, client, tmp_path):
+        first = client.get("/image/default.png", headers={"Accept-Encoding": "identity"})
+        (tmp_path / "default.svg").unlink()
+        second = client.get("/image/other.png", headers={"Accept-Encoding": "identity"})
+        assert second.content == first.content == SVG
+        assert second.headers["etag"] == first.headers["etag"]
+        assert client.get("/image/other.png", headers={"If-None-Match": first.headers["etag"],
+                                                       "Accept-Encoding": "identity"}).status_code == 304
+
+    def test_loaded_before_the_first_request(self, client, tmp_path):
+        (tmp_path / "default.svg").unlink()
+        (tmp_path / "default.svg.gz").unlink()
+        assert client.get("/image/a.png", headers={"Accept-Encoding": "identity"}).content == SVG
+        compressed = client.get("/image/a.png", headers={"Accept-Encoding": "gzip"})
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.content == SVG
+
+    def test_missing_names_are_not_looked_up_again(self, client, monkeypatch):
+        lookups = []
+        lookup_path = FallbackStaticFiles.lookup_path
+        monkeypatch.setattr(FallbackStaticFiles, "lookup_path", lambda self, path: lookups.append(path) or lookup_path(self, path))
+
+        for _ in range(3):
+            assert client.get("/image/default.png").headers["content-type"] == "image/svg+xml"
+        assert lookups == ["default.png"]
+
+        # Saving any file makes it look again
+        forget_missing_files()
+        client.get("/image/default.png")
+        assert lookups == ["default.png", "default.png"]
+
+    def test_saved_file_is_found(self, client, tmp_path):
+        assert client.get("/image/later.png").headers["content-type"] == "image/svg+xml"
+        (tmp_path / "images" / "later.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+        forget_missing_files()
+        assert client.get("/image/later.png").content == b"\x89PNG\r\n\x1a\n"
+
+    def test_missing_names_are_bounded(self, client, monkeypatch):
+        monkeypatch.setattr(service.custom_static_files, "MISSING_CACHE_SIZE", 2)
+        for name in ("a.png", "b.png", "c.png"):
+            client.get(f"/image/{name}")
+        mount = client.app.routes[0].app
+        assert list(mount._missing) == ["b.png", "c.png"]
@@ -0,0 +1,99 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime
+import pytest
+from starlette.requests import Request
+from domain.repositories.versions import entity_versions
+from service.discovery_service import DiscoverySnapshot, DiscoverySnapshotRefresher
+
+BUSINESSES = [
+    {"id": "b1", "name": "Boerderij", "projects": [{"id": "p1", "created_at": datetime(2025, 1, 1)}]},
+    {"id": "b2", "name": "Kwekerij", "projects": []},
+]
+
+
+def _request(**headers: str) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/businesses/complete", "headers": raw})
+
+
+@pytest.fixture
+def snapshot() -> DiscoverySnapshot:
+    return DiscoverySnapshot.build(BUSINESSES, {"ETag": 'W/"x-1"'}, 'W/"x-1"', 0)
+
+
+class TestDiscoverySnapshot:
+    def test_json(self, snapshot):
+        response = snapshot.response(_request())
+        assert response.media_type == "application/json"
+        assert json.loads(response.body)[0]["projects"][0]["created_at"] == "2025-01-01T00:00:00"
+        assert response.headers["etag"] == 'W/"x-1"'
+        assert response.headers["vary"] == "Accept, Accept-Encoding"
+
+    def test_ndjson_and_gzip(self, snapshot):
+        response = snapshot.response(_request(accept="application/x-ndjson", accept_encoding="gzip, br"))
+        assert response.headers["content-encoding"] == "gzip"
+        lines = gzip.decompress(response.body).splitlines()
+        assert [json.loads(line)["id"] for line in lines] == ["b1", "b2"]
+
+    def test_gzip_refused(self, snapshot):
+        response = snapshot.response(_request(accept_encoding="gzip;q=0"))
+        assert "content-encoding" not in response.headers
+        assert response.body == snapshot.json
+
+    def test_not_modified(self, snapshot):
+        response = snapshot.response(_request(if_none_match='W/"x-1"'))
+        assert response.status_code == 304
+        assert response.body == b""
+
+
+class TestRefresher:
+    def test_builds_on_start_and_after_writes(self, monkeypatch):
+        loads = []
+        refresher = DiscoverySnapshotRefresher(enabled=True, debounce=0.01)
+
+        def get_all_with_full_nesting():
+            loads.append(1)
+            return BUSINESSES[:len(loads)]
+
+        monkeypatch.setattr(refresher.business_repo, "get_all_with_full_nesting", get_all_with_full_nesting)
+
+        async def wait_for_builds(count):
+            for _ in range(200):
+                if refresher.builds >= count:
+                    return
+                await asyncio.sleep(0.01)
+            raise AssertionError(f"expected {count} builds, got {refresher.builds}")
+
+        async def main():
+            refresher.start()
+            try:
+                await wait_for_builds(1)
+                first = refresher.current
+                assert first.businesses == 1
+
+                # A burst of writes (on another thread, like a repository write) causes one rebuild
+                await asyncio.to_thread(lambda: [entity_versions.bump("task") for _ in range(5)])
+                await wait_for_builds(2)
+                assert refresher.current.businesses == 2
+                assert refresher.current.etag != first.etag
+
+                # Writes of unrelated entity types do not
+                entity_versions.bump("user")
+                await asyncio.sleep(0.1)
+                assert refresher.builds == 2
+            finally:
+                await refresher.stop()
+            assert refresher.current is None
+
+        asyncio.run(main())
+        assert len(loads) == 2
+
+    def test_disabled(self):
+        async def main():
+            refresher = DiscoverySnapshotRefresher(enabled=False)
+            refresher.start()
+            return refresher.stats()
+
+        assert asyncio.run(main())["running"] is False
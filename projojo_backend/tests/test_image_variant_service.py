@@ -0,0 +1,121 @@
+import asyncio
+import os
+import pytest
+from PIL import Image
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+from service.custom_static_files import FallbackStaticFiles
+from service.image_variant_service import ImageVariants
+
+UPLOAD = "0b7f6c1e-5d2a-4c3b-9e8f-1a2b3c4d5e6f.png"
+
+
+@pytest.fixture
+def variants(tmp_path):
+    variants = ImageVariants(directory=str(tmp_path / "variants"), max_bytes=10 * 1024 * 1024, workers=1, enabled=True)
+    yield variants
+    variants.shutdown()
+
+
+@pytest.fixture
+def images(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    Image.new("RGB", (1600, 800), (200, 120, 40)).save(images / UPLOAD)
+    return images
+
+
+def _client(images, tmp_path, variants) -> TestClient:
+    default_file = tmp_path / "default.svg"
+    default_file.write_bytes(b'<svg xmlns="http://www.w3.org/2000/svg"/>')
+    app = Starlette(routes=[
+        Mount("/image", FallbackStaticFiles(directory=str(images), default_file=str(default_file), variants=variants)),
+    ])
+    return TestClient(app)
+
+
+class TestNegotiation:
+    @pytest.mark.parametrize("accept, expected", [
+        ("image/avif,image/webp,*/*", "avif"),
+        ("image/avif;q=0,image/webp", "webp"),
+        ("image/webp", "webp"),
+        ("*/*", "png"),
+        ("", "png"),
+    ])
+    def test_best_supported_format(self, accept, expected, monkeypatch):
+        variants = ImageVariants(enabled=True)
+        monkeypatch.setattr(variants, "output_formats", lambda: ["avif", "webp"])
+        assert variants.negotiate(accept, f"static/images/{UPLOAD}") == expected
+
+    def test_original_format_when_disabled(self):
+        variants = ImageVariants(enabled=False)
+        assert variants.negotiate("image/webp", "static/images/logo.jpg") == "jpeg"
+        assert asyncio.run(variants.get("static/images/logo.jpg", "card", "webp")) is None
+
+
+class TestEviction:
+    def test_least_recently_used_variants_are_removed(self, tmp_path):
+        directory = tmp_path / "variants"
+        directory.mkdir()
+        for name in ("a.card.webp", "b.card.webp"):
+            (directory / name).write_bytes(b"0" * 100)
+        variants = ImageVariants(directory=str(directory), max_bytes=250, enabled=False)
+
+        variants._touch("a.card.webp")
+        (directory / "c.card.webp").write_bytes(b"0" * 100)
+        variants._add("c.card.webp", 100)
+
+        assert sorted(os.listdir(directory)) == ["a.card.webp", "c.card.webp"]
+        assert variants.stats()["bytes"] == 200
+        assert variants.evictions == 1
+
+
+class TestVariantResponses:
+    def test_resized_webp(self, images, tmp_path, variants):
+        response = _client(images, tmp_path, variants).get(f"/image/{UPLOAD}?size=card",
+                                                           headers={"Accept": "image/webp,*/*"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert response.headers["vary"] == "Accept"
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert (tmp_path / "variants" / f"{UPLOAD}.card.webp").exists()
+
+        variant_path = tmp_path / "variant.webp"
+        variant_path.write_bytes(response.content)
+        with Image.open(variant_path) as variant:
+            assert variant.size == (480, 240)
+
+    def test_avif(self, images, tmp_path, variants):
+        assert variants.output_formats() == ["avif", "webp"]
+        response = _client(images, tmp_path, variants).get(f"/image/{UPLOAD}?size=hero",
+                                                           headers={"Accept": "image/avif,image/webp,*/*"})
+        assert response.headers["content-type"] == "image/avif"
+        variant_path = tmp_path / "variant.avif"
+        variant_path.write_bytes(response.content)
+        with Image.open(variant_path) as variant:
+            assert variant.size == (1280, 640)
+
+    def test_resized_in_original_format(self, images, tmp_path, variants):
+        response = _client(images, tmp_path, variants).get(f"/image/{UPLOAD}?size=avatar", headers={"Accept": "*/*"})
+        assert response.headers["content-type"] == "image/png"
+        assert len(response.content) < os.path.getsize(images / UPLOAD)
+
+    def test_original_when_nothing_to_convert(self, images, tmp_path, variants):
+        response = _client(images, tmp_path, variants).get(f"/image/{UPLOAD}", headers={"Accept": "*/*"})
+        assert response.content == (images / UPLOAD).read_bytes()
+        assert response.headers["vary"] == "Accept"
+
+    def test_missing_image_falls_back(self, images, tmp_path, variants):
+        response = _client(images, tmp_path, variants).get("/image/missing.png?size=card",
+                                                           headers={"Accept": "image/webp", "Accept-Encoding": "identity"})
+        assert response.headers["content-type"] == "image/svg+xml"
+
+    def test_originals_when_disabled(self, tmp_path):
+        images = tmp_path / "images"
+        images.mkdir()
+        (images / UPLOAD).write_bytes(b"\x89PNG\r\n\x1a\n")
+        response = _client(images, tmp_path, ImageVariants(enabled=False)).get(f"/image/{UPLOAD}?size=card",
+                                                                               headers={"Accept": "image/webp"})
+        assert response.content == b"\x89PNG\r\n\x1a\n"
+        assert "vary" not in response.headers
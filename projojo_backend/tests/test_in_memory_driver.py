@@ -0,0 +1,131 @@
+import time
+import pytest
+from typedb.driver import TransactionType
+from db.in_memory_driver import InMemoryDriver, parse_insert
+from db.initDatabase import Db, SCHEMA_MIGRATIONS, create_database_if_needed
+from domain.repositories.skill_repository import SkillRepository
+from domain.repositories.task_repository import TaskRepository
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    for name, value in (("driver", None), ("db", None), ("_connection_established", False), ("reset", False),
+                        ("schema_migrated", False)):
+        monkeypatch.setattr(Db, name, value)
+    driver = InMemoryDriver()
+    Db.use_driver(driver)
+    create_database_if_needed()
+    return driver
+
+
+def all_skills(query, graph, match):
+    return [
+        {"id": skill.get("id"), "name": skill.get("name"), "isPending": skill.get("isPending"),
+         "createdAt": skill.get("createdAt")}
+        for skill in graph.things("skill")
+    ]
+
+
+class TestParseInsert:
+    def test_entities_relations_and_values(self):
+        statements = parse_insert('''
+            insert
+                $t isa task, has name "Say \\"hi\\"", has totalNeeded 3; # comment
+                $r isa registersForTask (student: $s, task: $t), has isAccepted true,
+                    has createdAt 2025-01-15T09:00:00+0000;
+        ''')
+        assert statements[0]["attributes"] == [("name", 'Say "hi"'), ("totalNeeded", 3)]
+        assert statements[1]["roles"] == {"student": ["$s"], "task": ["$t"]}
+        assert ("isAccepted", True) in statements[1]["attributes"]
+
+
+class TestInMemoryDriver:
+    def test_loads_schema_and_seed(self, driver):
+        graph = driver.graph
+        assert len(graph.things("skill")) == 20
+        assert {user.type for user in graph.things("user")} == {"teacher", "student", "supervisor"}
+        manages = graph.relations("manages")[0]
+        assert manages.player("business").type == "business"
+
+    def test_repository_reads_through_handler(self, driver, monkeypatch):
+        monkeypatch.setattr(SkillRepository, "get_all", SkillRepository._load_all)
+        driver.on(r"match \$skill isa skill, has id \$id; fetch", all_skills)
+        skills = SkillRepository().get_all()
+        assert len(skills) == 20
+        assert skills[0].name == "Bodemanalyse"
+
+    def test_strict_mode_rejects_unknown_queries(self, driver):
+        driver.strict = True
+        with pytest.raises(LookupError):
+            Db.read_transact("match $x isa unknown;")
+
+    def test_writes_apply_on_commit_only(self, driver):
+        insert = 'insert $s isa skill, has id "new", has name "Nieuw", has isPending true;'
+        with driver.transaction(Db.name, TransactionType.WRITE) as tx:
+            tx.query(insert).resolve()
+        assert driver.graph.find("skill", id="new") is None
+
+        Db.write_transact(insert)
+        assert driver.graph.find("skill", id="new").get("name") == "Nieuw"
+        assert driver.commits[-1] == [insert]
+
+    def test_write_handler_runs_on_commit(self, driver):
+        deleted = []
+        driver.on(r"delete \$skill;", lambda query, graph, match: deleted.append(query))
+        Db.write_transact('match $skill isa skill, has id ~id; delete $skill;', {"id": "abc"})
+        assert len(deleted) == 1
+
+    def test_artificial_latency(self, driver):
+        driver.latency = 0.02
+        started = time.perf_counter()
+        Db.read_transact("match $x isa skill;")
+        assert time.perf_counter() - started >= 0.02
+
+
+class TestSchemaMigrations:
+    @pytest.fixture
+    def existing_database(self, monkeypatch):
+        """A database created before the registration counters were added to schema.tql."""
+        for name, value in (("driver", None), ("db", None), ("_connection_established", False), ("reset", False),
+                            ("schema_migrated", False)):
+            monkeypatch.setattr(Db, name, value)
+        driver = InMemoryDriver()
+        driver.databases.create(Db.name)
+        Db.use_driver(driver)
+        with open(Db.schema_path) as file:
+            old_schema = "\n".join(line for line in file if "totalRegistered" not in line and "totalAccepted" not in line)
+        Db.schema_transact(old_schema)
+        assert "totalRegistered" not in driver.graph.supertypes
+        driver.query_log.clear()
+        return driver
+
+    def test_existing_database_gets_the_new_types(self, existing_database):
+        create_database_if_needed()
+
+        assert {"totalRegistered", "totalAccepted"} <= existing_database.graph.supertypes.keys()
+        schema_queries = [query for type, query in existing_database.query_log if type == TransactionType.SCHEMA]
+        assert schema_queries == [query for _, query in SCHEMA_MIGRATIONS]
+        assert "task owns totalRegistered @card(0..1);" in schema_queries[0]
+        # No seed data is inserted into an existing database
+        assert not any(type == TransactionType.WRITE for type, _ in existing_database.query_log)
+
+    def test_registration_counters_are_filled_in(self, existing_database, monkeypatch):
+        migrated_when_reconciled = []
+
+        def reconcile(repository):
+            migrated_when_reconciled.append(Db.schema_migrated)
+            return 0
+
+        monkeypatch.setattr(TaskRepository, "reconcile_registration_counters", reconcile)
+        create_database_if_needed()
+        # Synchronously, before the database counts as migrated (and requests read the counters)
+        assert migrated_when_reconciled == [False]
+
+    def test_runs_once_per_process(self, existing_database):
+        create_database_if_needed()
+        create_database_if_needed()
+        schema_queries = [query for type, query in existing_database.query_log if type == TransactionType.SCHEMA]
+        assert len(schema_queries) == len(SCHEMA_MIGRATIONS)
+
+    def test_new_database_is_not_migrated(self, driver):
+        assert not any(query in [q for _, q in SCHEMA_MIGRATIONS] for _, query in driver.query_log)
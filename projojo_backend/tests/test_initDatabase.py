@@ -1,5 +1,5 @@
 import pytest
-from db.initDatabase import sanitize_string, format_value, build_query
+from db.initDatabase import Db, sanitize_string, format_value, build_query, CompiledQuery
 from uuid import UUID
 from datetime import datetime, date
 
@@ -176,4 +176,119 @@ class TestBuildQueryWriteMode:
             'id': 'task-123',
             'description': "A real description"
         }, allow_none=True)
-        assert 'has description "A real description"' in result
\ No newline at end of file
+        assert 'has description "A real description"' in result
+
+class TestCompiledQuery:
+    """Tests for CompiledQuery, the precompiled form used by build_query"""
+
+    def test_duplicate_placeholder_raises_on_compile(self):
+        with pytest.raises(ValueError, match="Duplicate placeholders"):
+            CompiledQuery('match $x isa task, has id ~id, has name ~id;')
+
+    def test_render_matches_build_query(self):
+        template = 'match $x isa task, has id ~id, has name ~name;'
+        params = {'id': 'abc', 'name': 'Test Task'}
+        assert CompiledQuery(template).render(params) == build_query(template, params)
+
+    def test_render_many_times(self):
+        query = CompiledQuery('match $x isa task, has id ~id;')
+        assert query.render({'id': 'a'}) == 'match $x isa task, has id "a";'
+        assert query.render({'id': 'b'}) == 'match $x isa task, has id "b";'
+
+    def test_similar_placeholder_names(self):
+        query = CompiledQuery('match $x has id ~id, has name ~id_name;')
+        assert query.render({'id': 'a', 'id_name': 'b'}) == 'match $x has id "a", has name "b";'
+
+    def test_value_with_placeholder_text_is_not_substituted_again(self):
+        query = CompiledQuery('insert $x isa task, has name ~name, has description ~description;')
+        result = query.render({'name': '~description', 'description': 'text'})
+        assert result == 'insert $x isa task, has name "~description", has description "text";'
+
+    def test_none_removes_clause(self):
+        query = CompiledQuery('''insert
+            $task isa task,
+            has id ~id,
+            has description ~desc;''')
+        result = query.render({'id': 'abc', 'desc': None}, allow_none=True)
+        assert result == build_query(query.template, {'id': 'abc', 'desc': None}, allow_none=True)
+        assert 'description' not in result
+        # The derived template is reused for the next render
+        assert query.render({'id': 'def', 'desc': None}, allow_none=True) == result.replace('abc', 'def')
+
+    def test_none_raises_in_read_mode(self):
+        with pytest.raises(ValueError, match="Cannot use None in read queries"):
+            CompiledQuery('match $x isa task, has id ~id;').render({'id': None})
+
+    def test_build_query_accepts_compiled_query(self):
+        query = CompiledQuery('match $x isa task, has id ~id;')
+        assert build_query(query, {'id': 'abc'}) == 'match $x isa task, has id "abc";'
+
+
+class FakeWriteTransaction:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.queries = []
+        self.commits = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def query(self, query):
+        if query == self.fail_on:
+            raise RuntimeError("query failed")
+        self.queries.append(query)
+        return self
+
+    def resolve(self):
+        return None
+
+    def commit(self):
+        self.commits += 1
+
+
+class FakeDriver:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.transactions = []
+
+    def transaction(self, name, transaction_type):
+        tx = FakeWriteTransaction(self.fail_on)
+        self.transactions.append(tx)
+        return tx
+
+
+class TestWriteBatch:
+    @pytest.fixture(autouse=True)
+    def fake_driver(self, monkeypatch):
+        monkeypatch.setattr(Db, 'driver', FakeDriver())
+        monkeypatch.setattr(Db, '_connection_established', True)
+
+    def test_single_transaction_and_commit(self):
+        query = 'match $s isa skill, has id ~id; delete $s;'
+        Db.write_batch([(query, {'id': 'a'}), (query, {'id': 'b'}), ('insert $x isa skill;', None)])
+        assert len(Db.driver.transactions) == 1
+        tx = Db.driver.transactions[0]
+        assert tx.commits == 1
+        assert tx.queries == [
+            'match $s isa skill, has id "a"; delete $s;',
+            'match $s isa skill, has id "b"; delete $s;',
+            'insert $x isa skill;',
+        ]
+
+    def test_empty_batch_opens_no_transaction(self):
+        Db.write_batch([])
+        assert Db.driver.transactions == []
+
+    def test_failed_statement_is_not_committed(self):
+        Db.driver.fail_on = 'broken'
+        with pytest.raises(RuntimeError):
+            Db.write_batch([('insert $x isa skill;', None), ('broken', None)])
+        assert Db.driver.transactions[0].commits == 0
+
+    def test_invalid_params_fail_before_transaction(self):
+        with pytest.raises(ValueError):
+            Db.write_batch([('insert $x isa skill;', None), ('match $s has id ~id;', {'name': 'a'})])
+        assert Db.driver.transactions == []
@@ -0,0 +1,65 @@
+import asyncio
+import httpx
+import pytest
+from db.initDatabase import Db
+from loadtest.harness import _supervisor_tasks, build_users, percentile, run_load_test, setup_in_memory_database
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    for name, value in (("driver", None), ("db", None), ("_connection_established", False), ("reset", False)):
+        monkeypatch.setattr(Db, name, value)
+    return setup_in_memory_database(latency=0)
+
+
+@pytest.fixture
+def app():
+    from main import app
+    return app
+
+
+async def request(app, method, path, token, **kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+
+
+class TestLoadTest:
+    def test_percentile_nearest_rank(self):
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 95) == 0.0
+
+    def test_registration_is_visible_to_supervisor(self, driver, app):
+        graph = driver.graph
+        student, supervisor = build_users(graph, students=1, supervisors=1)
+        supervisor_id, _, task_ids = _supervisor_tasks(graph)[0]
+        assert supervisor.user_id == supervisor_id
+        registered = {r.player("task").get("id") for r in graph.relations("registersForTask")
+                      if r.player("student").get("id") == student.user_id}
+        task_id = next(id for id in task_ids if id not in registered)
+
+        response = asyncio.run(request(app, "POST", f"/tasks/{task_id}/registrations", student.token,
+                                       json={"motivation": "Graag!"}))
+        assert response.status_code == 200
+
+        response = asyncio.run(request(app, "GET", f"/tasks/{task_id}/registrations", supervisor.token))
+        assert response.status_code == 200
+        assert {"reason": "Graag!"}.items() <= next(
+            r for r in response.json() if r["student"]["id"] == student.user_id
+        ).items()
+
+    def test_short_run_hits_all_routes_without_errors(self, driver, app):
+        users = build_users(driver.graph, students=6, supervisors=2)
+        assert len(users) == 8
+
+        results = asyncio.run(run_load_test(app, users, duration=0.5, think_time=0.001, seed=1))
+        assert set(results["routes"]) == {
+            "GET /businesses/complete",
+            "GET /tasks/{id}",
+            "POST /tasks/{id}/registrations",
+            "GET /tasks/{id}/registrations",
+        }
+        assert results["total"]["errors"] == 0
+        assert results["total"]["requests"] == sum(route["requests"] for route in results["routes"].values())
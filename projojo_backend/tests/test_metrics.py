@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from db.async_db import AsyncDb
+from db.initDatabase import Db
+from db.metrics import QueryMetrics, db_metrics, query_caller
+from domain.repositories.cache import ReadThroughCache
+from domain.repositories.pagination import BY_ID, PageRequest, read_page
+from service.metrics_service import render_metrics
+
+
+class FakeTransaction:
+    def __init__(self, rows=None, error=None):
+        self.rows = rows or []
+        self.error = error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def query(self, query):
+        if self.error:
+            raise self.error
+        return self
+
+    def resolve(self):
+        return iter(self.rows)
+
+
+class SkillRepositoryStub:
+    def get_all(self):
+        return Db.read_transact("match $s isa skill;")
+
+    def iter_all(self):
+        # Returns the stream without being a generator itself, like BusinessRepository.iter_all_with_full_nesting
+        return Db.read_stream("match $s isa skill;")
+
+    def get_page(self, page):
+        return read_page(page, "$s isa skill, has id $id;", "{ 'id': $id };", BY_ID, lambda row: row)
+
+    def get_cached(self, cache):
+        return cache.get_or_load("all", lambda: Db.read_transact("match $s isa skill;"))
+
+
+class TestQueryMetrics:
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = QueryMetrics()
+        metrics.observe("read", "Repo.get", 0.003, 2, False)
+        metrics.observe("read", "Repo.get", 0.2, 3, True)
+        series = metrics.snapshot()[0]
+        buckets = dict(series["buckets"])
+        assert buckets[0.005] == 1
+        assert buckets[0.25] == 2
+        assert series["count"] == 2
+        assert series["rows"] == 5
+        assert series["errors"] == 1
+
+    def test_query_caller_is_calling_function(self):
+        def get_by_id():
+            return query_caller()
+        assert get_by_id().endswith("get_by_id")
+
+
+class TestInstrumentation:
+    @pytest.fixture(autouse=True)
+    def reset(self, monkeypatch):
+        db_metrics.reset()
+        monkeypatch.setattr(Db, "_open_read_transaction", lambda: self.transaction)
+
+    def test_read_records_caller_and_rows(self):
+        self.transaction = FakeTransaction(rows=[{"id": "1"}, {"id": "2"}])
+        SkillRepositoryStub().get_all()
+        series = db_metrics.snapshot()[0]
+        assert series["operation"] == "read"
+        assert series["query"] == "SkillRepositoryStub.get_all"
+        assert series["rows"] == 2
+        assert series["errors"] == 0
+
+    def test_failed_read_counts_error(self):
+        self.transaction = FakeTransaction(error=RuntimeError("bad query"))
+        with pytest.raises(RuntimeError):
+            SkillRepositoryStub().get_all()
+        assert db_metrics.snapshot()[0]["errors"] == 1
+
+    def test_stream_closed_early_is_not_an_error(self):
+        self.transaction = FakeTransaction(rows=[{"id": "1"}, {"id": "2"}])
+        stream = Db.read_stream("match $s isa skill;")
+        next(stream)
+        stream.close()
+        series = db_metrics.snapshot()[0]
+        assert series["operation"] == "stream"
+        assert series["rows"] == 1
+        assert series["errors"] == 0
+
+    def test_stream_is_labelled_with_the_method_that_opened_it(self):
+        self.transaction = FakeTransaction(rows=[{"id": "1"}, {"id": "2"}])
+
+        async def consume():
+            return [row async for row in AsyncDb.iterate(SkillRepositoryStub().iter_all)]
+
+        assert len(asyncio.run(consume())) == 2
+        assert 'projojo_db_query_duration_seconds_count{operation="stream",query="SkillRepositoryStub.iter_all"} 1' in render_metrics()
+
+    def test_helpers_and_lambdas_are_not_the_caller(self):
+        self.transaction = FakeTransaction(rows=[{"id": "1"}])
+        repository = SkillRepositoryStub()
+        repository.get_page(PageRequest())
+        repository.get_cached(ReadThroughCache("skill_stub"))
+        assert [series["query"] for series in db_metrics.snapshot()] == [
+            "SkillRepositoryStub.get_cached", "SkillRepositoryStub.get_page",
+        ]
+
+    def test_prometheus_output(self):
+        self.transaction = FakeTransaction(rows=[{"id": "1"}])
+        SkillRepositoryStub().get_all()
+        text = render_metrics()
+        assert '# TYPE projojo_db_query_duration_seconds histogram' in text
+        assert 'projojo_db_query_duration_seconds_count{operation="read",query="SkillRepositoryStub.get_all"} 1' in text
+        assert 'projojo_db_query_rows_total{operation="read",query="SkillRepositoryStub.get_all"} 1' in text
+        assert 'projojo_db_circuit_breaker_state{state="closed"} 1' in text
+        assert 'projojo_cache_hits_total{cache="skill"}' in text
@@ -0,0 +1,78 @@
+from datetime import datetime
+import pytest
+from db.initDatabase import Db, build_query
+from domain.repositories.pagination import (
+    BY_ID, PageRequest, _after, by_created_at, decode_cursor, encode_cursor, read_page,
+)
+from exceptions import InvalidCursorException
+from service.pagination_service import page_params
+
+
+class TestCursor:
+    def test_round_trip(self):
+        cursor = encode_cursor(["2025-01-15T09:00:00.000000000", "abc"])
+        assert "=" not in cursor
+        assert decode_cursor(cursor, by_created_at()) == [datetime(2025, 1, 15, 9, 0), "abc"]
+
+    def test_datetime_with_offset_becomes_utc(self):
+        cursor = encode_cursor(["2025-01-15T10:00:00.000000000+01:00", "abc"])
+        assert decode_cursor(cursor, by_created_at())[0] == datetime(2025, 1, 15, 9, 0)
+
+    @pytest.mark.parametrize("cursor", ["not base64!", encode_cursor(["a"]), encode_cursor([1, 2]), "e30"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(InvalidCursorException):
+            decode_cursor(cursor, by_created_at())
+
+    def test_after_clause_for_compound_key(self):
+        clause, params = _after(by_created_at(), [datetime(2025, 1, 15, 9, 0), "abc"])
+        assert build_query(clause, params) == (
+            '{ $createdAt > 2025-01-15T09:00:00.000000+0000; } or '
+            '{ $createdAt == 2025-01-15T09:00:00.000000+0000; $id > "abc"; };'
+        )
+
+
+def to_int(row):
+    return int(row["id"])
+
+
+class TestReadPage:
+    @pytest.fixture
+    def queries(self, monkeypatch):
+        queries = []
+
+        def read_transact(query, params=None, sort_fields=True):
+            queries.append(build_query(query, params) if params else query)
+            if "return count" in query:
+                return [{"total": 5}]
+            start = 2 if params and "after_0_0" in params else 0
+            return [{"id": str(i)} for i in range(start, 5)][:params["limit"]]
+
+        monkeypatch.setattr(Db, "read_transact", read_transact)
+        return queries
+
+    def test_pages_through_all_rows(self, queries):
+        first = read_page(PageRequest(limit=2), "$x isa skill, has id $id;", "{ 'id': $id };", BY_ID, to_int)
+        assert first.items == [0, 1]
+        assert first.total is None
+        assert "sort $id asc;" in queries[0] and "limit 3;" in queries[0]
+        assert decode_cursor(first.next_cursor, BY_ID) == ["1"]
+
+        second = read_page(PageRequest(limit=3, cursor=first.next_cursor), "$x isa skill, has id $id;",
+                           "{ 'id': $id };", BY_ID, to_int)
+        assert '$id > "1";' in queries[1]
+        assert second.items == [2, 3, 4]
+        assert second.next_cursor is None
+
+    def test_total_on_request(self, queries):
+        page = read_page(PageRequest(limit=10, include_total=True), "$x isa skill, has id $id;",
+                         "{ 'id': $id };", BY_ID, to_int, count_match="$counted isa skill;")
+        assert page.total == 5
+        assert "limit 1;" in queries[1] and "$counted isa skill;" in queries[1]
+
+
+class TestPageParams:
+    def test_unpaginated_without_limit_or_cursor(self):
+        assert page_params(limit=None, cursor=None, include_total=True) is None
+
+    def test_default_limit_with_cursor(self):
+        assert page_params(limit=None, cursor="abc", include_total=False) == PageRequest(cursor="abc")
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from db.initDatabase import Db
+from domain.repositories.task_repository import TaskRepository
+from loadtest.harness import setup_in_memory_database
+from service.registration_counter_service import RegistrationCounterReconciler
+
+
+class Writes(list):
+    """Records every write batch as a list of (query, params)."""
+
+    def write_batch(self, statements):
+        self.append([(str(query), params) for query, params in statements])
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    writes = Writes()
+    monkeypatch.setattr(Db, "write_batch", writes.write_batch)
+    return writes
+
+
+class TestRegistrationWrites:
+    def test_create_increments_in_same_transaction(self, writes):
+        TaskRepository().create_registration("t1", "s1", "Graag!")
+
+        [batch] = writes
+        assert "insert" in batch[0][0] and "registersForTask" in batch[0][0]
+        assert "$registered + 1" in batch[1][0] and batch[1][1] == {"task_id": "t1"}
+
+    def test_accept_moves_pending_to_accepted_before_update(self, writes):
+        TaskRepository().update_registration("t1", "s1", True, "Welkom")
+
+        [batch] = writes
+        assert "$registered - 1" in batch[0][0]
+        assert "$accepted + 1" in batch[1][0] and "not { $registration has isAccepted true; }" in batch[1][0]
+        assert "update" in batch[2][0] and batch[2][1]["accepted"] is True
+
+    def test_reject_only_decrements_previously_accepted(self, writes):
+        TaskRepository().update_registration("t1", "s1", False)
+
+        [batch] = writes
+        assert "$registered - 1" in batch[0][0]
+        assert "$accepted - 1" in batch[1][0] and "has isAccepted true;" in batch[1][0]
+
+
+class TestReconcile:
+    def test_repairs_drifted_and_missing_counters(self, monkeypatch, writes):
+        rows = [
+            {"id": "ok", "stored_registered": 1, "stored_accepted": 0, "registered": 1, "accepted": 0},
+            {"id": "drifted", "stored_registered": 3, "stored_accepted": 1, "registered": 2, "accepted": 1},
+            {"id": "missing", "registered": 0, "accepted": 2},
+        ]
+        monkeypatch.setattr(Db, "read_transact", lambda query, params=None: rows)
+
+        assert TaskRepository().reconcile_registration_counters() == 2
+
+        [batch] = writes
+        assert batch[0][1] == {"task_id": "drifted", "registered": 2, "accepted": 1,
+                               "stored_registered": 3, "stored_accepted": 1}
+        assert "has totalRegistered ~stored_registered" in batch[0][0]
+        assert batch[1][1] == {"task_id": "missing", "registered": 0, "accepted": 2}
+        assert "not { $task has totalRegistered" in batch[1][0]
+
+    def test_nothing_to_repair(self, monkeypatch, writes):
+        monkeypatch.setattr(Db, "read_transact", lambda query, params=None: [
+            {"id": "ok", "stored_registered": 0, "stored_accepted": 0, "registered": 0, "accepted": 0},
+        ])
+        assert TaskRepository().reconcile_registration_counters() == 0
+        assert writes == []
+
+    def test_failed_run_is_reported(self, monkeypatch):
+        def unavailable():
+            raise ConnectionError("TypeDB is niet bereikbaar")
+
+        reconciler = RegistrationCounterReconciler(interval=60)
+        monkeypatch.setattr(reconciler.task_repo, "reconcile_registration_counters", unavailable)
+
+        assert asyncio.run(reconciler.reconcile()) == 0
+        assert reconciler.snapshot()["last_error"] == "ConnectionError: TypeDB is niet bereikbaar"
+
+
+def test_seed_counters_match_registrations():
+    graph = setup_in_memory_database(latency=0).graph
+    for task in graph.things("task"):
+        registrations = graph.relations("registersForTask", task=task)
+        assert task.get("totalRegistered") == sum(1 for r in registrations if "isAccepted" not in r.attributes)
+        assert task.get("totalAccepted") == sum(1 for r in registrations if r.get("isAccepted") is True)
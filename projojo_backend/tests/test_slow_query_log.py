@@ -0,0 +1,96 @@
+from db.initDatabase import CompiledQuery
+from db.slow_query_log import SlowQueryLog, fingerprint
+
+
+class TestFingerprint:
+    def test_placeholders_and_literals_are_stripped(self):
+        query_id, normalized = fingerprint('''
+            match
+                $task isa task, has id ~id, has totalNeeded 3;
+                $x has name "Foo";
+        ''')
+        assert normalized == 'match $task isa task, has id ?, has totalNeeded ?; $x has name ?;'
+        assert len(query_id) == 12
+
+    def test_same_shape_same_fingerprint(self):
+        first = fingerprint('match $s isa skill, has id "a";')
+        second = fingerprint('match   $s isa skill,\n has id "b";')
+        assert first == second
+
+    def test_template_and_compiled_query_match(self):
+        template = 'match $s isa skill, has id ~id;'
+        assert fingerprint(str(CompiledQuery(template))) == fingerprint(template)
+
+    def test_variable_names_with_digits_are_kept(self):
+        _, normalized = fingerprint('match $p1 isa project; $hp2 isa hasProjects;')
+        assert normalized == 'match $p1 isa project; $hp2 isa hasProjects;'
+
+
+class TestSlowQueryLog:
+    def test_only_records_slow_queries(self):
+        log = SlowQueryLog(threshold_ms=100, max_entries=10)
+        log.record('match $s isa skill;', 'read', 'SkillRepository.get_all', 0.05, 1, '/skills/')
+        assert log.top() == []
+        log.record('match $s isa skill;', 'read', 'SkillRepository.get_all', 0.2, 1, '/skills/')
+        assert log.top()[0]["count"] == 1
+
+    def test_disabled_with_zero_threshold(self):
+        log = SlowQueryLog(threshold_ms=0, max_entries=10)
+        log.record('match $s isa skill;', 'read', 'SkillRepository.get_all', 10, 1, None)
+        assert log.top() == []
+
+    def test_top_aggregates_per_fingerprint(self):
+        log = SlowQueryLog(threshold_ms=100, max_entries=10)
+        log.record('match $b isa business, has id "1";', 'read', 'BusinessRepository.get_by_id', 0.2, 1, '/businesses/1')
+        log.record('match $b isa business, has id "2";', 'read', 'BusinessRepository.get_by_id', 0.4, 1, '/businesses/2')
+        log.record('match $t isa task;', 'stream', 'TaskRepository.iter_all', 1.0, 500, '/tasks/')
+        top = log.top(limit=10)
+        assert [group["callers"] for group in top] == [
+            ['TaskRepository.iter_all'], ['BusinessRepository.get_by_id']
+        ]
+        business = top[1]
+        assert business["count"] == 2
+        assert business["max_ms"] == 400.0
+        assert business["avg_ms"] == 300.0
+        assert business["request_paths"] == ['/businesses/1', '/businesses/2']
+
+    def test_window_excludes_old_entries(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("db.slow_query_log.time.time", lambda: now[0])
+        log = SlowQueryLog(threshold_ms=100, max_entries=10)
+        log.record('match $s isa skill;', 'read', 'SkillRepository.get_all', 0.2, 1, None)
+        now[0] += 120
+        assert log.top(window_seconds=60) == []
+        assert len(log.top(window_seconds=300)) == 1
+
+
+class TestDbIntegration:
+    def test_slow_read_is_logged_with_caller_and_fingerprint(self, monkeypatch):
+        from db.initDatabase import Db
+        from db.slow_query_log import slow_query_log
+
+        class Transaction:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def query(self, query):
+                return self
+
+            def resolve(self):
+                return iter([{"id": "1"}])
+
+        monkeypatch.setattr(Db, "_open_read_transaction", lambda: Transaction())
+        monkeypatch.setattr(slow_query_log, "threshold_ms", 1e-9)
+        slow_query_log.clear()
+
+        def get_by_id():
+            return Db.read_transact('match $s isa skill, has id ~id;', {"id": "abc"})
+
+        get_by_id()
+        [entry] = slow_query_log.top()
+        assert entry["query"] == 'match $s isa skill, has id ?;'
+        assert entry["callers"][0].endswith("get_by_id")
+        slow_query_log.clear()
@@ -0,0 +1,77 @@
+import asyncio
+import json
+from datetime import datetime
+import pytest
+from domain.models import Skill
+from starlette.requests import Request
+from service.streaming_service import accepts_ndjson, stream_json_array, stream_ndjson
+
+
+async def _items(*items):
+    for item in items:
+        yield item
+
+
+def _stream(*items) -> tuple:
+    """Create the response and read its body in the same event loop"""
+    async def main():
+        response = await stream_json_array(_items(*items))
+        return response, b"".join([chunk async for chunk in response.body_iterator])
+    return asyncio.run(main())
+
+
+class TestStreamJsonArray:
+    def test_streams_valid_json_array(self):
+        skill = Skill(id="s1", name="Python", is_pending=False, created_at=datetime(2025, 1, 1))
+        response, body = _stream({"id": "b1", "name": "Bedrijf"}, skill)
+
+        assert response.media_type == "application/json"
+        assert json.loads(body) == [
+            {"id": "b1", "name": "Bedrijf"},
+            {"id": "s1", "name": "Python", "is_pending": False, "created_at": "2025-01-01T00:00:00"},
+        ]
+
+    def test_empty_result(self):
+        _, body = _stream()
+        assert body == b"[]"
+
+    def test_error_before_first_item_is_raised(self):
+        async def failing():
+            raise RuntimeError("database unavailable")
+            yield
+
+        # Raised before the response is created, so the error handlers still apply
+        with pytest.raises(RuntimeError, match="database unavailable"):
+            asyncio.run(stream_json_array(failing()))
+
+
+def _ndjson(*items) -> tuple:
+    async def main():
+        response = await stream_ndjson(_items(*items))
+        return response, [chunk async for chunk in response.body_iterator]
+    return asyncio.run(main())
+
+
+def _request(accept: str | None) -> Request:
+    headers = [(b"accept", accept.encode())] if accept is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestStreamNdjson:
+    def test_one_line_per_item(self):
+        response, chunks = _ndjson({"id": "b1"}, {"id": "b2", "projects": []})
+
+        assert response.media_type == "application/x-ndjson"
+        assert response.headers["vary"] == "Accept"
+        assert chunks == [b'{"id":"b1"}\n', b'{"id":"b2","projects":[]}\n']
+
+    def test_empty_result(self):
+        _, chunks = _ndjson()
+        assert b"".join(chunks) == b""
+
+    def test_accept_header(self):
+        assert accepts_ndjson(_request("application/x-ndjson"))
+        assert accepts_ndjson(_request("application/json;q=0.9, application/x-ndjson"))
+        assert not accepts_ndjson(_request("application/x-ndjson;q=0"))
+        assert not accepts_ndjson(_request("application/json"))
+        assert not accepts_ndjson(_request(None))
@@ -0,0 +1,106 @@
+from db.unit_of_work import UnitOfWork, get_unit_of_work, unit_of_work
+
+
+class FakeTransaction:
+    def __init__(self):
+        self.open = True
+        self.queries = []
+
+    def is_open(self):
+        return self.open
+
+    def close(self):
+        self.open = False
+
+    def query(self, query):
+        self.queries.append(query)
+        if query == "broken":
+            raise RuntimeError("query failed")
+        return self
+
+    def resolve(self):
+        return iter([{"query": self.queries[-1]}])
+
+
+class TestUnitOfWork:
+    def setup_method(self):
+        self.opened = []
+
+    def open_transaction(self):
+        tx = FakeTransaction()
+        self.opened.append(tx)
+        return tx
+
+    def test_reuses_one_read_transaction(self):
+        uow = UnitOfWork()
+        assert uow.read("q1", self.open_transaction) == [{"query": "q1"}]
+        assert uow.read("q2", self.open_transaction) == [{"query": "q2"}]
+        assert len(self.opened) == 1
+        assert self.opened[0].queries == ["q1", "q2"]
+
+    def test_opens_lazily(self):
+        uow = UnitOfWork()
+        assert not uow.has_open_transaction
+        uow.close()
+        assert self.opened == []
+
+    def test_write_closes_snapshot(self):
+        uow = UnitOfWork()
+        uow.read("q1", self.open_transaction)
+        uow.after_write()
+        uow.read("q2", self.open_transaction)
+        assert len(self.opened) == 2
+        assert not self.opened[0].is_open()
+
+    def test_failed_query_discards_transaction(self):
+        uow = UnitOfWork()
+        try:
+            uow.read("broken", self.open_transaction)
+        except RuntimeError:
+            pass
+        uow.read("q1", self.open_transaction)
+        assert len(self.opened) == 2
+
+    def test_context_manager_sets_and_closes(self):
+        assert get_unit_of_work() is None
+        with unit_of_work() as uow:
+            assert get_unit_of_work() is uow
+            uow.read("q1", self.open_transaction)
+        assert get_unit_of_work() is None
+        assert not self.opened[0].is_open()
+
+
+class TestIdentityMap:
+    def test_returns_loaded_entity(self):
+        uow = UnitOfWork()
+        task = object()
+        uow.add_entity("task", "1", task)
+        assert uow.get_entity("task", "1") is task
+        assert uow.get_entity("project", "1") is None
+
+    def test_write_clears_loaded_entities(self):
+        uow = UnitOfWork()
+        uow.add_entity("task", "1", object())
+        uow.after_write()
+        assert uow.get_entity("task", "1") is None
+
+    def test_repository_loads_entity_once(self, monkeypatch):
+        from db.initDatabase import Db
+        from domain.repositories.task_repository import TaskRepository
+
+        queries = []
+
+        def read_transact(query, params=None, sort_fields=True):
+            queries.append(params)
+            return [{"id": params["id"], "name": "Taak", "description": "", "total_needed": 2,
+                     "created_at": "2025-01-01T00:00:00", "total_registered": 0, "total_accepted": 1}]
+
+        monkeypatch.setattr(Db, "read_transact", read_transact)
+        repo = TaskRepository()
+        with unit_of_work():
+            first = repo.get_by_id("1")
+            assert repo.get_by_id("1") is first
+        assert len(queries) == 1
+        # Outside a request nothing is remembered
+        repo.get_by_id("1")
+        assert len(queries) == 2
@@ -0,0 +1,73 @@
+import pytest
+from db.initDatabase import Db
+from domain.models import Supervisor, Teacher
+from domain.repositories.cache import user_type_cache
+from domain.repositories.user_repository import UserRepository
+from exceptions import ItemRetrievalException
+
+BASE = {"id": "u1", "email": "a@b.nl", "fullName": "A B", "imagePath": "a.png"}
+
+
+class Queries(list):
+    """Records the queries and answers them with the row of the requested id, if its type matches."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = {}
+
+    def read_transact(self, query, params=None, sort_fields=True):
+        self.append(query)
+        row = self.rows.get(params["id"])
+        if row is None or not ("isa user," in query or f"isa {row['usertype']['label']}," in query):
+            return []
+        return [row]
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    user_type_cache.invalidate()
+    queries = Queries()
+    monkeypatch.setattr(Db, "read_transact", queries.read_transact)
+    yield queries
+    user_type_cache.invalidate()
+
+
+class TestGetById:
+    def test_supervisor_in_one_query_then_only_its_own_fields(self, queries):
+        queries.rows["u1"] = {**BASE, "usertype": {"label": "supervisor"}, "supervisor": [{
+            "businesses": [{"id": "b1"}], "created_project_ids": [{"id": "p1"}, {"id": "p2"}],
+        }]}
+        user = UserRepository().get_by_id("u1")
+        assert isinstance(user, Supervisor)
+        assert user.business_association_id == "b1"
+        assert user.created_project_ids == ["p1", "p2"]
+        assert len(queries) == 1 and "isa user," in queries[0] and "'student'" in queries[0]
+
+        UserRepository().get_by_id("u1")
+        assert len(queries) == 2
+        assert "isa supervisor," in queries[1] and "'student'" not in queries[1]
+
+    def test_student_keeps_the_dict_shape(self, queries):
+        skill = {"id": "s1", "name": "Python", "is_pending": False, "created_at": "2025-01-01T00:00:00",
+                 "description": ""}
+        queries.rows["u1"] = {**BASE, "usertype": {"label": "student"}, "student": [{
+            "description": "Hoi", "cv_path": None, "registered_task_ids": [{"task_id": "t1"}], "Skills": [skill],
+        }]}
+        student = UserRepository().get_by_id("u1")
+        assert student["type"] == "student"
+        assert student["full_name"] == "A B"
+        assert student["skill_ids"] == [{"skill_id": "s1"}]
+        assert student["registered_task_ids"] == [{"task_id": "t1"}]
+
+    def test_teacher_and_unknown_user(self, queries):
+        queries.rows["u1"] = {**BASE, "usertype": {"label": "teacher"}}
+        assert isinstance(UserRepository().get_by_id("u1"), Teacher)
+        with pytest.raises(ItemRetrievalException):
+            UserRepository().get_by_id("missing")
+
+    def test_stale_type_is_looked_up_again(self, queries):
+        user_type_cache.put("u1", "supervisor")
+        queries.rows["u1"] = {**BASE, "usertype": {"label": "teacher"}}
+        assert isinstance(UserRepository().get_by_id("u1"), Teacher)
+        assert len(queries) == 2
+        assert user_type_cache.get("u1") == "teacher"